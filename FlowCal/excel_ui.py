@@ -217,7 +217,8 @@ def process_beads_table(beads_table,
                         plot=False,
                         plot_dir=None,
                         full_output=False,
-                        get_transform_fxn_kwargs={}):
+                        get_transform_fxn_kwargs={},
+                        fcs_cache=None):
     """
     Process calibration bead samples, as specified by an input table.
 
@@ -269,6 +270,9 @@ def process_beads_table(beads_table,
     get_transform_fxn_kwargs : dict, optional
         Additional parameters passed directly to internal
         ``mef.get_transform_fxn()`` function call.
+    fcs_cache : FlowCal.io.FCSCache, optional
+        Cache through which FCS files are loaded. If None, FCS files are
+        loaded directly.
 
     Returns
     -------
@@ -341,7 +345,10 @@ def process_beads_table(beads_table,
             # Attempt to open file
             filename = os.path.join(base_dir, beads_row['File Path'])
             try:
-                beads_sample = FlowCal.io.FCSData(filename)
+                if fcs_cache is None:
+                    beads_sample = FlowCal.io.FCSData(filename)
+                else:
+                    beads_sample = fcs_cache.load(filename)
             except IOError:
                 raise ExcelUIException("file \"{}\" not found".format(
                     beads_row['File Path']))
@@ -535,7 +542,8 @@ def process_samples_table(samples_table,
                           base_dir=".",
                           verbose=False,
                           plot=False,
-                          plot_dir=None):
+                          plot_dir=None,
+                          fcs_cache=None):
     """
     Process flow cytometry samples, as specified by an input table.
 
@@ -591,6 +599,9 @@ def process_samples_table(samples_table,
         Directory relative to `base_dir` into which plots are saved. If
         `plot` is False, this parameter is ignored. If ``plot==True`` and
         ``plot_dir is None``, plot without saving.
+    fcs_cache : FlowCal.io.FCSCache, optional
+        Cache through which FCS files are loaded. If None, FCS files are
+        loaded directly.
 
     Returns
     -------
@@ -651,7 +662,10 @@ def process_samples_table(samples_table,
             # Attempt to open file
             filename = os.path.join(base_dir, sample_row['File Path'])
             try:
-                sample = FlowCal.io.FCSData(filename)
+                if fcs_cache is None:
+                    sample = FlowCal.io.FCSData(filename)
+                else:
+                    sample = fcs_cache.load(filename)
             except IOError:
                 raise ExcelUIException("file \"{}\" not found".format(
                     sample_row['File Path']))
@@ -1321,7 +1335,8 @@ def run(input_path=None,
         output_path=None,
         verbose=True,
         plot=True,
-        hist_sheet=False):
+        hist_sheet=False,
+        cache_dir=None):
     """
     Run the MS Excel User Interface.
 
@@ -1358,6 +1373,10 @@ def run(input_path=None,
     hist_sheet : bool, optional
         Whether to generate a sheet in the output Excel file specifying
         histogram bin information.
+    cache_dir : str, optional
+        Directory in which to cache decoded FCS files, which speeds up
+        repeated runs on the same files. If None, do not use a cache. See
+        ``FlowCal.io.FCSCache``.
 
     """
 
@@ -1373,6 +1392,12 @@ def run(input_path=None,
     input_dir, input_filename = os.path.split(input_path)
     input_filename_no_ext, __ = os.path.splitext(input_filename)
 
+    # Set up cache of decoded FCS files
+    if cache_dir is not None:
+        fcs_cache = FlowCal.io.FCSCache(cache_dir)
+    else:
+        fcs_cache = None
+
     # Read relevant tables from workbook
     if verbose:
         print(("Reading {}...".format(input_filename)))
@@ -1394,7 +1419,8 @@ def run(input_path=None,
         verbose=verbose,
         plot=plot,
         plot_dir='plot_beads',
-        full_output=True)
+        full_output=True,
+        fcs_cache=fcs_cache)
 
     # Add stats to beads table
     if verbose:
@@ -1411,7 +1437,8 @@ def run(input_path=None,
         base_dir=input_dir,
         verbose=verbose,
         plot=plot,
-        plot_dir='plot_samples')
+        plot_dir='plot_samples',
+        fcs_cache=fcs_cache)
 
     # Add stats to samples table
     if verbose:
@@ -1480,6 +1507,12 @@ if __name__ == '__main__':
         "--histogram-sheet",
         action="store_true",
         help="generate sheet in output Excel file specifying histogram bins")
+    parser.add_argument(
+        "-c",
+        "--cache-dir",
+        type=str,
+        nargs='?',
+        help="directory in which to cache decoded FCS files")
     args = parser.parse_args()
 
     # Run Excel UI
@@ -1487,4 +1520,5 @@ if __name__ == '__main__':
         output_path=args.outputpath,
         verbose=args.verbose,
         plot=args.plot,
-        hist_sheet=args.histogram_sheet)
+        hist_sheet=args.histogram_sheet,
+        cache_dir=args.cache_dir)
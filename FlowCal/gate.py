@@ -247,6 +247,8 @@ def density2d(data,
               xscale='logicle',
               yscale='logicle',
               sigma=10.0,
+              fit_subsample=None,
+              seed=None,
               full_output=False):
     """
     Gate that preserves events in the region with highest density.
@@ -256,9 +258,13 @@ def density2d(data,
 
     Parameters
     ----------
-    data : FCSData or numpy array
+    data : FCSData or numpy array, or iterable of them
         NxD flow cytometry data where N is the number of events and D is
-        the number of parameters (aka channels).
+        the number of parameters (aka channels). Alternatively, chunks of
+        events to gate out of core, as an iterable which can be traversed
+        twice (e.g. a list) or as a function returning a new iterator of
+        chunks on every call (e.g. ``functools.partial`` applied to
+        ``FlowCal.io.iter_fcs_chunks``).
     channels : list of int, list of str, optional
         Two channels on which to perform gating.
     bins : int or array_like or [int, int] or [array, array], optional
@@ -298,6 +304,16 @@ def density2d(data,
         Standard deviation for Gaussian kernel used by
         `scipy.ndimage.filters.gaussian_filter` to smooth 2D histogram
         into a density.
+    fit_subsample : int, optional
+        Number of events to randomly sample, without replacement, to
+        calculate the 2D histogram and select the densest bins. All events
+        in `data` are then gated by looking up whether their bin was
+        selected, such that the fraction of retained events approximates
+        `gate_fraction`. If None, or if larger than the number of events,
+        all events are used.
+    seed : int, optional
+        Seed for the random number generator used to draw
+        `fit_subsample` events.
     full_output : bool, optional
         Flag specifying to return additional outputs. If true, the outputs
         are given as a namedtuple.
@@ -313,12 +329,19 @@ def density2d(data,
         List of 2D numpy array(s) of x-y coordinates tracing out
         the edge of the gated region.
 
+    If `data` is chunked, a generator is returned instead, which yields
+    the outputs above for each chunk, in order.
+
     Raises
     ------
     ValueError
         If more or less than 2 channels are specified.
     ValueError
         If `data` has less than 2 dimensions or less than 2 events.
+    ValueError
+        If `data` is a chunk iterator which can only be traversed once.
+    ValueError
+        If `data` is chunked and `fit_subsample` is specified.
     Exception
         If an unrecognized matplotlib Path code is encountered when
         attempting to generate contours.
@@ -346,31 +369,597 @@ def density2d(data,
            events fall into each histogram bin (since entire bins are
            retained at a time, not individual events).
 
+    If `fit_subsample` is specified, steps 1-7 are performed on a random
+    subsample of events, and all events in `data` whose bin was accepted
+    are retained. The expensive steps then scale with `fit_subsample`,
+    and the remaining events are gated with a single vectorized lookup.
+
+    If `data` is chunked, the 2D histogram is accumulated over all chunks
+    in a first pass, and each chunk is gated in a second pass, such that
+    only one chunk is in memory at a time. The result is the same as
+    gating all events at once, as long as the same bin edges are used for
+    all chunks. Bin edges are obtained from the first chunk, so `bins`
+    should specify bin edges if chunks do not have a ``hist_bins`` method.
+
     """
 
-    # Extract channels in which to gate
+    # Check channels and gating fraction
     if len(channels) != 2:
         raise ValueError('2 channels should be specified')
-    data_ch = data[:,channels]
-    if data_ch.ndim == 1:
-        data_ch = data_ch.reshape((-1,1))
-
-    # Check gating fraction
     if gate_fraction < 0 or gate_fraction > 1:
         raise ValueError('gate fraction should be between 0 and 1, inclusive')
 
-    # Check dimensions
-    if data_ch.ndim < 2:
-        raise ValueError('data should have at least 2 dimensions')
-    if data_ch.shape[0] <= 1:
-        raise ValueError('data should have more than one event')
-
     # Build output namedtuple if necessary
     if full_output:
         Density2dGateOutput = collections.namedtuple(
             'Density2dGateOutput',
             ['gated_data', 'mask', 'contour'])
 
+    # Gate chunked data in two passes
+    if callable(data) or not hasattr(data, 'shape'):
+        if fit_subsample is not None:
+            raise ValueError('fit_subsample is not supported when gating'
+                ' chunks')
+        if callable(data):
+            chunks = data()
+        else:
+            chunks = iter(data)
+            if chunks is data:
+                raise ValueError('chunk iterator can only be traversed'
+                    ' once; specify a function returning a new iterator')
+        density_gate = DensityGate.from_chunks(chunks,
+                                               channels=channels,
+                                               bins=bins,
+                                               xscale=xscale,
+                                               yscale=yscale,
+                                               sigma=sigma)
+        chunks = data() if callable(data) else iter(data)
+        contour = density_gate.contour(gate_fraction=gate_fraction) \
+            if full_output else None
+
+        def gate_chunks():
+            for chunk in chunks:
+                mask = density_gate.mask(chunk, gate_fraction=gate_fraction)
+                if full_output:
+                    yield Density2dGateOutput(gated_data=chunk[mask],
+                                              mask=mask,
+                                              contour=contour)
+                else:
+                    yield chunk[mask]
+
+        return gate_chunks()
+
+    # Fit gate, to a random subsample of events if requested, and apply it
+    # to all events
+    if fit_subsample is not None and fit_subsample < data.shape[0]:
+        random_state = np.random.RandomState(seed)
+        fit_indices = np.sort(random_state.choice(data.shape[0],
+                                                  size=int(fit_subsample),
+                                                  replace=False))
+        density_gate = DensityGate(data[fit_indices],
+                                   channels=channels,
+                                   bins=bins,
+                                   xscale=xscale,
+                                   yscale=yscale,
+                                   sigma=sigma)
+        mask = density_gate.mask(data, gate_fraction=gate_fraction)
+    else:
+        density_gate = DensityGate(data,
+                                   channels=channels,
+                                   bins=bins,
+                                   xscale=xscale,
+                                   yscale=yscale,
+                                   sigma=sigma)
+        mask = density_gate.mask(gate_fraction=gate_fraction)
+    gated_data = data[mask]
+
+    if full_output:
+        return Density2dGateOutput(
+            gated_data=gated_data,
+            mask=mask,
+            contour=density_gate.contour(gate_fraction=gate_fraction))
+    else:
+        return gated_data
+
+###
+# Gate Classes
+###
+
+class DensityGate(object):
+    """
+    Density gate fitted to a sample, which can be reused.
+
+    The 2D histogram, its smoothed density, and the ranking of histogram
+    bins by density are calculated once, as described in `density2d`.
+    Masks and contours can then be obtained for any gate fraction, and
+    the gate can be applied to other samples by looking up the histogram
+    bin of their events.
+
+    Parameters
+    ----------
+    data : FCSData or numpy array
+        NxD flow cytometry data where N is the number of events and D is
+        the number of parameters (aka channels), used to fit the gate.
+    channels : list of int, list of str, optional
+        Two channels on which to perform gating.
+    bins : int or array_like or [int, int] or [array, array], optional
+        Bins used for gating. See `density2d`.
+    xscale, yscale : str, optional
+        Scale of the bins generated for the x and y axes. See `density2d`.
+    sigma : scalar or sequence of scalars, optional
+        Standard deviation for Gaussian kernel used to smooth the 2D
+        histogram into a density. See `density2d`.
+
+    Attributes
+    ----------
+    channels : list of int or list of str
+        Channels on which gating is performed.
+    xedges, yedges : numpy array
+        Bin edges of the 2D histogram for the x and y axes.
+    histogram : numpy array
+        2D histogram of the fitted events.
+    density : numpy array
+        Smoothed and normalized 2D histogram.
+
+    Raises
+    ------
+    ValueError
+        If more or less than 2 channels are specified.
+    ValueError
+        If `data` has less than 2 dimensions or less than 2 events.
+
+    Notes
+    -----
+    The number of events retained for a given gate fraction, and thus the
+    set of accepted histogram bins, is determined from the fitted events.
+    When applied to another sample, events are retained if they fall into
+    an accepted bin, so the fraction of retained events may differ from
+    the gate fraction.
+
+    """
+    def __init__(self,
+                 data,
+                 channels=[0,1],
+                 bins=1024,
+                 xscale='logicle',
+                 yscale='logicle',
+                 sigma=10.0):
+
+        data_ch = _extract_channels(data, channels)
+        if data_ch.shape[0] <= 1:
+            raise ValueError('data should have more than one event')
+
+        self._channels = channels
+
+        # Make 2D histogram
+        bins = _histogram_bins(data_ch, bins, xscale, yscale)
+        H,xe,ye = np.histogram2d(data_ch[:,0], data_ch[:,1], bins=bins)
+        self._xe = xe
+        self._ye = ye
+
+        # Map each event to its histogram bin
+        self._num_fit_events = data_ch.shape[0]
+        self._event_indices, self._bin_indices = self._map_events(data_ch)
+
+        self._fit(H, sigma, len(self._event_indices))
+
+    @classmethod
+    def from_chunks(cls,
+                    chunks,
+                    channels=[0,1],
+                    bins=1024,
+                    xscale='logicle',
+                    yscale='logicle',
+                    sigma=10.0):
+        """
+        Fit a density gate to events provided in chunks.
+
+        The 2D histogram is accumulated chunk by chunk, such that only one
+        chunk needs to be in memory at a time.
+
+        Parameters
+        ----------
+        chunks : iterable of FCSData or numpy array
+            Chunks of NxD flow cytometry data, such as the output of
+            ``FlowCal.io.iter_fcs_chunks``.
+        channels, bins, xscale, yscale, sigma : optional
+            See `DensityGate`. Bin edges are obtained from the first
+            chunk. If chunks do not have a ``hist_bins`` method, `bins`
+            should specify bin edges.
+
+        Returns
+        -------
+        DensityGate
+            Fitted gate. Because fitted events are not kept, ``mask`` and
+            ``gate`` should be called with the events to gate.
+
+        Raises
+        ------
+        ValueError
+            If more or less than 2 channels are specified.
+        ValueError
+            If `chunks` contain less than 2 events in total.
+        ValueError
+            If bin edges cannot be obtained from the first chunk.
+
+        """
+        density_gate = cls.__new__(cls)
+        density_gate._channels = channels
+        density_gate._event_indices = None
+        density_gate._bin_indices = None
+
+        H = None
+        num_events = 0
+        num_binned_events = 0
+        for chunk in chunks:
+            data_ch = _extract_channels(chunk, channels)
+
+            # Bin edges should be fixed before accumulating the histogram
+            if H is None:
+                bins = _histogram_bins(data_ch, bins, xscale, yscale)
+                if hasattr(bins, '__iter__') and len(bins) == 2 and \
+                        all(hasattr(b, '__iter__') for b in bins):
+                    xe, ye = bins
+                elif hasattr(bins, '__iter__') and len(bins) != 2 and \
+                        not any(hasattr(b, '__iter__') for b in bins):
+                    xe = ye = bins
+                else:
+                    raise ValueError('bin edges should be specified when'
+                        ' gating chunks without a hist_bins method')
+                density_gate._xe = np.asarray(xe, dtype=np.float64)
+                density_gate._ye = np.asarray(ye, dtype=np.float64)
+                H = np.zeros((len(xe) - 1, len(ye) - 1))
+
+            # Accumulate histogram of events mapped to bins
+            event_indices, bin_indices = density_gate._map_events(data_ch)
+            H += np.bincount(bin_indices, minlength=H.size).reshape(H.shape)
+            num_events += data_ch.shape[0]
+            num_binned_events += len(event_indices)
+
+        if num_events <= 1:
+            raise ValueError('data should have more than one event')
+
+        density_gate._num_fit_events = num_events
+        density_gate._fit(H, sigma, num_binned_events)
+
+        return density_gate
+
+    @property
+    def channels(self):
+        """
+        Channels on which gating is performed.
+
+        """
+        return self._channels
+
+    @property
+    def xedges(self):
+        """
+        Bin edges of the 2D histogram for the x axis.
+
+        """
+        return self._xe
+
+    @property
+    def yedges(self):
+        """
+        Bin edges of the 2D histogram for the y axis.
+
+        """
+        return self._ye
+
+    @property
+    def histogram(self):
+        """
+        2D histogram of the fitted events.
+
+        """
+        return self._H
+
+    @property
+    def density(self):
+        """
+        Smoothed and normalized 2D histogram.
+
+        """
+        return self._D
+
+    def mask(self, data=None, gate_fraction=0.65):
+        """
+        Get the gate mask for a gate fraction.
+
+        Parameters
+        ----------
+        data : FCSData or numpy array, optional
+            NxD flow cytometry data to gate. If None, use the fitted
+            events.
+        gate_fraction : float, optional
+            Fraction of fitted events to retain after gating. Should be
+            between 0 and 1, inclusive.
+
+        Returns
+        -------
+        mask : numpy array of bool
+            Boolean gate mask, such that ``gated_data = data[mask]``.
+
+        Raises
+        ------
+        ValueError
+            If `gate_fraction` is not between 0 and 1.
+
+        """
+        if data is None:
+            if self._event_indices is None:
+                raise ValueError('data should be specified if the gate was'
+                    ' fitted to chunks')
+            num_events = self._num_fit_events
+            event_indices = self._event_indices
+            bin_indices = self._bin_indices
+        else:
+            data_ch = _extract_channels(data, self._channels)
+            num_events = data_ch.shape[0]
+            event_indices, bin_indices = self._map_events(data_ch)
+
+        mask = np.zeros(shape=num_events, dtype=bool)
+        Nidx = self._last_accepted_bin(gate_fraction)
+        if Nidx is None:
+            return mask
+
+        # Keep events whose bin is among the accepted bins, by looking up
+        # the position of each event's bin in the density ranking.
+        accepted_indices = event_indices[self._bin_rank[bin_indices] <= Nidx]
+        mask[accepted_indices] = True
+
+        return mask
+
+    def contour(self, gate_fraction=0.65):
+        """
+        Get the contour surrounding the gated region for a gate fraction.
+
+        Parameters
+        ----------
+        gate_fraction : float, optional
+            Fraction of fitted events to retain after gating. Should be
+            between 0 and 1, inclusive.
+
+        Returns
+        -------
+        contour : list of 2D numpy arrays
+            List of 2D numpy array(s) of x-y coordinates tracing out
+            the edge of the gated region.
+
+        Raises
+        ------
+        ValueError
+            If `gate_fraction` is not between 0 and 1.
+        Exception
+            If an unrecognized matplotlib Path code is encountered when
+            attempting to generate contours.
+
+        """
+        Nidx = self._last_accepted_bin(gate_fraction)
+        if Nidx is None:
+            return []
+
+        # Use matplotlib contour plotter (implemented in C) to generate
+        # contour(s) at the probability associated with the last accepted
+        # bin.
+        xc = (self._xe[:-1] + self._xe[1:]) / 2.0   # x-axis bin centers
+        yc = (self._ye[:-1] + self._ye[1:]) / 2.0   # y-axis bin centers
+        x,y = np.meshgrid(xc, yc, indexing='ij')
+        mpl_cntr = matplotlib._cntr.Cntr(x,y,self._D)
+        tr = mpl_cntr.trace(self._D.ravel()[self._sidx[Nidx]])
+
+        # trace returns a list of arrays which contain vertices and path
+        # codes used in matplotlib Path objects (see
+        # http://stackoverflow.com/a/18309914 and the documentation for
+        # matplotlib.path.Path for more details). I'm just going to make
+        # sure the path codes aren't unfamiliar and then extract all of the
+        # vertices and pack them into a list of 2D contours.
+        cntr = []
+        num_cntrs = len(tr)//2
+        for idx in range(num_cntrs):
+            vertices = tr[idx]
+            codes = tr[num_cntrs+idx]
+
+            # I am only expecting codes 1 and 2 ('MOVETO' and 'LINETO'
+            # codes)
+            if not np.all((codes==1)|(codes==2)):
+                raise Exception('Contour error: unrecognized path code')
+
+            cntr.append(vertices)
+
+        return cntr
+
+    def gate(self, data, gate_fraction=0.65, full_output=False):
+        """
+        Apply the gate to a sample.
+
+        Parameters
+        ----------
+        data : FCSData or numpy array
+            NxD flow cytometry data to gate.
+        gate_fraction : float, optional
+            Fraction of fitted events to retain after gating. Should be
+            between 0 and 1, inclusive.
+        full_output : bool, optional
+            Flag specifying to return additional outputs. If true, the
+            outputs are given as a namedtuple.
+
+        Returns
+        -------
+        gated_data : FCSData or numpy array
+            Gated flow cytometry data of the same format as `data`.
+        mask : numpy array of bool, only if ``full_output==True``
+            Boolean gate mask used to gate data such that ``gated_data =
+            data[mask]``.
+        contour : list of 2D numpy arrays, only if ``full_output==True``
+            List of 2D numpy array(s) of x-y coordinates tracing out
+            the edge of the gated region.
+
+        """
+        mask = self.mask(data, gate_fraction=gate_fraction)
+        gated_data = data[mask]
+
+        if full_output:
+            Density2dGateOutput = collections.namedtuple(
+                'Density2dGateOutput',
+                ['gated_data', 'mask', 'contour'])
+            return Density2dGateOutput(
+                gated_data=gated_data,
+                mask=mask,
+                contour=self.contour(gate_fraction=gate_fraction))
+        else:
+            return gated_data
+
+    def _fit(self, H, sigma, num_binned_events):
+        """
+        Calculate the density and rank bins from a 2D histogram.
+
+        """
+        self._H = H
+        self._num_binned_events = num_binned_events
+
+        # Smooth 2D histogram
+        sH = scipy.ndimage.filters.gaussian_filter(
+            H,
+            sigma=sigma,
+            order=0,
+            mode='constant',
+            cval=0.0,
+            truncate=6.0)
+
+        # Normalize smoothed histogram to make it a valid probability mass
+        # function. If no events fall within the histogram, no bins are
+        # ever accepted.
+        if np.sum(sH) > 0:
+            D = sH / np.sum(sH)
+        else:
+            D = sH
+        self._D = D
+
+        # Sort bins by density, and accumulate the number of events in
+        # bins sorted by density.
+        self._sidx = np.argsort(D.ravel())[::-1]
+        self._csvH = np.cumsum(H.ravel()[self._sidx])
+
+        # Position of each bin in the density ranking
+        self._bin_rank = np.empty(len(self._sidx), dtype=np.intp)
+        self._bin_rank[self._sidx] = np.arange(len(self._sidx))
+
+    def _last_accepted_bin(self, gate_fraction):
+        """
+        Get the position in the density ranking of the last accepted bin.
+
+        Returns None if no events should be retained.
+
+        """
+        if gate_fraction < 0 or gate_fraction > 1:
+            raise ValueError('gate fraction should be between 0 and 1, '
+                'inclusive')
+
+        # Determine number of events to keep. Only consider events which
+        # have not been thrown out as outliers.
+        n = int(np.ceil(gate_fraction*float(self._num_binned_events)))
+
+        # n = 0 edge case (e.g. if gate_fraction = 0.0)
+        if n == 0:
+            return None
+
+        # Find minimum number of accepted bins needed to reach specified
+        # number of events
+        return np.nonzero(self._csvH >= n)[0][0]   # include this index
+
+    def _map_events(self, data_ch):
+        """
+        Map events to histogram bins.
+
+        Parameters
+        ----------
+        data_ch : numpy array
+            Nx2 array with the events in the gating channels.
+
+        Returns
+        -------
+        event_indices : numpy array
+            Indices of the events which fall within the histogram.
+        bin_indices : numpy array
+            Linear index of the histogram bin of each event in
+            `event_indices`, such that ``histogram.ravel()[bin_indices]``
+            is the bin corresponding to each event.
+
+        """
+        xe = self._xe
+        ye = self._ye
+
+        # Use np.digitize to calculate the histogram bin index for each
+        # event given the histogram bin edges. Note that the index returned
+        # by np.digitize is such that bins[i-1] <= x < bins[i], whereas
+        # indexing the histogram will result in the following: hist[i,j] =
+        # bin corresponding to xedges[i] <= x < xedges[i+1] and yedges[i] <=
+        # y < yedges[i+1]. Therefore, we need to subtract 1 from the
+        # np.digitize result to be able to index into the appropriate bin in
+        # the histogram.
+        event_indices = np.arange(data_ch.shape[0])
+        x_bin_indices = np.digitize(data_ch[:,0], bins=xe) - 1
+        y_bin_indices = np.digitize(data_ch[:,1], bins=ye) - 1
+
+        # In the current version of numpy, there exists a disparity in how
+        # np.histogram and np.digitize treat the rightmost bin edge
+        # (np.digitize is not the strict inverse of np.histogram).
+        # Specifically, np.histogram treats the rightmost bin interval as
+        # fully closed (rightmost bin edge is included in rightmost bin),
+        # whereas np.digitize treats all bins as half-open (you can specify
+        # which side is closed and which side is open; `right` parameter).
+        # The expected behavior for this gating function is to mimic
+        # np.histogram behavior, so we must reconcile this disparity.
+        x_bin_indices[data_ch[:,0] == xe[-1]] = len(xe)-2
+        y_bin_indices[data_ch[:,1] == ye[-1]] = len(ye)-2
+
+        # Ignore (gate out) events which exist outside specified bins.
+        # `np.digitize()-1` will assign events less than `bins` to bin "-1"
+        # and events greater than `bins` to len(bins)-1.
+        outlier_mask = (
+            (x_bin_indices == -1) |
+            (x_bin_indices == len(xe)-1) |
+            (y_bin_indices == -1) |
+            (y_bin_indices == len(ye)-1))
+
+        event_indices = event_indices[~outlier_mask]
+        bin_indices = np.ravel_multi_index(
+            (x_bin_indices[~outlier_mask], y_bin_indices[~outlier_mask]),
+            (len(xe)-1, len(ye)-1))
+
+        return event_indices, bin_indices
+
+###
+# Helper functions
+###
+
+def _extract_channels(data, channels):
+    """
+    Extract the two gating channels from flow cytometry data.
+
+    """
+    if len(channels) != 2:
+        raise ValueError('2 channels should be specified')
+    data_ch = data[:,channels]
+    if data_ch.ndim == 1:
+        data_ch = data_ch.reshape((-1,1))
+
+    # Check dimensions
+    if data_ch.ndim < 2:
+        raise ValueError('data should have at least 2 dimensions')
+
+    return data_ch
+
+def _histogram_bins(data_ch, bins, xscale, yscale):
+    """
+    Get bins of a 2D histogram, using ``data_ch.hist_bins`` if possible.
+
+    See `density2d` for a description of the accepted values of `bins`.
+
+    """
     # If ``data_ch.hist_bins()`` exists, obtain bin edges from it if
     # necessary.
     if hasattr(data_ch, 'hist_bins') and \
@@ -403,135 +992,4 @@ def density2d(data,
                                           nbins=bins,
                                           scale=yscale)]
 
-    # Make 2D histogram
-    H,xe,ye = np.histogram2d(data_ch[:,0], data_ch[:,1], bins=bins)
-
-    # Map each event to its histogram bin by sorting events into a 2D array of
-    # lists which mimics the histogram.
-    #
-    # Use np.digitize to calculate the histogram bin index for each event
-    # given the histogram bin edges. Note that the index returned by
-    # np.digitize is such that bins[i-1] <= x < bins[i], whereas indexing the
-    # histogram will result in the following: hist[i,j] = bin corresponding to
-    # xedges[i] <= x < xedges[i+1] and yedges[i] <= y < yedges[i+1].
-    # Therefore, we need to subtract 1 from the np.digitize result to be able
-    # to index into the appropriate bin in the histogram.
-    event_indices = np.arange(data_ch.shape[0])
-    x_bin_indices = np.digitize(data_ch[:,0], bins=xe) - 1
-    y_bin_indices = np.digitize(data_ch[:,1], bins=ye) - 1
-
-    # In the current version of numpy, there exists a disparity in how
-    # np.histogram and np.digitize treat the rightmost bin edge (np.digitize
-    # is not the strict inverse of np.histogram). Specifically, np.histogram
-    # treats the rightmost bin interval as fully closed (rightmost bin edge is
-    # included in rightmost bin), whereas np.digitize treats all bins as
-    # half-open (you can specify which side is closed and which side is open;
-    # `right` parameter). The expected behavior for this gating function is to
-    # mimic np.histogram behavior, so we must reconcile this disparity.
-    x_bin_indices[data_ch[:,0] == xe[-1]] = len(xe)-2
-    y_bin_indices[data_ch[:,1] == ye[-1]] = len(ye)-2
-
-    # Ignore (gate out) events which exist outside specified bins.
-    # `np.digitize()-1` will assign events less than `bins` to bin "-1" and
-    # events greater than `bins` to len(bins)-1.
-    outlier_mask = (
-        (x_bin_indices == -1) |
-        (x_bin_indices == len(xe)-1) |
-        (y_bin_indices == -1) |
-        (y_bin_indices == len(ye)-1))
-
-    event_indices = event_indices[~outlier_mask]
-    x_bin_indices = x_bin_indices[~outlier_mask]
-    y_bin_indices = y_bin_indices[~outlier_mask]
-
-    # Create a 2D array of lists mimicking the histogram to accumulate events
-    # associated with each bin.
-    filler = np.frompyfunc(lambda x: list(), 1, 1)
-    H_events = np.empty_like(H, dtype=np.object)
-    filler(H_events, H_events)
-
-    for event_idx, x_bin_idx, y_bin_idx in \
-            zip(event_indices, x_bin_indices, y_bin_indices):
-        H_events[x_bin_idx, y_bin_idx].append(event_idx)
-
-    # Determine number of events to keep. Only consider events which have not
-    # been thrown out as outliers.
-    n = int(np.ceil(gate_fraction*float(len(event_indices))))
-
-    # n = 0 edge case (e.g. if gate_fraction = 0.0); incorrectly handled below
-    if n == 0:
-        mask = np.zeros(shape=data_ch.shape[0], dtype=bool)
-        gated_data = data[mask]
-        if full_output:
-            return Density2dGateOutput(
-                gated_data=gated_data, mask=mask, contour=[])
-        else:
-            return gated_data
-
-    # Smooth 2D histogram
-    sH = scipy.ndimage.filters.gaussian_filter(
-        H,
-        sigma=sigma,
-        order=0,
-        mode='constant',
-        cval=0.0,
-        truncate=6.0)
-
-    # Normalize smoothed histogram to make it a valid probability mass function
-    D = sH / np.sum(sH)
-
-    # Sort bins by density
-    vD = D.ravel()
-    vH = H.ravel()
-    sidx = np.argsort(vD)[::-1]
-    svH = vH[sidx]  # linearized counts array sorted by density
-
-    # Find minimum number of accepted bins needed to reach specified number
-    # of events
-    csvH = np.cumsum(svH)
-    Nidx = np.nonzero(csvH >= n)[0][0]    # we want to include this index
-
-    # Get indices of events to keep
-    vH_events = H_events.ravel()
-    accepted_indices = vH_events[sidx[:(Nidx+1)]]
-    accepted_indices = np.array([item       # flatten list of lists
-                                 for sublist in accepted_indices
-                                 for item in sublist])
-    accepted_indices = np.sort(accepted_indices)
-
-    # Convert list of accepted indices to boolean mask array
-    mask = np.zeros(shape=data.shape[0], dtype=bool)
-    mask[accepted_indices] = True
-
-    gated_data = data[mask]
-
-    if full_output:
-        # Use matplotlib contour plotter (implemented in C) to generate contour(s)
-        # at the probability associated with the last accepted bin.
-        xc = (xe[:-1] + xe[1:]) / 2.0   # x-axis bin centers
-        yc = (ye[:-1] + ye[1:]) / 2.0   # y-axis bin centers
-        x,y = np.meshgrid(xc, yc, indexing='ij')
-        mpl_cntr = matplotlib._cntr.Cntr(x,y,D)
-        tr = mpl_cntr.trace(vD[sidx[Nidx]])
-
-        # trace returns a list of arrays which contain vertices and path codes
-        # used in matplotlib Path objects (see http://stackoverflow.com/a/18309914
-        # and the documentation for matplotlib.path.Path for more details). I'm
-        # just going to make sure the path codes aren't unfamiliar and then extract
-        # all of the vertices and pack them into a list of 2D contours.
-        cntr = []
-        num_cntrs = len(tr)/2
-        for idx in range(num_cntrs):
-            vertices = tr[idx]
-            codes = tr[num_cntrs+idx]
-
-            # I am only expecting codes 1 and 2 ('MOVETO' and 'LINETO' codes)
-            if not np.all((codes==1)|(codes==2)):
-                raise Exception('Contour error: unrecognized path code')
-
-            cntr.append(vertices)
-
-        return Density2dGateOutput(
-            gated_data=gated_data, mask=mask, contour=cntr)
-    else:
-        return gated_data
+    return bins
@@ -3,10 +3,18 @@ Classes and utiliy functions for reading FCS files.
 
 """
 
+import io
 import os
-import copy
+import sqlite3
+import asyncio
+import gzip
+import json
+import hashlib
+import tempfile
 import collections
+import concurrent.futures
 import datetime
+import functools
 import warnings
 
 import numpy as np
@@ -17,6 +25,280 @@ import FlowCal.plot
 # Utility functions for importing segments of FCS files
 ###
 
+class _MemoryReader(io.RawIOBase):
+    """
+    Read-only file-like object over an in-memory buffer.
+
+    Unlike ``io.BytesIO``, the buffer is not copied, which allows
+    ``_buffer_array`` to interpret it directly.
+
+    """
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer).toreadonly().cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self.buffer) + offset
+        else:
+            raise ValueError("invalid whence ({0})".format(whence))
+        if pos < 0:
+            raise ValueError("negative seek position {0}".format(pos))
+        self._pos = pos
+        return self._pos
+
+    def readinto(self, b):
+        chunk = self.buffer[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        memoryview(b).cast('B')[:n] = chunk
+        self._pos += n
+        return n
+
+def _open_fcs(infile):
+    """
+    Open an FCS file for reading.
+
+    Parameters
+    ----------
+    infile : str, bytes-like, or file-like
+        Path to an FCS file, or to a gzip-compressed FCS file if it ends
+        in ``.gz``; an in-memory buffer (``bytes``, ``bytearray``, or
+        ``memoryview``) with the contents of an FCS file; or an open
+        binary file-like object, such as a ``io.BytesIO`` or a member of
+        a ``zipfile.ZipFile`` returned by its ``open`` method.
+
+    Returns
+    -------
+    file-like
+        Seekable binary file-like object. If not `infile` itself, it
+        should be closed by the caller.
+
+    """
+    if isinstance(infile, str):
+        if infile.lower().endswith('.gz'):
+            return gzip.open(infile, 'rb')
+        return open(infile, 'rb')
+    elif isinstance(infile, (bytes, bytearray, memoryview)):
+        return _MemoryReader(infile)
+    else:
+        return infile
+
+def _buffer_array(buf, dtype, offset, shape, mmap=False):
+    """
+    Interpret a region of a file-like object as a numpy array.
+
+    Data are not copied if `buf` is backed by memory (i.e. a
+    ``_MemoryReader`` or ``io.BytesIO``), in which case the returned
+    array is a read-only view of it. Otherwise, data are memory mapped
+    if `buf` is a regular file, or read into a new writable array if
+    `buf` is a stream that cannot be memory mapped (e.g. a compressed
+    file).
+
+    Parameters
+    ----------
+    buf : file-like object
+        Buffer containing the data.
+    dtype : numpy dtype
+        Data type of the array.
+    offset : int
+        Offset (in bytes) to the first element of the array in `buf`.
+    shape : tuple
+        Shape of the array.
+    mmap : bool, optional
+        If memory mapped, whether to use a copy-on-write memory map (True)
+        or a read-only one (False).
+
+    Returns
+    -------
+    numpy array or numpy memmap
+
+    """
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+
+    if isinstance(buf, _MemoryReader):
+        memory = buf.buffer
+    elif isinstance(buf, io.BytesIO):
+        # getvalue() returns the underlying bytes object without copying it
+        memory = buf.getvalue()
+    elif isinstance(getattr(buf, 'raw', buf), io.FileIO):
+        memory = None
+    else:
+        # Streams which cannot be memory mapped (e.g. gzip or zip member)
+        # are read directly into the returned array.
+        data = np.empty(shape, dtype=dtype)
+        data_bytes = memoryview(data.reshape(-1).view('uint8'))
+        buf.seek(offset)
+        num_bytes = 0
+        while num_bytes < len(data_bytes):
+            n = buf.readinto(data_bytes[num_bytes:])
+            if not n:
+                raise ValueError("buffer ended after {0} bytes".format(
+                    num_bytes) + " ({0} bytes expected)".format(
+                    len(data_bytes)))
+            num_bytes += n
+        return data
+
+    if memory is None:
+        return np.memmap(buf,
+                         dtype=dtype,
+                         mode='c' if mmap else 'r',
+                         offset=offset,
+                         shape=shape,
+                         order='C')
+
+    data = np.frombuffer(memory, dtype=dtype, count=count, offset=offset)
+    data = data.reshape(shape)
+    data.flags.writeable = False
+    return data
+
+def _event_indices(events, num_events):
+    """
+    Convert an array-like selection of events to an array of indices.
+
+    Parameters
+    ----------
+    events : array-like of int or bool
+        Selected events, specified as indices or as a boolean mask.
+    num_events : int
+        Total number of events.
+
+    Returns
+    -------
+    numpy array of int
+        Indices of the selected events.
+
+    Raises
+    ------
+    ValueError
+        If `events` is a boolean mask whose length is not `num_events`.
+    ValueError
+        If `events` is neither integer nor boolean.
+
+    """
+    events = np.asarray(events)
+    if events.dtype == bool:
+        if events.shape != (num_events,):
+            raise ValueError("boolean events mask should have length"
+                + " {0} (shape = {1})".format(num_events, events.shape))
+        return np.flatnonzero(events)
+    if events.size == 0:
+        return np.zeros(0, dtype=np.intp)
+    if not np.issubdtype(events.dtype, np.integer):
+        raise ValueError("events should be a slice, or an array of"
+            + " integer indices or booleans (dtype ="
+            + " {0})".format(events.dtype))
+    return events.astype(np.intp, copy=False)
+
+def _event_range(events, num_events):
+    """
+    Get the range of events spanned by a selection of events.
+
+    Parameters
+    ----------
+    events : slice or numpy array of int
+        Selected events.
+    num_events : int
+        Total number of events.
+
+    Returns
+    -------
+    first_event, last_event : int
+        Selected events lie within [`first_event`, `last_event`).
+    events : slice or numpy array of int
+        Selected events, relative to `first_event`.
+
+    Raises
+    ------
+    IndexError
+        If `events` contains an index out of range.
+
+    """
+    if isinstance(events, slice):
+        r = range(num_events)[events]
+        if len(r) == 0:
+            return 0, 0, slice(0, 0)
+        first_event = min(r[0], r[-1])
+        last_event = max(r[0], r[-1]) + 1
+        if r.step > 0:
+            return (first_event,
+                    last_event,
+                    slice(0, last_event - first_event, r.step))
+        else:
+            return (first_event,
+                    last_event,
+                    slice(r.start - first_event, None, r.step))
+    else:
+        if np.any((events < -num_events) | (events >= num_events)):
+            raise IndexError("event index out of range (number of events"
+                + " = {0})".format(num_events))
+        events = np.where(events < 0, events + num_events, events)
+        if len(events) == 0:
+            return 0, 0, events
+        first_event = int(events.min())
+        last_event = int(events.max()) + 1
+        return first_event, last_event, events - first_event
+
+def _gather_bytes(byte_data, byte_idx, nbytes):
+    """
+    Gather groups of consecutive bytes starting at the specified positions.
+
+    Bytes past the end of `byte_data` are read as zeros. Only the last
+    bytes of `byte_data` are copied to pad them with zeros.
+
+    Parameters
+    ----------
+    byte_data : 1D numpy array of uint8
+        Contiguous array of bytes.
+    byte_idx : numpy array of int
+        Position of the first byte of each group, within `byte_data`.
+    nbytes : int
+        Number of bytes per group.
+
+    Returns
+    -------
+    numpy array of uint8
+        Array with shape ``(len(byte_idx), nbytes)``, whose i-th row holds
+        bytes ``byte_idx[i]`` to ``byte_idx[i] + nbytes - 1``.
+
+    """
+    # Groups starting before num_full lie entirely within byte_data, and are
+    # gathered from a view of overlapping groups. The remaining groups are
+    # gathered from a zero-padded copy of the last bytes.
+    num_full = max(len(byte_data) - nbytes + 1, 0)
+    tail = np.zeros(len(byte_data) - num_full + nbytes - 1, dtype='uint8')
+    tail[:len(byte_data) - num_full] = byte_data[num_full:]
+    tail_groups = np.lib.stride_tricks.as_strided(
+        tail,
+        shape=(len(byte_data) - num_full, nbytes),
+        strides=(1, 1),
+        writeable=False)
+    if num_full == 0:
+        return tail_groups[byte_idx]
+
+    full_groups = np.lib.stride_tricks.as_strided(
+        byte_data,
+        shape=(num_full, nbytes),
+        strides=(1, 1),
+        writeable=False)
+    groups = full_groups[np.minimum(byte_idx, num_full - 1)]
+    at_tail = np.flatnonzero(byte_idx >= num_full)
+    groups[at_tail] = tail_groups[byte_idx[at_tail] - num_full]
+    return groups
+
 def read_fcs_header_segment(buf, begin=0):
     """
     Read HEADER segment of FCS file.
@@ -78,7 +360,7 @@ def read_fcs_header_segment(buf, begin=0):
     field_values = []
 
     buf.seek(begin)
-    field_values.append(str(buf.read(10)).rstrip())     # version
+    field_values.append(buf.read(10).decode('ascii').rstrip())  # version
 
     field_values.append(int(buf.read(8)))               # text_begin
     field_values.append(int(buf.read(8)))               # text_end
@@ -86,9 +368,9 @@ def read_fcs_header_segment(buf, begin=0):
     field_values.append(int(buf.read(8)))               # data_end
 
     fv = buf.read(8)                                    # analysis_begin
-    field_values.append(0 if fv == ' '*8 else int(fv))
+    field_values.append(0 if not fv.strip() else int(fv))
     fv = buf.read(8)                                    # analysis_end
-    field_values.append(0 if fv == ' '*8 else int(fv))
+    field_values.append(0 if not fv.strip() else int(fv))
 
     header = FCSHeader._make(field_values)
     return header
@@ -124,8 +406,6 @@ def read_fcs_text_segment(buf, begin, end, delim=None):
     ValueError
         If function detects odd number of total extracted keys and
         values (indicating an unpaired key or value).
-    NotImplementedError
-        If delimiter is used in a keyword or value.
 
     Notes
     -----
@@ -157,14 +437,14 @@ def read_fcs_text_segment(buf, begin, end, delim=None):
     """
     if delim is None:
         buf.seek(begin)
-        delim = str(buf.read(1))
+        delim = buf.read(1).decode('latin-1')
 
     # The offsets are inclusive (meaning they specify first and last byte
     # WITHIN segment) and seeking is inclusive (read() after seek() reads the
     # byte which was seeked to). This means the length of the segment is
     # ((end+1) - begin).
     buf.seek(begin)
-    raw = buf.read((end+1)-begin)
+    raw = buf.read((end+1)-begin).decode('latin-1')
 
     # If segment is empty, return empty dictionary as text
     if not raw:
@@ -181,48 +461,58 @@ def read_fcs_text_segment(buf, begin, end, delim=None):
     end_index = raw.rfind(delim)
     raw = raw[1: end_index]
 
-    pairs_list = raw.split(delim)
-
     # According to the FCS2.0 standard, "If the separator appears in a keyword
     # or in a keyword value, it must be 'quoted' by being repeated" and "null
     # (zero length) keywords or keyword values are not permitted", so this
-    # issue should manifest itself as an empty element in the list.
-    # The following scans the list of pairs for empty elements and appends a
-    # delimiter character to the previous element when an empty element is
-    # found.
-    pairs_list_delim = []
-    pairs_list_idx = 0
-    while pairs_list_idx < len(pairs_list):
-        if pairs_list[pairs_list_idx] != '':
-            # Non-empty element, just append
-            pairs_list_delim.append(pairs_list[pairs_list_idx])
+    # issue should manifest itself as a run of empty elements after splitting
+    # the segment by the delimiter. A run of N empty elements joins the
+    # elements before and after it with N delimiters. Runs of delimiters at
+    # the very beginning or end of the segment are kept as they are, as part
+    # of the first or last element.
+    if not raw.strip(delim):
+        pairs_list = [raw]
+    else:
+        head = raw[:len(raw) - len(raw.lstrip(delim))]
+        tail = raw[len(raw.rstrip(delim)):]
+        parts = raw[len(head):len(raw) - len(tail)].split(delim)
+        parts[0] = head + parts[0]
+        parts[-1] += tail
+
+        # Elements between runs of empty elements are copied in bulk. Only
+        # runs of empty elements, which are located with list.index(), are
+        # visited in Python. Elements joined by consecutive runs are
+        # accumulated in a list of pieces and joined once.
+        if delim*2 not in raw:
+            pairs_list = parts
         else:
-            # Empty element
-            # Accumulate delimiters in a temporary string as long as more empty
-            # elements are found, until the last element
-            s = ''
+            pairs_list = []
+            pieces = None
+            start = 0
             while True:
-                s += delim
-                pairs_list_idx += 1
-                if pairs_list_idx >= len(pairs_list):
-                    break
-                if pairs_list[pairs_list_idx] != '':
-                    s += pairs_list[pairs_list_idx]
+                try:
+                    i = parts.index('', start)
+                except ValueError:
                     break
-            # Append temporary string to previous element if pairs_list_delim
-            # is not empty, otherwise make it the first element.
-            if pairs_list_delim:
-                pairs_list_delim[-1] += s
-            else:
-                pairs_list_delim.append(s)
-        pairs_list_idx += 1
-    pairs_list = pairs_list_delim
+                j = i + 1
+                while parts[j] == '':
+                    j += 1
+                if start < i:
+                    if pieces is not None:
+                        pairs_list.append(''.join(pieces))
+                    pairs_list.extend(parts[start:i-1])
+                    pieces = [parts[i-1]]
+                pieces.append(delim*(j - i))
+                pieces.append(parts[j])
+                start = j + 1
+            if pieces is not None:
+                pairs_list.append(''.join(pieces))
+            pairs_list.extend(parts[start:])
 
     # List length should be even since all key-value entries should be pairs
     if len(pairs_list) % 2 != 0:
         raise ValueError("odd # of (keys + values); unpaired key or value")
 
-    text = dict(list(zip(pairs_list[0::2], pairs_list[1::2])))
+    text = dict(zip(pairs_list[0::2], pairs_list[1::2]))
 
     return text, delim
 
@@ -233,14 +523,21 @@ def read_fcs_data_segment(buf,
                           num_events,
                           param_bit_widths,
                           big_endian,
-                          param_ranges=None):
+                          param_ranges=None,
+                          mmap=False,
+                          params=None,
+                          events=None):
     """
     Read DATA segment of FCS file.
 
     Parameters
     ----------
     buf : file-like object
-        Buffer containing data to interpret as DATA segment.
+        Buffer containing data to interpret as DATA segment. If `buf` is
+        an ``io.BytesIO``, its contents are interpreted without copying
+        them. If `buf` is not a regular file nor an in-memory buffer
+        (e.g. a gzip-compressed file), the DATA segment is read into
+        memory.
     begin : int
         Offset (in bytes) to first byte of DATA segment in `buf`.
     end : int
@@ -258,10 +555,12 @@ def read_fcs_data_segment(buf,
         parameter (see $PnB keywords from FCS standards). The length of
         `param_bit_widths` should match the $PAR keyword value from the
         FCS standards (which indicates the total number of parameters).
-        If `datatype` is 'I', data must be byte aligned (i.e. all
-        parameter bit widths should be divisible by 8), and data are
-        upcast to the nearest uint8, uint16, uint32, or uint64 data
-        type. Bit widths larger than 64 bits are not supported.
+        If `datatype` is 'I', data are upcast to the nearest uint8,
+        uint16, uint32, or uint64 data type. Parameters which are not
+        byte aligned (i.e. with bit widths not divisible by 8) are read
+        from a continuous stream of bits, most significant bit first if
+        big endian, or least significant bit first if little endian. Bit
+        widths larger than 64 bits are not supported.
     big_endian : bool
         Endianness of computer used to acquire data (see $BYTEORD
         keyword from FCS standards). True implies big endian; False
@@ -274,17 +573,42 @@ def read_fcs_data_segment(buf,
         `param_ranges` should match the $PAR keyword value from the FCS
         standards (which indicates the total number of parameters). If
         None, no masking is performed.
+    mmap : bool, optional
+        Flag specifying to return a copy-on-write memory map of the DATA
+        segment instead of reading it into memory. Events are then loaded
+        from disk on demand, and modified values are kept in memory
+        without altering the file. Only supported if `datatype` is 'F' or
+        'D', or if `datatype` is 'I' and all parameters have the same bit
+        width. Otherwise, `mmap` is ignored and data are read into memory.
+        If `buf` is an in-memory buffer, `data` is instead a read-only
+        view of it. If `buf` is a stream that cannot be memory mapped
+        (e.g. a compressed file), `data` is read into memory.
+    params : list of int, optional
+        Indices (starting at zero) of the parameters to read. Only these
+        parameters are decoded from the DATA segment, in the order
+        specified. If None, read all parameters.
+    events : slice or array-like of int or bool, optional
+        Events to read, specified as a slice, as indices (starting at
+        zero), or as a boolean mask with one element per event. Only these
+        events are decoded from the DATA segment. If None, read all events.
 
     Returns
     -------
-    data : numpy array
+    data : numpy array or numpy memmap
         NxD numpy array describing N cytometry events observing D data
-        dimensions.
+        dimensions. If `params` or `events` are specified, D and N are the
+        number of selected parameters and events, respectively. If `mmap`
+        is True and memory mapping is supported, `data` is a numpy memmap.
+        When selecting parameters or events, `data` remains memory mapped
+        only if `events` is a slice and `params` are evenly spaced and
+        increasing; otherwise, the selection is copied into memory.
 
     Raises
     ------
     ValueError
         If lengths of `param_bit_widths` and `param_ranges` don't match.
+    ValueError
+        If `params` contains an index out of range.
     ValueError
         If calculated DATA segment size (as determined from the number
         of events, the number of parameters, and the number of bytes per
@@ -298,7 +622,7 @@ def read_fcs_data_segment(buf,
     NotImplementedError
         If `datatype` is 'A'.
     NotImplementedError
-        If `datatype` is 'I' but data is not byte aligned.
+        If `datatype` is 'I' and bit widths larger than 64 are specified.
 
     References
     ----------
@@ -324,6 +648,43 @@ def read_fcs_data_segment(buf,
 
     shape = (int(num_events), num_params)
 
+    # Parameters to read. ``param_key`` is used to select columns from the
+    # memory mapped DATA segment. If `params` are evenly spaced and
+    # increasing, a slice results in a strided view of the memory map, so
+    # only the selected parameters are copied later. Otherwise, fancy
+    # indexing copies the selected parameters directly.
+    if params is None:
+        params = list(range(num_params))
+        param_key = slice(None)
+    else:
+        params = [int(p) for p in params]
+        if any(p < 0 or p >= num_params for p in params):
+            raise ValueError("parameter index out of range (params="
+                + "{0}, number of parameters = {1})".format(params,
+                                                            num_params))
+        steps = np.diff(params)
+        if len(params) == 1 or (steps[0] > 0 and np.all(steps == steps[0])):
+            param_key = slice(params[0],
+                              params[-1] + 1,
+                              steps[0] if len(params) > 1 else 1)
+        else:
+            param_key = params
+
+    # Events to read. Only rows within [first_event, last_event) are read
+    # from `buf`, and `events` is made relative to first_event. If both
+    # events and parameters are specified as indices, use an open mesh to
+    # select the intersection of both.
+    if events is None:
+        events = slice(None)
+    elif not isinstance(events, slice):
+        events = _event_indices(events, shape[0])
+    first_event, last_event, events = _event_range(events, shape[0])
+    num_rows = last_event - first_event
+    if isinstance(events, slice) or isinstance(param_key, slice):
+        key = (events, param_key)
+    else:
+        key = np.ix_(events, param_key)
+
     if datatype == 'I':
         # Check if all parameters fit into preexisting data type
         if (all(bw == 8  for bw in param_bit_widths) or
@@ -339,42 +700,32 @@ def read_fcs_data_segment(buf,
             # points to the first byte of the next segment, in which case the #
             # of bytes specified in the header exceeds the # of bytes that we
             # should read by one.
-            if (shape[0]*shape[1]*(num_bits/8)) != ((end+1)-begin) and \
-                    (shape[0]*shape[1]*(num_bits/8)) != (end-begin):
+            if (shape[0]*shape[1]*(num_bits//8)) != ((end+1)-begin) and \
+                    (shape[0]*shape[1]*(num_bits//8)) != (end-begin):
                 raise ValueError("DATA size does not match expected array"
                     + " size (array size ="
-                    + " {0} bytes,".format(shape[0]*shape[1]*(num_bits/8))
+                    + " {0} bytes,".format(shape[0]*shape[1]*(num_bits//8))
                     + " DATA segment size = {0} bytes)".format((end+1)-begin))
 
             dtype = np.dtype('{0}u{1}'.format('>' if big_endian else '<',
-                                              num_bits/8))
-            data = np.memmap(
+                                              num_bits//8))
+            data = _buffer_array(
                 buf,
                 dtype=dtype,
-                mode='r',
-                offset=begin,
-                shape=shape,
-                order='C')
-
-            # Cast memmap object to regular numpy array stored in memory (as
-            # opposed to being backed by disk)
-            data = np.array(data)
-        else:
-            # The FCS standards technically allows for parameters to NOT be
-            # byte aligned, but parsing a DATA segment which is not byte
-            # aligned requires significantly more computation (and probably an
-            # external library which exposes bit level resolution to a block
-            # of memory). I don't think this is a common use case, so I'm just
-            # going to detect it and raise an error.
-            if (not all(bw % 8 == 0 for bw in param_bit_widths) or
-                any(bw > 64 for bw in param_bit_widths)):
-                raise NotImplementedError("only byte aligned parameter bit"
-                    + " widths (bw % 8 = 0) <= 64 are supported"
-                    + " (param_bit_widths={0})".format(param_bit_widths))
-
+                offset=begin + first_event*shape[1]*dtype.itemsize,
+                shape=(num_rows, shape[1]),
+                mmap=mmap)
+            data = data[key]
+
+            # Cast memmap object or view of an in-memory buffer to regular
+            # numpy array stored in memory (as opposed to being backed by
+            # disk). Arrays read from streams are already writable copies.
+            if not mmap and not data.flags.writeable:
+                data = np.array(data)
+        elif all(bw in (8, 16, 32, 64) for bw in param_bit_widths):
             # Read data in as a byte array
             byte_shape = (int(num_events),
-                          np.sum(np.array(param_bit_widths)/8))
+                          np.sum(np.array(param_bit_widths)//8))
 
             # Sanity check that the total # of bytes that we're about to
             # interpret is exactly the # of bytes in the DATA segment.
@@ -389,59 +740,162 @@ def read_fcs_data_segment(buf,
                     + " {0} bytes,".format(byte_shape[0]*byte_shape[1])
                     + " DATA segment size = {0} bytes)".format((end+1)-begin))
 
-            byte_data = np.memmap(
+            byte_data = _buffer_array(
                 buf,
                 dtype='uint8',  # endianness doesn't matter for 1 byte
-                mode='r',
-                offset=begin,
-                shape=byte_shape,
-                order='C')
+                offset=begin + first_event*byte_shape[1],
+                shape=(num_rows, byte_shape[1]))
+            byte_data = byte_data[events]
 
             # Upcast all data to fit nearest supported data type of largest
-            # bit width
-            upcast_bw = int(2**np.max(np.ceil(np.log2(param_bit_widths))))
+            # bit width. The new array will have endianness native to user's
+            # machine; does not preserve endianness of stored FCS data.
+            upcast_dtype = 'u{0}'.format(max(param_bit_widths)//8)
+
+            # Every parameter corresponds to a numpy integer type. Reinterpret
+            # each event as a record with one field per parameter, and copy
+            # the selected fields into the upcast array, which converts
+            # endianness and upcasts in one step.
+            param_nbytes = np.array(param_bit_widths)//8
+            byte_boundaries = np.cumsum(param_nbytes) - param_nbytes
+            record_dtype = np.dtype({
+                'names': ['P{0}'.format(p) for p in range(num_params)],
+                'formats': ['{0}u{1}'.format('>' if big_endian else '<', nb)
+                            for nb in param_nbytes],
+                'offsets': [int(bb) for bb in byte_boundaries],
+                'itemsize': int(byte_shape[1])})
+            records = byte_data.view(record_dtype)[:,0]
+
+            data = np.empty((records.shape[0], len(params)),
+                            dtype=upcast_dtype)
+            for col, param in enumerate(params):
+                data[:,col] = records['P{0}'.format(param)]
+        else:
+            # Parameters are not byte aligned, or their bit widths do not
+            # correspond to a numpy integer type (e.g. 10, 12, or 24 bits).
+            # The DATA segment is then interpreted as a continuous stream of
+            # bits, in which each value occupies its parameter's bit width.
+            # Values are stored most significant bit first if big endian, or
+            # least significant bit first if little endian.
+            if any(bw > 64 for bw in param_bit_widths):
+                raise NotImplementedError("only parameter bit widths <= 64"
+                    + " are supported (param_bit_widths="
+                    + "{0})".format(param_bit_widths))
+
+            # Sanity check that the total # of bytes that we're about to
+            # interpret is exactly the # of bytes in the DATA segment.
+            # The last byte may be partially used.
+            event_nbits = int(np.sum(param_bit_widths))
+            num_bytes = (shape[0]*event_nbits + 7)//8
+            if num_bytes != ((end+1)-begin) and num_bytes != (end-begin):
+                raise ValueError("DATA size does not match expected array"
+                    + " size (array size = {0} bytes,".format(num_bytes)
+                    + " DATA segment size = {0} bytes)".format((end+1)-begin))
+
+            # Read only the bytes spanning the requested events
+            bit_begin = first_event*event_nbits
+            bit_end = last_event*event_nbits
+            byte_data = _buffer_array(
+                buf,
+                dtype='uint8',
+                offset=begin + bit_begin//8,
+                shape=((bit_end + 7)//8 - bit_begin//8,))
 
-            # Create new array of upcast data type and use byte data to
-            # populate it. The new array will have endianness native to user's
+            # Upcast all data to fit nearest supported data type of largest
+            # bit width. The new array will have endianness native to user's
             # machine; does not preserve endianness of stored FCS data.
-            upcast_dtype = 'u{0}'.format(upcast_bw/8)
-            data = np.zeros(shape,dtype=upcast_dtype)
-
-            # Array mapping each column of data to first corresponding column
-            # in byte_data
-            byte_boundaries = np.roll(np.cumsum(param_bit_widths)/8,1)
-            byte_boundaries[0] = 0
-
-            # Reconstitute columns of data by bit shifting appropriate columns
-            # in byte_data and accumulating them
-            for col in range(data.shape[1]):
-                num_bytes = param_bit_widths[col]/8
-                for b in range(num_bytes):
-                    byte_data_col = byte_boundaries[col] + b
-                    byteshift = (num_bytes-b-1) if big_endian else b
-
-                    if byteshift > 0:
-                        # byte_data must be upcast or else bit shift fails
-                        data[:,col] += \
-                            byte_data[:,byte_data_col].astype(upcast_dtype) \
-                            << (byteshift*8)
-                    else:
-                        data[:,col] += byte_data[:,byte_data_col]
+            upcast_bw = max(8, int(2**np.max(np.ceil(np.log2(
+                param_bit_widths)))))
+            upcast_dtype = 'u{0}'.format(upcast_bw//8)
+
+            # Position of the first bit of each selected event, relative to
+            # the first byte read.
+            if isinstance(events, slice):
+                event_idx = np.arange(*events.indices(num_rows),
+                                      dtype=np.int64)
+            else:
+                event_idx = events.astype(np.int64)
+            event_bit_begin = event_idx*event_nbits + bit_begin % 8
+            param_nbits = np.array(param_bit_widths)
+            bit_boundaries = np.cumsum(param_nbits) - param_nbits
+
+            # The value starting at any bit is extracted with shifts and a
+            # mask from the 64-bit word starting at its first byte, loaded in
+            # the byte order of the bit stream.
+            word_dtype = '>u8' if big_endian else '<u8'
+            data = np.empty((len(event_bit_begin), len(params)),
+                            dtype=upcast_dtype)
+            for col, param in enumerate(params):
+                nbits = int(param_nbits[param])
+                value_bit_begin = event_bit_begin + bit_boundaries[param]
+                byte_idx = value_bit_begin // 8
+                shift = (value_bit_begin % 8).astype(np.uint64)
+                word = _gather_bytes(byte_data, byte_idx, 8)
+                word = word.view(word_dtype)[:,0].astype(np.uint64, copy=False)
+
+                # Shift out the bits preceding the value. A value of more
+                # than 57 bits may extend into the ninth byte, whose bits are
+                # shifted in separately. Bits of the ninth byte beyond the
+                # value are discarded, so its position is clipped to the
+                # bytes read.
+                if nbits > 57:
+                    ninth_byte = byte_data[np.minimum(byte_idx + 8,
+                                                      len(byte_data) - 1)]
+                    ninth_byte = ninth_byte.astype(np.uint64)
+                if big_endian:
+                    value = word << shift
+                    if nbits > 57:
+                        value |= ninth_byte >> (np.uint64(8) - shift)
+                    value >>= np.uint64(64 - nbits)
+                else:
+                    value = word >> shift
+                    if nbits > 57:
+                        value |= (ninth_byte << np.uint64(1)) \
+                            << (np.uint64(63) - shift)
+                    if nbits < 64:
+                        value &= np.uint64((1 << nbits) - 1)
+                data[:,col] = value
 
         if param_ranges is not None:
             # To strictly follow the FCS standards, mask off the unused high bits
             # as specified by param_ranges.
-            for col in range(data.shape[1]):
-                # bits_used should be related to resolution of cytometer ADC
-                bits_used = int(np.ceil(np.log2(param_ranges[col])))
-
-                # Create a bit mask to mask off all but the lowest bits_used bits.
-                # bitmask is a native python int type which does not have an
-                # underlying size. The int type is effectively left-padded with
-                # 0s (infinitely), and the '&' operation preserves the dataype of
-                # the array, so this shouldn't be an issue.
-                bitmask = ~((~0) << bits_used)
-                data[:,col] &= bitmask
+            # bits_used should be related to resolution of cytometer ADC
+            bits_used = np.ceil(np.log2(np.array(param_ranges)[params]))
+
+            # Create a bit mask for each column to mask off all but the lowest
+            # bits_used bits. Masks are built with python ints, which do not
+            # have an underlying size, and are then clipped to the width of
+            # the data type.
+            num_bits = data.dtype.itemsize*8
+            bitmask = np.array([(1 << min(int(bu), num_bits)) - 1
+                                for bu in bits_used],
+                               dtype=data.dtype.newbyteorder('='))
+
+            # Columns using all bits of the data type need no masking.
+            masked_cols = np.flatnonzero(bits_used < num_bits)
+            if len(masked_cols) == 0:
+                pass
+            elif not mmap:
+                if data.flags.writeable:
+                    data &= bitmask
+                else:
+                    data = data & bitmask
+            else:
+                # Writing to a copy-on-write memory map allocates private
+                # memory for every modified page, so only blocks of rows with
+                # set high bits are masked. Blocks are checked one at a time to
+                # avoid allocating a temporary array as large as data. Views
+                # of in-memory buffers are read-only, and are masked into a
+                # copy.
+                block_rows = 2**16
+                for start in range(0, data.shape[0], block_rows):
+                    block = data[start:start + block_rows]
+                    if np.any(block[:,masked_cols].max(axis=0)
+                              > bitmask[masked_cols]):
+                        if not data.flags.writeable:
+                            data = data & bitmask
+                            break
+                        block &= bitmask
 
     elif datatype in ('F','D'):
         num_bits = 32 if datatype == 'F' else 64
@@ -459,26 +913,28 @@ def read_fcs_data_segment(buf,
         # to the first byte of the next segment, in which case the # of bytes
         # specified in the header exceeds the # of bytes that we should read by
         # one.
-        if (shape[0]*shape[1]*(num_bits/8)) != ((end+1)-begin) and \
-            (shape[0]*shape[1]*(num_bits/8)) != (end-begin):
+        if (shape[0]*shape[1]*(num_bits//8)) != ((end+1)-begin) and \
+            (shape[0]*shape[1]*(num_bits//8)) != (end-begin):
             raise ValueError("DATA size does not match expected array size"
-                + " (array size = {0}".format(shape[0]*shape[1]*(num_bits/8))
+                + " (array size = {0}".format(shape[0]*shape[1]*(num_bits//8))
                 + " bytes, DATA segment size ="
                 + " {0} bytes)".format((end+1)-begin))
 
         dtype = np.dtype('{0}f{1}'.format('>' if big_endian else '<',
-                                          num_bits/8))
-        data = np.memmap(
+                                          num_bits//8))
+        data = _buffer_array(
             buf,
             dtype=dtype,
-            mode='r',
-            offset=begin,
-            shape=shape,
-            order='C')
-
-        # Cast memmap object to regular numpy array stored in memory (as
-        # opposed to being backed by disk)
-        data = np.array(data)
+            offset=begin + first_event*shape[1]*dtype.itemsize,
+            shape=(num_rows, shape[1]),
+            mmap=mmap)
+        data = data[key]
+
+        # Cast memmap object or view of an in-memory buffer to regular numpy
+        # array stored in memory (as opposed to being backed by disk). Arrays
+        # read from streams are already writable copies.
+        if not mmap and not data.flags.writeable:
+            data = np.array(data)
     elif datatype == 'A':
         raise NotImplementedError("only \'I\' (unsigned binary integer),"
             + " \'F\' (single precision floating point), and \'D\' (double"
@@ -490,259 +946,938 @@ def read_fcs_data_segment(buf,
 
     return data
 
-###
-# Classes
-###
-
-class FCSFile(object):
+def _read_fcs_text(buf, offset=0):
     """
-    Class representing an FCS flow cytometry data file.
+    Read HEADER, TEXT, and supplemental TEXT segments of an FCS data set.
 
-    This class parses a binary FCS file and exposes a read-only view
-    of the HEADER, TEXT, DATA, and ANALYSIS segments via Python-friendly
-    data structures.
+    FCS file assumptions (see `FCSFile`) are confirmed after reading.
 
     Parameters
     ----------
-    infile : str or file-like
-        Reference to the associated FCS file.
+    buf : file-like object
+        Buffer containing the FCS file.
+    offset : int, optional
+        Offset (in bytes) to the HEADER segment of the data set in `buf`.
+        All other segment offsets of the data set are relative to it.
 
-    Attributes
+    Returns
+    -------
+    header : namedtuple
+        HEADER segment, as returned by ``read_fcs_header_segment``.
+    text : dict
+        Dictionary of keyword-value entries from the TEXT segment and
+        optional supplemental TEXT segment.
+    delim : str
+        String containing delimiter character.
+
+    """
+    header = read_fcs_header_segment(buf=buf, begin=offset)
+
+    # Import primary TEXT segment and optional supplemental TEXT segment.
+    # Primary TEXT segment offsets are always specified in the HEADER
+    # segment. For FCS3.0 and above, supplemental TEXT segment offsets
+    # are always specified via required key-value pairs in the primary
+    # TEXT segment.
+    text, delim = read_fcs_text_segment(
+        buf=buf,
+        begin=offset + header.text_begin,
+        end=offset + header.text_end)
+
+    if header.version in ('FCS3.0','FCS3.1'):
+        stext_begin = int(text['$BEGINSTEXT'])   # required keyword
+        stext_end = int(text['$ENDSTEXT'])       # required keyword
+        if stext_begin and stext_end:
+            stext = read_fcs_text_segment(
+                buf=buf,
+                begin=offset + stext_begin,
+                end=offset + stext_end,
+                delim=delim)[0]
+            text.update(stext)
+
+    # Confirm FCS file assumptions. All queried keywords are required
+    # keywords.
+    if text['$MODE'] != 'L':
+        raise NotImplementedError("only $MODE = \'L\' is supported"
+            + " (detected $MODE = \'{0}\')".format(text['$MODE']))
+
+    if text['$DATATYPE'] not in ('I','F','D'):
+        raise NotImplementedError("only $DATATYPE = \'I\', \'F\', and"
+            + " \'D\' are supported (detected $DATATYPE ="
+            + " \'{0}\')".format(text['$DATATYPE']))
+
+    D = int(text['$PAR']) # total number of parameters (aka channels)
+    param_bit_widths = [int(text['$P{0}B'.format(p)])
+                        for p in range(1,D+1)]
+    if text['$DATATYPE'] == 'I':
+        if any(bw > 64 for bw in param_bit_widths):
+            raise NotImplementedError("if $DATATYPE = \'I\', only"
+                + " parameter bit widths <= 64 are supported (detected"
+                + " {0})".format(
+                    ", ".join('$P{0}B={1}'.format(
+                        p,text['$P{0}B'.format(p)])
+                    for p in range(1,D+1)
+                    if param_bit_widths[p-1] > 64)))
+
+    if text['$BYTEORD'] not in ('4,3,2,1', '2,1', '1,2,3,4', '1,2'):
+        raise NotImplementedError("only big endian ($BYTEORD = \'4,3,2,1\'"
+            + " or \'2,1\') and little endian ($BYTEORD = \'1,2,3,4\' or"
+            + " \'1,2\') are supported (detected $BYTEORD ="
+            + " \'{0}\')".format(text['$BYTEORD']))
+
+    return header, text, delim
+
+def _read_fcs_analysis(buf, header, text, delim, offset=0):
+    """
+    Read optional ANALYSIS segment of an FCS data set.
+
+    Parameters
     ----------
-    infile : str or file-like
-        Reference to associated FCS file.
+    buf : file-like object
+        Buffer containing the FCS file.
     header : namedtuple
-        Version information and byte offset values of other FCS segments
-        in the following order:
-            - version : str
-            - text_begin : int
-            - text_end : int
-            - data_begin : int
-            - data_end : int
-            - analysis_begin : int
-            - analysis_end : int
+        HEADER segment of the data set, as returned by
+        ``read_fcs_header_segment``.
     text : dict
-        Dictionary of keyword-value entries from TEXT segment and optional
-        supplemental TEXT segment.
-    data : numpy array
-        Unwriteable NxD numpy array describing N cytometry events
-        observing D data dimensions.
+        Dictionary of keyword-value entries from the TEXT segment and
+        optional supplemental TEXT segment of the data set.
+    delim : str
+        String containing delimiter character.
+    offset : int, optional
+        Offset (in bytes) to the HEADER segment of the data set in `buf`.
+
+    Returns
+    -------
     analysis : dict
-        Dictionary of keyword-value entries from ANALYSIS segment.
+        Dictionary of keyword-value entries from ANALYSIS segment. Empty
+        if the data set has no ANALYSIS segment, or if it could not be
+        parsed (in which case a warning is issued).
+
+    """
+    if header.analysis_begin and header.analysis_end:
+        # Prioritize ANALYSIS segment offsets specified in HEADER over
+        # offsets specified in TEXT segment.
+        analysis_begin = header.analysis_begin
+        analysis_end = header.analysis_end
+    elif header.version in ('FCS3.0', 'FCS3.1'):
+        analysis_begin = int(text['$BEGINANALYSIS'])
+        analysis_end = int(text['$ENDANALYSIS'])
+    else:
+        analysis_begin = analysis_end = 0
+
+    if not (analysis_begin and analysis_end):
+        return {}
+
+    try:
+        analysis = read_fcs_text_segment(
+            buf=buf,
+            begin=offset + analysis_begin,
+            end=offset + analysis_end,
+            delim=delim)[0]
+    except Exception as e:
+        warnings.warn("ANALYSIS segment could not be parsed ({})".\
+            format(str(e)))
+        analysis = {}
+
+    return analysis
+
+def _read_fcs_data(buf,
+                   header,
+                   text,
+                   mmap=False,
+                   params=None,
+                   events=None,
+                   offset=0):
+    """
+    Read DATA segment of FCS file, as described by its HEADER and TEXT.
+
+    Parameters
+    ----------
+    buf : file-like object
+        Buffer containing the FCS file.
+    header : namedtuple
+        HEADER segment of the FCS file, as returned by
+        ``read_fcs_header_segment``.
+    text : dict
+        Dictionary of keyword-value entries from the TEXT segment and
+        optional supplemental TEXT segment of the FCS file.
+    mmap, params, events : optional
+        Arguments passed to ``read_fcs_data_segment``.
+    offset : int, optional
+        Offset (in bytes) to the HEADER segment of the data set in `buf`.
+
+    Returns
+    -------
+    data : numpy array or numpy memmap
+        Data read by ``read_fcs_data_segment``.
 
     Raises
     ------
-    NotImplementedError
-        If $MODE is not 'L'.
-    NotImplementedError
-        If $DATATYPE is not 'I', 'F', or 'D'.
-    NotImplementedError
-        If $DATATYPE is 'I' but data is not byte aligned.
-    NotImplementedError
-        If $BYTEORD is not big endian ('4,3,2,1' or '2,1') or little
-        endian ('1,2,3,4', '1,2').
-    ValueError
-        If TEXT-like segment does not start with delimiter.
     ValueError
-        If TEXT-like segment has odd number of total extracted keys and
-        values (indicating an unpaired key or value).
-    ValueError
-        If calculated DATA segment size (as determined from the number
-        of events, the number of parameters, and the number of bytes per
-        data point) does not match size specified in HEADER segment
-        offsets.
-    Warning
-        If more than one data set is detected in the same file.
-    Warning
-        If the ANALYSIS segment was not successfully parsed.
-    
-    Notes
-    -----
-    The Flow Cytometry Standard (FCS) describes the de facto standard
-    file format used by flow cytometry acquisition and analysis software
-    to record flow cytometry data to and load flow cytometry data from a
-    file. The standard dictates that each file must have the following
-    segments: HEADER, TEXT, and DATA. The HEADER segment contains
-    version information and byte offset values of other segments, the
-    TEXT segment contains delimited key-value pairs containing
-    acquisition information, and the DATA segment contains the recorded
-    flow cytometry data. The file may optionally have an ANALYSIS
-    segment (structurally identicaly to the TEXT segment), a
-    supplemental TEXT segment (according to more recent versions of the
-    standard), and user-defined OTHER segments.
-
-    This class supports a subset of the FCS3.1 standard which should be
-    backwards compatible with FCS3.0 and FCS2.0. The FCS file must be
-    of the following form:
-        - $MODE = 'L' (list mode; histogram mode is not supported).
-        - $DATATYPE = 'I' (unsigned binary integers), 'F' (single
-          precision floating point), or 'D' (double precision floating
-          point). 'A' (ASCII) is not supported.
-        - If $DATATYPE = 'I', $PnB % 8 = 0 (byte aligned) for all
-          parameters (aka channels).
-        - $BYTEORD = '4,3,2,1' (big endian) or '1,2,3,4' (little
-          endian).
-        - One data set per file.
+        If DATA segment offsets are not specified.
 
-    For more information on the TEXT segment keywords (e.g. $MODE,
-    $DATATYPE, etc.), see [1]_, [2]_, and [3]_.
+    """
+    D = int(text['$PAR']) # total number of parameters (aka channels)
+    param_bit_widths = [int(text['$P{0}B'.format(p)])
+                        for p in range(1,D+1)]
+    param_ranges = [float(text['$P{0}R'.format(p)])
+                    for p in range(1,D+1)]
+    big_endian = text['$BYTEORD'] in ('4,3,2,1', '2,1')
+
+    if header.data_begin and header.data_end:
+        # Prioritize DATA segment offsets specified in HEADER over
+        # offsets specified in TEXT segment.
+        data_begin = header.data_begin
+        data_end = header.data_end
+    elif header.version in ('FCS3.0', 'FCS3.1'):
+        data_begin = int(text['$BEGINDATA'])
+        data_end = int(text['$ENDDATA'])
+        if not (data_begin and data_end):
+            raise ValueError("DATA segment incorrectly specified")
+    else:
+        raise ValueError("DATA segment incorrectly specified")
+
+    return read_fcs_data_segment(
+        buf=buf,
+        begin=offset + data_begin,
+        end=offset + data_end,
+        datatype=text['$DATATYPE'],
+        num_events=int(text['$TOT']),
+        param_bit_widths=param_bit_widths,
+        param_ranges=param_ranges,
+        big_endian=big_endian,
+        mmap=mmap,
+        params=params,
+        events=events)
+
+def _channels_to_params(text, channels):
+    """
+    Get the indices of the specified channels from a TEXT segment.
 
-    References
+    Parameters
     ----------
-    .. [1] P.N. Dean, C.B. Bagwell, T. Lindmo, R.F. Murphy, G.C. Salzman,
-       "Data file standard for flow cytometry. Data File Standards
-       Committee of the Society for Analytical Cytology," Cytometry vol
-       11, pp 323-332, 1990, PMID 2340769.
+    text : dict
+        Dictionary of keyword-value entries from the TEXT segment of an
+        FCS file.
+    channels : int, str, list of int, list of str
+        Channel(s) of interest, specified by name ($PnN keyword) or
+        index (starting at zero).
 
-    .. [2] L.C. Seamer, C.B. Bagwell, L. Barden, D. Redelman, G.C. Salzman,
-       J.C. Wood, R.F. Murphy, "Proposed new data file standard for flow
-       cytometry, version FCS 3.0," Cytometry vol 28, pp 118-122, 1997,
-       PMID 9181300.
+    Returns
+    -------
+    list of int
+        Indices of the specified channels.
 
-    .. [3] J. Spidlen, et al, "Data File Standard for Flow Cytometry,
-       version FCS 3.1," Cytometry A vol 77A, pp 97-100, 2009, PMID
-       19937951.
+    Raises
+    ------
+    ValueError
+        If a channel name is not found, or a channel index is out of
+        range.
 
     """
-    def __init__(self, infile):
-        
-        self._infile = infile
-
-        if isinstance(infile, str):
-            f = open(infile, 'rb')
+    num_channels = int(text['$PAR'])
+    channel_names = [text.get('$P{}N'.format(i))
+                     for i in range(1, num_channels + 1)]
+
+    if isinstance(channels, (str, int)):
+        channels = [channels]
+
+    params = []
+    for ch in channels:
+        if isinstance(ch, str):
+            if ch not in channel_names:
+                raise ValueError("{} is not a valid channel name.".format(ch))
+            params.append(channel_names.index(ch))
         else:
-            f = infile
-
-        self._header = read_fcs_header_segment(buf=f)
-
-        # Import primary TEXT segment and optional supplemental TEXT segment.
-        # Primary TEXT segment offsets are always specified in the HEADER
-        # segment. For FCS3.0 and above, supplemental TEXT segment offsets
-        # are always specified via required key-value pairs in the primary
-        # TEXT segment.
-        self._text, delim = read_fcs_text_segment(
-            buf=f,
-            begin=self._header.text_begin,
-            end=self._header.text_end)
-
-        if self._header.version in ('FCS3.0','FCS3.1'):
-            stext_begin = int(self._text['$BEGINSTEXT'])   # required keyword
-            stext_end = int(self._text['$ENDSTEXT'])       # required keyword
-            if stext_begin and stext_end:
-                stext = read_fcs_text_segment(
-                    buf=f,
-                    begin=stext_begin,
-                    end=stext_end,
-                    delim=delim)[0]
-                self._text.update(stext)
-
-        # Confirm FCS file assumptions. All queried keywords are required
-        # keywords.
-        if self._text['$MODE'] != 'L':
-            raise NotImplementedError("only $MODE = \'L\' is supported"
-                + " (detected $MODE = \'{0}\')".format(self._text['$MODE']))
-
-        if self._text['$DATATYPE'] not in ('I','F','D'):
-            raise NotImplementedError("only $DATATYPE = \'I\', \'F\', and"
-                + " \'D\' are supported (detected $DATATYPE ="
-                + " \'{0}\')".format(self._text['$DATATYPE']))
-
-        D = int(self._text['$PAR']) # total number of parameters (aka channels)
-        param_bit_widths = [int(self._text['$P{0}B'.format(p)])
-                            for p in range(1,D+1)]
-        if self._text['$DATATYPE'] == 'I':
-            if not all(bw % 8 == 0 for bw in param_bit_widths):
-                raise NotImplementedError("if $DATATYPE = \'I\', only byte"
-                    + " aligned parameter bit widths (bw % 8 = 0) are"
-                    + " supported (detected {0})".format(
-                        ", ".join('$P{0}B={1}'.format(
-                            p,self._text['$P{0}B'.format(p)])
-                        for p in range(1,D+1)
-                        if param_bit_widths[p-1] % 8 != 0)))
-
-        if self._text['$BYTEORD'] not in ('4,3,2,1', '2,1', '1,2,3,4', '1,2'):
-            raise NotImplementedError("only big endian ($BYTEORD = \'4,3,2,1\'"
-                + " or \'2,1\') and little endian ($BYTEORD = \'1,2,3,4\' or"
-                + " \'1,2\') are supported (detected $BYTEORD ="
-                + " \'{0}\')".format(self._text['$BYTEORD']))
-        big_endian = self._text['$BYTEORD'] in ('4,3,2,1', '2,1')
+            if ch >= num_channels or ch < -num_channels:
+                raise ValueError("index out of range")
+            params.append(ch % num_channels)
 
-        if int(self._text['$NEXTDATA']):
-            warnings.warn("detected (and ignoring) additional data set"
-                + " ($NEXTDATA = {0})".format(self._text['$NEXTDATA']))
+    return params
 
-        # Import optional ANALYSIS segment
-        if self._header.analysis_begin and self._header.analysis_end:
-            # Prioritize ANALYSIS segment offsets specified in HEADER over
-            # offsets specified in TEXT segment.
-            try:
-                self._analysis = read_fcs_text_segment(
-                    buf=f,
-                    begin=self._header.analysis_begin,
-                    end=self._header.analysis_end,
-                    delim=delim)[0]
-            except Exception as e:
-                warnings.warn("ANALYSIS segment could not be parsed ({})".\
-                    format(str(e)))
-                self._analysis = {}
-        elif self._header.version in ('FCS3.0', 'FCS3.1'):
-            analysis_begin = int(self._text['$BEGINANALYSIS'])
-            analysis_end = int(self._text['$ENDANALYSIS'])
-            if analysis_begin and analysis_end:
-                try:
-                    self._analysis = read_fcs_text_segment(
-                        buf=f,
-                        begin=analysis_begin,
-                        end=analysis_end,
-                        delim=delim)[0]
-                except Exception as e:
-                    warnings.warn("ANALYSIS segment could not be parsed ({})".\
-                        format(str(e)))
-                    self._analysis = {}
-            else:
-                self._analysis = {}
-        else:
-            self._analysis = {}
-        
-        # Import DATA segment
-        param_ranges = [float(self._text['$P{0}R'.format(p)])
-                        for p in range(1,D+1)]
-        if self._header.data_begin and self._header.data_end:
-            # Prioritize DATA segment offsets specified in HEADER over
-            # offsets specified in TEXT segment.
-            self._data = read_fcs_data_segment(
-                buf=f,
-                begin=self._header.data_begin,
-                end=self._header.data_end,
-                datatype=self._text['$DATATYPE'],
-                num_events=int(self._text['$TOT']),
-                param_bit_widths=param_bit_widths,
-                param_ranges=param_ranges,
-                big_endian=big_endian)
-        elif self._header.version in ('FCS3.0', 'FCS3.1'):
-            data_begin = int(self._text['$BEGINDATA'])
-            data_end = int(self._text['$ENDDATA'])
-            if data_begin and data_end:
-                self._data = read_fcs_data_segment(
-                    buf=f,
-                    begin=data_begin,
-                    end=data_end,
-                    datatype=self._text['$DATATYPE'],
-                    num_events=int(self._text['$TOT']),
-                    param_bit_widths=param_bit_widths,
-                    param_ranges=param_ranges,
-                    big_endian=big_endian)
-            else:
-                raise ValueError("DATA segment incorrectly specified")
-        else:
-            raise ValueError("DATA segment incorrectly specified")
-        self._data.flags.writeable = False
+def read_fcs_metadata(infile):
+    """
+    Read acquisition and channel information from an FCS file.
 
-        if isinstance(infile, str):
-            f.close()
+    Only the HEADER, TEXT, supplemental TEXT, and ANALYSIS segments are
+    parsed. The DATA segment is never read, which makes this function
+    much faster than loading an `FCSData` object when events are not
+    needed (e.g. to catalogue a large number of files).
 
-    # Expose attributes as read-only properties
-    @property
+    Parameters
+    ----------
+    infile : str or file-like
+        Reference to the associated FCS file.
+
+    Returns
+    -------
+    metadata : namedtuple
+        Information parsed from the FCS file, in the following order:
+            - infile : str or file-like
+            - text : dict
+            - analysis : dict
+            - num_events : int
+            - data_type : str
+            - time_step : float
+            - acquisition_start_time : time or datetime
+            - acquisition_end_time : time or datetime
+            - channels : tuple
+            - amplification_type : tuple
+            - detector_voltage : tuple
+            - amplifier_gain : tuple
+            - range : list
+            - resolution : tuple
+        Fields are parsed in the same way as the `FCSData` attributes and
+        methods of the same name, and refer to all channels in the file.
+
+    Notes
+    -----
+    All restrictions on the FCS file format and the Exceptions specified
+    for `FCSFile` also apply to this function, except for those related to
+    the DATA segment size.
+
+    """
+    fields = [
+        'infile',
+        'text',
+        'analysis',
+        'num_events',
+        'data_type',
+        'time_step',
+        'acquisition_start_time',
+        'acquisition_end_time',
+        'channels',
+        'amplification_type',
+        'detector_voltage',
+        'amplifier_gain',
+        'range',
+        'resolution']
+
+    FCSMetadata = collections.namedtuple('FCSMetadata', fields)
+
+    fcs_file = FCSFile(infile, data=False)
+    parsed = FCSData._parse_metadata(fcs_file.text)
+
+    return FCSMetadata(
+        infile=infile,
+        text=fcs_file.text,
+        analysis=fcs_file.analysis,
+        num_events=int(fcs_file.text['$TOT']),
+        **parsed)
+
+def iter_fcs_chunks(infile, chunk_size, channels=None):
+    """
+    Iterate over the events of an FCS file in chunks.
+
+    The HEADER and TEXT segments are parsed once, and the DATA segment is
+    then read incrementally, such that at most `chunk_size` events are
+    loaded into memory at a time.
+
+    Parameters
+    ----------
+    infile : str or file-like
+        Reference to the associated FCS file.
+    chunk_size : int
+        Maximum number of events in each chunk.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to read, specified by name or index. If None, read all
+        channels.
+
+    Yields
+    ------
+    FCSData
+        Consecutive chunks of events, with the channel-dependent and
+        channel-independent information of the FCS file. The last chunk
+        may contain less than `chunk_size` events.
+
+    Raises
+    ------
+    ValueError
+        If `chunk_size` is not a positive integer.
+
+    Notes
+    -----
+    All restrictions on the FCS file format and the Exceptions specified
+    for `FCSFile` also apply to this function.
+
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size should be a positive integer")
+    chunk_size = int(chunk_size)
+
+    f = _open_fcs(infile)
+
+    try:
+        fcs_file = FCSFile(f, data=False)
+        if channels is not None:
+            params = _channels_to_params(fcs_file.text, channels)
+        else:
+            params = None
+
+        num_events = int(fcs_file.text['$TOT'])
+        for start in range(0, num_events, chunk_size):
+            data = _read_fcs_data(
+                buf=f,
+                header=fcs_file.header,
+                text=fcs_file.text,
+                params=params,
+                events=slice(start, start + chunk_size))
+            # Chunks should not share mutable attributes
+            yield FCSData._new_from_data(data=data,
+                                         infile=infile,
+                                         text=dict(fcs_file.text),
+                                         analysis=dict(fcs_file.analysis),
+                                         channels=channels)
+    finally:
+        if f is not infile:
+            f.close()
+
+def _read_fcs_data_or_exception(infile, channels=None, mmap=False):
+    """
+    Load an `FCSData` object, returning the exception raised on failure.
+
+    """
+    try:
+        return FCSData(infile, mmap=mmap, channels=channels)
+    except Exception as e:
+        return e
+
+def read_many(paths,
+              n_jobs=None,
+              channels=None,
+              mmap=False,
+              backend='process'):
+    """
+    Load several FCS files in parallel.
+
+    Parameters
+    ----------
+    paths : list of str
+        Paths of the FCS files to load.
+    n_jobs : int, optional
+        Number of files to load simultaneously. If None, use the number of
+        CPUs in the system. If 1, load files sequentially in the calling
+        process.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to load from each file, specified by name or index. If
+        None, load all channels.
+    mmap : bool, optional
+        Flag specifying to keep events backed by the FCS files via
+        copy-on-write memory maps. See `FCSData`. Events loaded by worker
+        processes are transferred to the calling process by value, so this
+        is only useful if ``backend='thread'`` or ``n_jobs=1``.
+    backend : {'process', 'thread'}, optional
+        Whether to load files in a pool of worker processes or threads.
+        Decoding is CPU-bound, and runs faster in separate processes if
+        many files are loaded.
+
+    Returns
+    -------
+    list
+        For each element in `paths`, in the same order, either the loaded
+        `FCSData` object, or the exception raised while loading the file.
+        Exceptions do not abort loading of the other files.
+
+    Raises
+    ------
+    ValueError
+        If `backend` is not 'process' or 'thread'.
+
+    """
+    if backend not in ('process', 'thread'):
+        raise ValueError("backend should be 'process' or 'thread'")
+
+    paths = list(paths)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(paths))
+
+    if n_jobs <= 1:
+        return [_read_fcs_data_or_exception(path, channels, mmap)
+                for path in paths]
+
+    if backend == 'process':
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs)
+    with executor:
+        return list(executor.map(_read_fcs_data_or_exception,
+                                 paths,
+                                 [channels]*len(paths),
+                                 [mmap]*len(paths)))
+
+async def aread_fcs(infile, channels=None, mmap=False, executor=None):
+    """
+    Load an FCS file without blocking the asyncio event loop.
+
+    Reading and decoding of the file run in an executor, via
+    ``loop.run_in_executor``.
+
+    Parameters
+    ----------
+    infile : str or file-like
+        Reference to the associated FCS file.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to load, specified by name or index. If None, load all
+        channels.
+    mmap : bool, optional
+        Flag specifying to keep events backed by the FCS file via a
+        copy-on-write memory map. See `FCSData`.
+    executor : concurrent.futures.Executor, optional
+        Executor in which to load the file. If None, use the default
+        executor of the event loop.
+
+    Returns
+    -------
+    FCSData
+        Loaded `FCSData` object.
+
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(FCSData, infile, mmap=mmap, channels=channels))
+
+async def aread_many(paths,
+                     n_jobs=None,
+                     channels=None,
+                     mmap=False,
+                     executor=None):
+    """
+    Load several FCS files without blocking the asyncio event loop.
+
+    Up to `n_jobs` files are loaded concurrently in an executor, such that
+    reading of some files overlaps with decoding of others.
+
+    Parameters
+    ----------
+    paths : list of str
+        Paths of the FCS files to load.
+    n_jobs : int, optional
+        Maximum number of files loaded simultaneously. If None, use the
+        number of CPUs in the system.
+    channels, mmap, executor : optional
+        Arguments passed to ``aread_fcs``.
+
+    Returns
+    -------
+    list
+        For each element in `paths`, in the same order, either the loaded
+        `FCSData` object, or the exception raised while loading the file.
+        Exceptions do not abort loading of the other files.
+
+    """
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    semaphore = asyncio.Semaphore(n_jobs)
+
+    async def read(path):
+        async with semaphore:
+            return await aread_fcs(path,
+                                   channels=channels,
+                                   mmap=mmap,
+                                   executor=executor)
+
+    return await asyncio.gather(*[read(path) for path in paths],
+                                return_exceptions=True)
+
+def save_columns(data, directory):
+    """
+    Save an `FCSData` object in columnar format.
+
+    Each channel is stored as a contiguous, one-dimensional ``.npy`` file
+    named after its index (``0.npy``, ``1.npy``, etc.), next to a
+    ``metadata.json`` file with the TEXT and ANALYSIS segments, channel
+    names, indices of the channels among the parameters of the TEXT
+    segment, and channel ranges. Use ``load_columns`` to load it back.
+
+    Parameters
+    ----------
+    data : FCSData
+        Object to save.
+    directory : str
+        Directory in which to save `data`. Created if it does not exist.
+        Existing files with the same names are overwritten.
+
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    for i in range(data.shape[1]):
+        np.save(os.path.join(directory, '{0}.npy'.format(i)),
+                np.ascontiguousarray(data.view(np.ndarray)[:,i]))
+
+    # JSON has no representation for numpy arrays or floats
+    ranges = [[float(x) for x in r] for r in data._channel_table.range]
+    metadata = {
+        'infile': data.infile if isinstance(data.infile, str) else None,
+        'text': data.text,
+        'analysis': data.analysis,
+        'channels': list(data.channels),
+        'params': [int(p) for p in data._channel_table.params],
+        'range': ranges,
+    }
+    with open(os.path.join(directory, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+
+def load_columns(directory, channels=None, mmap=False):
+    """
+    Load an `FCSData` object saved in columnar format.
+
+    Acquisition and channel information is parsed from the stored TEXT
+    segment, and the FCS file is not read.
+
+    Parameters
+    ----------
+    directory : str
+        Directory where the object was saved with ``save_columns``.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to load, specified by name or index among the saved
+        channels. Only the files of these channels are read. If None, load
+        all saved channels.
+    mmap : bool, optional
+        Flag specifying to memory map the files of the loaded channels
+        instead of reading them into memory. Only a single channel can be
+        memory mapped without copying. If several channels are loaded,
+        their events are copied into memory.
+
+    Returns
+    -------
+    FCSData
+        Loaded `FCSData` object. Its events are stored in column-major
+        (Fortran) order, so that the events of each channel are
+        contiguous.
+
+    """
+    with open(os.path.join(directory, 'metadata.json'), 'r') as f:
+        metadata = json.load(f)
+    saved_channels = metadata['channels']
+
+    # Indices of the channels to load
+    if channels is None:
+        idx = list(range(len(saved_channels)))
+    else:
+        channel_list = channels
+        if isinstance(channels, (int, str)):
+            channel_list = [channels]
+        idx = []
+        for channel in channel_list:
+            if isinstance(channel, str):
+                if channel not in saved_channels:
+                    raise ValueError("channel \'{0}\' not found".format(
+                        channel))
+                idx.append(saved_channels.index(channel))
+            else:
+                idx.append(range(len(saved_channels))[channel])
+
+    columns = [np.load(os.path.join(directory, '{0}.npy'.format(i)),
+                       mmap_mode='c' if mmap else None)
+               for i in idx]
+    if len(columns) == 1:
+        data = columns[0][:,np.newaxis]
+    else:
+        data = np.empty((len(columns[0]), len(columns)),
+                        dtype=columns[0].dtype,
+                        order='F')
+        for j, column in enumerate(columns):
+            data[:,j] = column
+
+    # Channels are selected from the TEXT segment by parameter index, since
+    # names ($PnN) are optional.
+    fcs_data = FCSData._new_from_data(
+        data=data,
+        infile=metadata['infile'],
+        text=metadata['text'],
+        analysis=metadata['analysis'],
+        channels=[metadata['params'][i] for i in idx])
+    fcs_data._channel_table.range[:] = [metadata['range'][i] for i in idx]
+
+    return fcs_data
+
+def concatenate(data_list):
+    """
+    Concatenate the events of several `FCSData` objects.
+
+    Events are copied into a single buffer, allocated once.
+
+    Parameters
+    ----------
+    data_list : list of FCSData
+        Objects to concatenate. All objects should have the same set of
+        channels. Channels of all objects are arranged in the order of
+        the first object.
+
+    Returns
+    -------
+    data : FCSData
+        `FCSData` object with the events of all elements of `data_list`,
+        in order. Metadata is taken from the first element, except for
+        the range of each channel, which spans the ranges of all
+        elements.
+    offsets : numpy array
+        Array of length ``len(data_list) + 1``. Events of
+        ``data_list[i]`` are ``data[offsets[i]:offsets[i+1]]``. The index
+        of the source of each event can be obtained with
+        ``np.searchsorted(offsets, event_indices, side='right') - 1``.
+
+    Raises
+    ------
+    ValueError
+        If `data_list` is empty.
+    ValueError
+        If the channels of any element of `data_list` differ from the
+        channels of the first one.
+
+    """
+    if len(data_list) == 0:
+        raise ValueError("data_list should not be empty")
+
+    first = data_list[0]
+    channels = first.channels
+    num_channels = len(channels)
+
+    # Columns of each element in the order of the first one
+    column_idx = []
+    for i, data in enumerate(data_list):
+        if data.channels == channels:
+            column_idx.append(slice(None))
+        elif (len(data.channels) == num_channels
+                and set(data.channels) == set(channels)):
+            column_idx.append(data._name_to_index(list(channels)))
+        else:
+            raise ValueError("channels of data_list[{0}] ({1})".format(
+                i, data.channels) + " do not match channels of"
+                + " data_list[0] ({0})".format(channels))
+
+    offsets = np.zeros(len(data_list) + 1, dtype=np.int64)
+    np.cumsum([data.shape[0] for data in data_list], out=offsets[1:])
+
+    events = np.empty((offsets[-1], num_channels),
+                      dtype=np.result_type(*data_list))
+    channel_range = np.array(first._channel_table.range, dtype=np.float64)
+    for data, idx, start, stop in zip(data_list,
+                                      column_idx,
+                                      offsets[:-1],
+                                      offsets[1:]):
+        events[start:stop] = data.view(np.ndarray)[:,idx]
+        data_range = data._channel_table.range[idx]
+        channel_range[:,0] = np.fmin(channel_range[:,0], data_range[:,0])
+        channel_range[:,1] = np.fmax(channel_range[:,1], data_range[:,1])
+
+    # Share metadata with the first element, as views of it would
+    events = events.view(type(first))
+    events.__array_finalize__(first)
+    events._channel_table = first._channel_table.copy()
+    events._channel_table.range[:] = channel_range
+
+    return events, offsets
+
+###
+# Classes
+###
+
+class FCSFile(object):
+    """
+    Class representing an FCS flow cytometry data file.
+
+    This class parses a binary FCS file and exposes a read-only view
+    of the HEADER, TEXT, DATA, and ANALYSIS segments via Python-friendly
+    data structures.
+
+    Parameters
+    ----------
+    infile : str, bytes-like, or file-like
+        Reference to the associated FCS file. Paths ending in ``.gz``
+        are decompressed on the fly. In-memory buffers (``bytes``,
+        ``bytearray``, ``memoryview``, or ``io.BytesIO``) are read without
+        copying them. Members of zip archives can be read without
+        extracting them by passing the file-like object returned by
+        ``zipfile.ZipFile.open``.
+    mmap : bool, optional
+        Flag specifying to memory map the DATA segment instead of reading
+        it into memory. See ``read_fcs_data_segment`` for details.
+    data : bool, optional
+        Flag specifying whether to read the DATA segment. If False, only
+        the HEADER, TEXT, supplemental TEXT, and ANALYSIS segments are
+        parsed, and the `data` attribute is None.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to read from the DATA segment, specified by name ($PnN
+        keyword) or index. Columns of `data` follow the order of
+        `channels`. If None, read all channels.
+    events : slice or array-like of int or bool, optional
+        Events to read from the DATA segment, specified as a slice, as
+        indices, or as a boolean mask with one element per event. If None,
+        read all events.
+    subsample : int, optional
+        Number of events to randomly sample, without replacement, from
+        the events specified by `events`. Sampled events are read in their
+        original order. If None, or if larger than the number of available
+        events, no subsampling is performed.
+    seed : int, optional
+        Seed for the random number generator used for subsampling.
+
+    Attributes
+    ----------
+    infile : str or file-like
+        Reference to associated FCS file.
+    header : namedtuple
+        Version information and byte offset values of other FCS segments
+        in the following order:
+            - version : str
+            - text_begin : int
+            - text_end : int
+            - data_begin : int
+            - data_end : int
+            - analysis_begin : int
+            - analysis_end : int
+    text : dict
+        Dictionary of keyword-value entries from TEXT segment and optional
+        supplemental TEXT segment.
+    data : numpy array
+        Unwriteable NxD numpy array describing N cytometry events
+        observing D data dimensions. If `mmap` is True, `data` may be a
+        copy-on-write numpy memmap. If `channels`, `events`, or
+        `subsample` are specified, D and N are the number of selected
+        channels and events. None if the DATA segment was not read.
+    analysis : dict
+        Dictionary of keyword-value entries from ANALYSIS segment.
+
+    Raises
+    ------
+    NotImplementedError
+        If $MODE is not 'L'.
+    NotImplementedError
+        If $DATATYPE is not 'I', 'F', or 'D'.
+    NotImplementedError
+        If $DATATYPE is 'I' and any $PnB is larger than 64.
+    NotImplementedError
+        If $BYTEORD is not big endian ('4,3,2,1' or '2,1') or little
+        endian ('1,2,3,4', '1,2').
+    ValueError
+        If TEXT-like segment does not start with delimiter.
+    ValueError
+        If TEXT-like segment has odd number of total extracted keys and
+        values (indicating an unpaired key or value).
+    ValueError
+        If calculated DATA segment size (as determined from the number
+        of events, the number of parameters, and the number of bytes per
+        data point) does not match size specified in HEADER segment
+        offsets.
+    Warning
+        If more than one data set is detected in the same file.
+    Warning
+        If the ANALYSIS segment was not successfully parsed.
+    
+    Notes
+    -----
+    The Flow Cytometry Standard (FCS) describes the de facto standard
+    file format used by flow cytometry acquisition and analysis software
+    to record flow cytometry data to and load flow cytometry data from a
+    file. The standard dictates that each file must have the following
+    segments: HEADER, TEXT, and DATA. The HEADER segment contains
+    version information and byte offset values of other segments, the
+    TEXT segment contains delimited key-value pairs containing
+    acquisition information, and the DATA segment contains the recorded
+    flow cytometry data. The file may optionally have an ANALYSIS
+    segment (structurally identicaly to the TEXT segment), a
+    supplemental TEXT segment (according to more recent versions of the
+    standard), and user-defined OTHER segments.
+
+    This class supports a subset of the FCS3.1 standard which should be
+    backwards compatible with FCS3.0 and FCS2.0. The FCS file must be
+    of the following form:
+        - $MODE = 'L' (list mode; histogram mode is not supported).
+        - $DATATYPE = 'I' (unsigned binary integers), 'F' (single
+          precision floating point), or 'D' (double precision floating
+          point). 'A' (ASCII) is not supported.
+        - If $DATATYPE = 'I', $PnB <= 64 for all parameters (aka
+          channels). Parameters do not need to be byte aligned.
+        - $BYTEORD = '4,3,2,1' (big endian) or '1,2,3,4' (little
+          endian).
+        - Only the first data set of files with multiple data sets
+          ($NEXTDATA != 0) is read. Use `FCSDatasets` to read all data
+          sets.
+
+    For more information on the TEXT segment keywords (e.g. $MODE,
+    $DATATYPE, etc.), see [1]_, [2]_, and [3]_.
+
+    References
+    ----------
+    .. [1] P.N. Dean, C.B. Bagwell, T. Lindmo, R.F. Murphy, G.C. Salzman,
+       "Data file standard for flow cytometry. Data File Standards
+       Committee of the Society for Analytical Cytology," Cytometry vol
+       11, pp 323-332, 1990, PMID 2340769.
+
+    .. [2] L.C. Seamer, C.B. Bagwell, L. Barden, D. Redelman, G.C. Salzman,
+       J.C. Wood, R.F. Murphy, "Proposed new data file standard for flow
+       cytometry, version FCS 3.0," Cytometry vol 28, pp 118-122, 1997,
+       PMID 9181300.
+
+    .. [3] J. Spidlen, et al, "Data File Standard for Flow Cytometry,
+       version FCS 3.1," Cytometry A vol 77A, pp 97-100, 2009, PMID
+       19937951.
+
+    """
+    def __init__(self,
+                 infile,
+                 mmap=False,
+                 data=True,
+                 channels=None,
+                 events=None,
+                 subsample=None,
+                 seed=None):
+        
+        self._infile = infile
+
+        f = _open_fcs(infile)
+
+        self._header, self._text, delim = _read_fcs_text(buf=f)
+
+        if int(self._text['$NEXTDATA']):
+            warnings.warn("detected (and ignoring) additional data set"
+                + " ($NEXTDATA = {0}); use FCSDatasets to read".format(
+                    self._text['$NEXTDATA'])
+                + " all data sets")
+
+        self._analysis = _read_fcs_analysis(buf=f,
+                                            header=self._header,
+                                            text=self._text,
+                                            delim=delim)
+
+        # Import DATA segment
+        if channels is not None:
+            params = _channels_to_params(self._text, channels)
+        else:
+            params = None
+        if subsample is not None:
+            # Draw sorted random indices from the requested events
+            available = range(int(self._text['$TOT']))
+            if isinstance(events, slice):
+                available = available[events]
+            elif events is not None:
+                available = _event_indices(events, len(available))
+            if subsample < len(available):
+                random_state = np.random.RandomState(seed)
+                idx = random_state.choice(len(available),
+                                          size=int(subsample),
+                                          replace=False)
+                events = np.asarray(available)[np.sort(idx)]
+        if data:
+            self._data = _read_fcs_data(
+                buf=f,
+                header=self._header,
+                text=self._text,
+                mmap=mmap,
+                params=params,
+                events=events)
+            self._data.flags.writeable = False
+        else:
+            self._data = None
+
+        if f is not infile:
+            f.close()
+
+    # Expose attributes as read-only properties
+    @property
     def infile(self):
         """
         Reference to the associated FCS file.
@@ -779,7 +1914,8 @@ class FCSFile(object):
     def data(self):
         """
         Unwriteable NxD numpy array describing N cytometry events
-        observing D data dimensions.
+        observing D data dimensions, or None if the DATA segment was not
+        read.
 
         """
         return self._data
@@ -812,12 +1948,202 @@ class FCSFile(object):
         return hash((self.infile,
                      self.header,
                      frozenset(list(self.text.items())),
-                     self.data.tobytes(),
+                     self.data.tobytes() if self.data is not None else None,
                      frozenset(list(self.analysis.items()))))
 
     def __repr__(self):
         return str(self.infile)
 
+class _ChannelTable(object):
+    """
+    Channel-dependent information of an `FCSData` object.
+
+    Information is stored in a numpy structured array with one record per
+    channel, so that selecting channels is a single indexing operation.
+    Missing values of `amplification_type`, `detector_voltage`, and
+    `amplifier_gain` are stored as NaN.
+
+    Parameters
+    ----------
+    channels : sequence of str
+        Channel names.
+    amplification_type : sequence of tuple or None
+        Amplification type of each channel.
+    detector_voltage : sequence of float or None
+        Detector voltage of each channel.
+    amplifier_gain : sequence of float or None
+        Amplifier gain of each channel.
+    range : sequence of two-element sequences
+        Range of each channel.
+    resolution : sequence of int
+        Resolution of each channel.
+    params : sequence of int
+        Index (starting at zero) of each channel among the parameters of
+        the TEXT segment.
+
+    Notes
+    -----
+    Channel tables are shared between `FCSData` objects, and should not be
+    modified in place. Use ``copy`` to obtain a table that can be
+    modified.
+
+    """
+    __slots__ = ('_records', '_channels', '_index')
+
+    _dtype = np.dtype([('names', object),
+                       ('amplification_type', np.float64, (2,)),
+                       ('detector_voltage', np.float64),
+                       ('amplifier_gain', np.float64),
+                       ('range', np.float64, (2,)),
+                       ('resolution', np.int64),
+                       ('params', np.int64)])
+
+    def __init__(self,
+                 channels,
+                 amplification_type,
+                 detector_voltage,
+                 amplifier_gain,
+                 range,
+                 resolution,
+                 params):
+        records = np.empty(len(channels), dtype=self._dtype)
+        records['names'] = channels
+        records['amplification_type'] = [
+            at if at is not None else (np.nan, np.nan)
+            for at in amplification_type]
+        records['detector_voltage'] = [
+            dv if dv is not None else np.nan for dv in detector_voltage]
+        records['amplifier_gain'] = [
+            ag if ag is not None else np.nan for ag in amplifier_gain]
+        records['range'] = range
+        records['resolution'] = resolution
+        records['params'] = params
+        self._records = records
+        self._channels = None
+        self._index = None
+
+    @classmethod
+    def _from_records(cls, records):
+        """
+        Create a table from a structured array of channel records.
+
+        """
+        table = cls.__new__(cls)
+        table._records = records
+        table._channels = None
+        table._index = None
+        return table
+
+    @property
+    def channels(self):
+        """
+        Channel names, as a tuple.
+
+        """
+        if self._channels is None:
+            self._channels = tuple(self._records['names'].tolist())
+        return self._channels
+
+    @property
+    def index(self):
+        """
+        Dictionary mapping each channel name to its index.
+
+        If a name is repeated, it is mapped to its first occurrence.
+
+        """
+        if self._index is None:
+            channels = self.channels
+            self._index = dict(zip(reversed(channels),
+                                   range(len(channels) - 1, -1, -1)))
+        return self._index
+
+    @property
+    def range(self):
+        """
+        Nx2 array with the range of each channel.
+
+        """
+        return self._records['range']
+
+    @property
+    def params(self):
+        """
+        Index of each channel among the parameters of the TEXT segment.
+
+        """
+        return self._records['params']
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getstate__(self):
+        # Columns are pickled as lists, which are small and stay in-band
+        # with pickle protocol 5. Cached names and index are not pickled.
+        return {field: self._records[field].tolist()
+                for field in self._dtype.names}
+
+    def __setstate__(self, state):
+        records = np.empty(len(state['names']), dtype=self._dtype)
+        for field, values in state.items():
+            records[field] = values
+        self._records = records
+        self._channels = None
+        self._index = None
+
+    def take(self, key):
+        """
+        Select channels by index.
+
+        Parameters
+        ----------
+        key : slice, or list of int
+            Indices of the channels to select.
+
+        Returns
+        -------
+        _ChannelTable
+            Table with the selected channels, in the order of `key`.
+
+        """
+        return _ChannelTable._from_records(self._records[key])
+
+    def copy(self):
+        """
+        Return a copy of the table that can be modified.
+
+        """
+        return _ChannelTable._from_records(self._records.copy())
+
+    def value(self, field, idx):
+        """
+        Get the value of a field for one channel, as a python object.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field: 'amplification_type', 'detector_voltage',
+            'amplifier_gain', 'range', or 'resolution'.
+        idx : int
+            Index of the channel.
+
+        Returns
+        -------
+        value
+            Value in the format reported by the `FCSData` method of the
+            same name as `field`.
+
+        """
+        value = self._records[field][idx]
+        if field == 'amplification_type':
+            return None if np.isnan(value[0]) else tuple(value.tolist())
+        elif field in ('detector_voltage', 'amplifier_gain'):
+            return None if np.isnan(value) else float(value)
+        elif field == 'range':
+            return value.tolist()
+        else:
+            return int(value)
+
 class FCSData(np.ndarray):
     """
     Object containing events data from a flow cytometry sample.
@@ -836,8 +2162,38 @@ class FCSData(np.ndarray):
     
     Parameters
     ----------
-    infile : str or file-like
-        Reference to the associated FCS file.
+    infile : str, bytes-like, or file-like
+        Reference to the associated FCS file. Paths ending in ``.gz``
+        are decompressed on the fly. In-memory buffers (``bytes``,
+        ``bytearray``, ``memoryview``, or ``io.BytesIO``) are read without
+        copying them. Members of zip archives can be read without
+        extracting them by passing the file-like object returned by
+        ``zipfile.ZipFile.open``.
+    mmap : bool, optional
+        Flag specifying to keep events backed by the FCS file via a
+        copy-on-write memory map instead of reading them into memory.
+        Events are then loaded on demand, and several `FCSData` objects
+        can share the same pages of the operating system's file cache.
+        Writing to the `FCSData` object never modifies the FCS file. If
+        `infile` is an in-memory buffer, events are instead a read-only
+        view of it, and no data are copied. If `infile` is compressed,
+        events are read into memory.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to load, specified by name or index. Only these channels
+        are decoded from the DATA segment, and channel-dependent
+        information is restricted to them, in the order specified. If
+        None, load all channels.
+    events : slice or array-like of int or bool, optional
+        Events to load, specified as a slice, as indices, or as a boolean
+        mask with one element per event. Only these events are decoded
+        from the DATA segment. If None, load all events.
+    subsample : int, optional
+        Number of events to randomly sample, without replacement, from
+        the events specified by `events`. Sampled events are loaded in
+        their original order. If None, or if larger than the number of
+        available events, no subsampling is performed.
+    seed : int, optional
+        Seed for the random number generator used for subsampling.
 
     Attributes
     ----------
@@ -965,6 +2321,11 @@ class FCSData(np.ndarray):
         supplemental TEXT segment.
 
         """
+        # The dictionary may be shared with other FCSData objects until it
+        # is exposed. Copy it before exposing it, since it may be modified.
+        if '_text' not in self._exposed_metadata:
+            self._text = dict(self._text)
+            self._exposed_metadata += ('_text',)
         return self._text
 
     @property
@@ -973,6 +2334,11 @@ class FCSData(np.ndarray):
         Dictionary of key-value entries from the ANALYSIS segment.
 
         """
+        # The dictionary may be shared with other FCSData objects until it
+        # is exposed. Copy it before exposing it, since it may be modified.
+        if '_analysis' not in self._exposed_metadata:
+            self._analysis = dict(self._analysis)
+            self._exposed_metadata += ('_analysis',)
         return self._analysis
 
     @property
@@ -1066,7 +2432,7 @@ class FCSData(np.ndarray):
         The name of the channels contained in `FCSData`.
 
         """
-        return self._channels
+        return self._channel_table.channels
 
     def amplification_type(self, channels=None):
         """
@@ -1102,16 +2468,17 @@ class FCSData(np.ndarray):
         """
         # Check default
         if channels is None:
-            channels = self._channels
+            channels = self.channels
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
 
         # Get detector type of the specified channels
         if hasattr(channels, '__iter__'):
-            return [self._amplification_type[ch] for ch in channels]
+            return [self._channel_table.value('amplification_type', ch)
+                    for ch in channels]
         else:
-            return self._amplification_type[channels]
+            return self._channel_table.value('amplification_type', channels)
 
     def detector_voltage(self, channels=None):
         """
@@ -1137,16 +2504,17 @@ class FCSData(np.ndarray):
         """
         # Check default
         if channels is None:
-            channels = self._channels
+            channels = self.channels
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
 
         # Get detector type of the specified channels
         if hasattr(channels, '__iter__'):
-            return [self._detector_voltage[ch] for ch in channels]
+            return [self._channel_table.value('detector_voltage', ch)
+                    for ch in channels]
         else:
-            return self._detector_voltage[channels]
+            return self._channel_table.value('detector_voltage', channels)
 
     def amplifier_gain(self, channels=None):
         """
@@ -1172,16 +2540,17 @@ class FCSData(np.ndarray):
         """
         # Check default
         if channels is None:
-            channels = self._channels
+            channels = self.channels
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
 
         # Get detector type of the specified channels
         if hasattr(channels, '__iter__'):
-            return [self._amplifier_gain[ch] for ch in channels]
+            return [self._channel_table.value('amplifier_gain', ch)
+                    for ch in channels]
         else:
-            return self._amplifier_gain[channels]
+            return self._channel_table.value('amplifier_gain', channels)
 
     def range(self, channels=None):
         """
@@ -1213,16 +2582,17 @@ class FCSData(np.ndarray):
         """
         # Check default
         if channels is None:
-            channels = self._channels
+            channels = self.channels
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
 
         # Get the range of the specified channels
         if hasattr(channels, '__iter__'):
-            return [self._range[ch] for ch in channels]
+            return [self._channel_table.value('range', ch)
+                    for ch in channels]
         else:
-            return self._range[channels]
+            return self._channel_table.value('range', channels)
 
     def resolution(self, channels=None):
         """
@@ -1247,16 +2617,17 @@ class FCSData(np.ndarray):
         """
         # Check default
         if channels is None:
-            channels = self._channels
+            channels = self.channels
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
 
         # Get resolution of the specified channels
         if hasattr(channels, '__iter__'):
-            return [self._resolution[ch] for ch in channels]
+            return [self._channel_table.value('resolution', ch)
+                    for ch in channels]
         else:
-            return self._resolution[channels]
+            return self._channel_table.value('resolution', channels)
 
     def hist_bins(self, channels=None, nbins=None, scale='logicle', **kwargs):
         """
@@ -1323,7 +2694,7 @@ class FCSData(np.ndarray):
         """
         # Default: all channels
         if channels is None:
-            channels = list(self._channels)
+            channels = list(self.channels)
 
         # Get numerical indices of channels
         channels = self._name_to_index(channels)
@@ -1410,6 +2781,106 @@ class FCSData(np.ndarray):
 
         return bins
 
+    def time_index(self, t):
+        """
+        Get the index of the first event acquired at or after time(s) `t`.
+
+        Events are located by binary search on the time channel (channel
+        name is case independent), which should be nondecreasing.
+
+        Parameters
+        ----------
+        t : float or array-like
+            Time(s), in seconds, on the scale of ``self[:,'Time']*
+            time_step``. If `time_step` is None, `t` is in units of the
+            time channel.
+
+        Returns
+        -------
+        int or array of int
+            Index of the first event whose time is greater than or equal
+            to each element of `t`, or ``self.shape[0]`` if there is none.
+
+        Raises
+        ------
+        KeyError
+            If there is no time channel, or more than one, in the data.
+        ValueError
+            If an element of `t` is NaN.
+
+        Notes
+        -----
+        Events between times ``t[i]`` and ``t[i+1]`` can be selected
+        without copying via ``self[idx[i]:idx[i+1]]``, where ``idx =
+        self.time_index(t)``. Locating k windows this way takes O(k log
+        N) operations, as opposed to O(k N) when masking all events for
+        each window.
+
+        """
+        time_channel_idx = [idx
+                            for idx, channel in enumerate(self.channels)
+                            if channel.lower() == 'time']
+        if len(time_channel_idx) != 1:
+            raise KeyError("data should have exactly one time channel"
+                + " (found {0})".format(len(time_channel_idx)))
+        time = self.view(np.ndarray)[:,time_channel_idx[0]]
+
+        # Convert times to units of the time channel
+        t = np.asarray(t, dtype=np.float64)
+        if np.any(np.isnan(t)):
+            raise ValueError("t should not be NaN")
+        if self.time_step is not None:
+            t = t/self.time_step
+
+        # Searching for values with the same type as the time channel
+        # avoids converting the whole channel. Values are rounded up, so
+        # that an event is at or after t if and only if it is at or after
+        # its rounded value.
+        dtype = time.dtype
+        if dtype.kind in 'ui':
+            info = np.iinfo(dtype)
+            after_all = t > info.max
+            key = np.clip(np.ceil(t), info.min, info.max).astype(dtype)
+        else:
+            after_all = np.zeros(t.shape, dtype=bool)
+            key = t.astype(dtype)
+            key = np.where(key < t, np.nextafter(key, dtype.type(np.inf)),
+                           key)
+        idx = np.searchsorted(time, key.astype(dtype), side='left')
+        idx = np.where(after_all, self.shape[0], idx)
+
+        return int(idx) if idx.ndim == 0 else idx
+
+    def time_slice(self, t0, t1):
+        """
+        Select the events acquired within a time window.
+
+        Parameters
+        ----------
+        t0, t1 : float
+            Start and end of the time window, in seconds, on the scale of
+            ``self[:,'Time']*time_step``. Events with times in [`t0`,
+            `t1`) are selected. If `time_step` is None, `t0` and `t1` are
+            in units of the time channel.
+
+        Returns
+        -------
+        FCSData
+            View of the selected events.
+
+        Raises
+        ------
+        KeyError
+            If there is no time channel, or more than one, in the data.
+
+        See Also
+        --------
+        time_index
+
+        """
+        i0, i1 = self.time_index([t0, t1])
+        return self[i0:max(i0, i1)]
+
     ###
     # Functions overriding inherited np.ndarray functions
     ###
@@ -1419,10 +2890,203 @@ class FCSData(np.ndarray):
 
     # Functions involved in the creation of new arrays
 
-    def __new__(cls, infile):
+    def __new__(cls,
+                infile,
+                mmap=False,
+                channels=None,
+                events=None,
+                subsample=None,
+                seed=None):
 
         # Load FCS file
-        fcs_file = FCSFile(infile)
+        fcs_file = FCSFile(infile,
+                           mmap=mmap,
+                           channels=channels,
+                           events=events,
+                           subsample=subsample,
+                           seed=seed)
+
+        return cls._new_from_data(data=fcs_file.data,
+                                  infile=infile,
+                                  text=fcs_file.text,
+                                  analysis=fcs_file.analysis,
+                                  channels=channels)
+
+    @classmethod
+    def _new_from_data(cls, data, infile, text, analysis, channels=None):
+        """
+        Create an `FCSData` object from events and FCS file segments.
+
+        Parameters
+        ----------
+        data : numpy array
+            NxD numpy array with the events of the channels in `channels`.
+        infile : str or file-like
+            Reference to the associated FCS file.
+        text : dict
+            Dictionary of keyword-value entries from the TEXT segment and
+            optional supplemental TEXT segment.
+        analysis : dict
+            Dictionary of keyword-value entries from the ANALYSIS segment.
+        channels : int, str, list of int, list of str, optional
+            Channel(s) contained in `data`. If None, `data` contains all
+            channels.
+
+        Returns
+        -------
+        FCSData
+            `FCSData` object viewing `data`.
+
+        """
+        # Parse acquisition and channel information from TEXT segment
+        metadata = cls._parse_metadata(text, channels=channels)
+        if channels is not None:
+            params = _channels_to_params(text, channels)
+        else:
+            params = range(int(text['$PAR']))
+
+        # Change writeable flag of data. Views of in-memory buffers are
+        # kept read-only, so that the buffer is never modified.
+        try:
+            data.flags.writeable = True
+        except ValueError:
+            pass
+        obj = data.view(cls)
+
+        # Add FCS file attributes
+        obj._infile = infile
+        obj._text = text
+        obj._analysis = analysis
+        obj._exposed_metadata = ()
+
+        # Add channel-independent attributes
+        obj._data_type = metadata['data_type']
+        obj._time_step = metadata['time_step']
+        obj._acquisition_start_time = metadata['acquisition_start_time']
+        obj._acquisition_end_time = metadata['acquisition_end_time']
+
+        # Add channel-dependent attributes
+        obj._channel_table = _ChannelTable(
+            channels=metadata['channels'],
+            amplification_type=metadata['amplification_type'],
+            detector_voltage=metadata['detector_voltage'],
+            amplifier_gain=metadata['amplifier_gain'],
+            range=metadata['range'],
+            resolution=metadata['resolution'],
+            params=params)
+
+        return obj
+
+    def __array_finalize__(self, obj):
+        """
+        Method called after all methods of construction of the class.
+
+        """
+        # If called from explicit constructor, do nothing.
+        if obj is None: return
+
+        # Otherwise, share attributes with "parent". Metadata attributes are
+        # never modified in place by FCSData, so views, copies, and ufunc
+        # outputs can point to the same objects. The exception are the TEXT
+        # and ANALYSIS dictionaries that have been exposed to the user via
+        # the ``text`` and ``analysis`` properties, which may have been
+        # modified, and are therefore copied.
+        exposed = getattr(obj, '_exposed_metadata', ())
+        self._exposed_metadata = ()
+
+        # FCS file attributes
+        self._infile = getattr(obj, '_infile', None)
+        if hasattr(obj, '_text'):
+            self._text = dict(obj._text) if '_text' in exposed \
+                else obj._text
+        if hasattr(obj, '_analysis'):
+            self._analysis = dict(obj._analysis) if '_analysis' in exposed \
+                else obj._analysis
+
+        # Channel-independent attributes
+        if hasattr(obj, '_data_type'):
+            self._data_type = obj._data_type
+        if hasattr(obj, '_time_step'):
+            self._time_step = obj._time_step
+        if hasattr(obj, '_acquisition_start_time'):
+            self._acquisition_start_time = obj._acquisition_start_time
+        if hasattr(obj, '_acquisition_end_time'):
+            self._acquisition_end_time = obj._acquisition_end_time
+
+        # Channel-dependent attributes
+        if hasattr(obj, '_channel_table'):
+            self._channel_table = obj._channel_table
+
+    # Attributes that contain metadata, and which are restored when
+    # unpickling.
+    _metadata_attrs = ('_infile',
+                       '_text',
+                       '_analysis',
+                       '_data_type',
+                       '_time_step',
+                       '_acquisition_start_time',
+                       '_acquisition_end_time',
+                       '_channel_table')
+
+    def _get_metadata_state(self):
+        """
+        Get metadata attributes as a picklable dictionary.
+
+        References to file-like objects in `infile` are not picklable and
+        are replaced by None.
+
+        """
+        state = {attr: getattr(self, attr)
+                 for attr in self._metadata_attrs
+                 if hasattr(self, attr)}
+        if not isinstance(state.get('_infile'), str):
+            state['_infile'] = None
+        return state
+
+    def __reduce_ex__(self, protocol):
+        """
+        Support pickling of `FCSData` objects, including metadata.
+
+        Events are pickled as a regular numpy array, which allows them to
+        be transferred out-of-band with pickle protocol 5 (see PEP 574).
+
+        """
+        return (_fcs_data_from_state,
+                (self.view(np.ndarray), self._get_metadata_state()))
+
+    def __reduce__(self):
+        return self.__reduce_ex__(2)
+
+    # Helper functions
+    @classmethod
+    def _parse_metadata(cls, text, channels=None):
+        """
+        Parse acquisition and channel information from a TEXT segment.
+
+        Parameters
+        ----------
+        text : dict
+            Dictionary of keyword-value entries from the TEXT segment and
+            optional supplemental TEXT segment of an FCS file.
+        channels : int, str, list of int, list of str, optional
+            Channel(s) for which to return channel-dependent information,
+            in the order specified. If None, use all channels.
+
+        Returns
+        -------
+        metadata : dict
+            Dictionary with keys 'data_type', 'time_step',
+            'acquisition_start_time', 'acquisition_end_time', 'channels',
+            'amplification_type', 'detector_voltage', 'amplifier_gain',
+            'range', and 'resolution', containing the values exposed by
+            the `FCSData` attributes and methods of the same name.
+
+        """
+        # Get numerical indices of the specified channels
+        if channels is not None:
+            params = _channels_to_params(text, channels)
+        else:
+            params = None
 
         ###
         # Channel-independent information
@@ -1432,24 +3096,24 @@ class FCSData(np.ndarray):
         # FCS-Standard files store the time step in the $TIMESTEP keyword.
         # In CellQuest Pro's FCS2.0, the TIMETICKS keyword parameter contains
         # the time step in milliseconds.
-        if '$TIMESTEP' in fcs_file.text:
-            time_step = float(fcs_file.text['$TIMESTEP'])
-        elif 'TIMETICKS' in fcs_file.text:
-            time_step = float(fcs_file.text['TIMETICKS'])/1000.
+        if '$TIMESTEP' in text:
+            time_step = float(text['$TIMESTEP'])
+        elif 'TIMETICKS' in text:
+            time_step = float(text['TIMETICKS'])/1000.
         else:
             time_step = None
 
         # Data type
-        data_type = fcs_file.text.get('$DATATYPE')
+        data_type = text.get('$DATATYPE')
 
         # Extract the acquisition date.
-        acquisition_date = cls._parse_date_string(fcs_file.text.get('$DATE'))
+        acquisition_date = cls._parse_date_string(text.get('$DATE'))
 
         # Extract the times of start and end of acquisition time.
         acquisition_start_time = cls._parse_time_string(
-            fcs_file.text.get('$BTIM'))
+            text.get('$BTIM'))
         acquisition_end_time = cls._parse_time_string(
-            fcs_file.text.get('$ETIM'))
+            text.get('$ETIM'))
 
         # If date information was available, add to acquisition_start_time and
         # acquisition_end_time.
@@ -1468,10 +3132,10 @@ class FCSData(np.ndarray):
         ###
 
         # Number of channels: Stored in the $PAR keyword parameter
-        num_channels = int(fcs_file.text['$PAR'])
+        num_channels = int(text['$PAR'])
 
         # Channel names: Stored in the keyword parameter $PnN for channel n.
-        channels = [fcs_file.text.get('$P{}N'.format(i))
+        channels = [text.get('$P{}N'.format(i))
                     for i in range(1, num_channels + 1)]
         channels = tuple(channels)
 
@@ -1487,7 +3151,7 @@ class FCSData(np.ndarray):
         # value is one in this case.
         amplification_type = []
         for i in range(1, num_channels + 1):
-            ati = fcs_file.text.get('$P{}E'.format(i))
+            ati = text.get('$P{}E'.format(i))
             if ati is not None:
                 # Separate by comma and convert to float
                 ati = ati.split(',')
@@ -1506,7 +3170,7 @@ class FCSData(np.ndarray):
         data_range = []
         resolution = []
         for ch_idx, ch in enumerate(channels):
-            PnR = float(fcs_file.text.get('$P{}R'.format(ch_idx + 1)))
+            PnR = float(text.get('$P{}R'.format(ch_idx + 1)))
             data_range.append([0., PnR - 1])
             resolution.append(int(PnR))
         resolution = tuple(resolution)
@@ -1514,15 +3178,15 @@ class FCSData(np.ndarray):
         # Detector voltage: Stored in the keyword parameter $PnV for channel n.
         detector_voltage = []
         for i in range(1, num_channels + 1):
-            channel_detector_voltage = fcs_file.text.get('$P{}V'.format(i))
+            channel_detector_voltage = text.get('$P{}V'.format(i))
 
             # The CellQuest Pro software saves the detector voltage in keyword
             # parameters BD$WORD13, BD$WORD14, BD$WORD15... for channels 1, 2,
             # 3...
-            if channel_detector_voltage is None and 'CREATOR' in fcs_file.text \
-                   and 'CellQuest Pro' in fcs_file.text.get('CREATOR'):
-                channel_detector_voltage = fcs_file.text.get('BD$WORD{}' \
-                                                             .format(12+i))
+            if channel_detector_voltage is None and 'CREATOR' in text \
+                   and 'CellQuest Pro' in text.get('CREATOR'):
+                channel_detector_voltage = text.get('BD$WORD{}' \
+                                                    .format(12+i))
 
             # Attempt to cast extracted value to float
             # The FCS3.1 standard restricts $PnV to be a floating-point value
@@ -1533,100 +3197,54 @@ class FCSData(np.ndarray):
                 except ValueError:
                     channel_detector_voltage = None
             detector_voltage.append(channel_detector_voltage)
-        detector_voltage = tuple(detector_voltage)
-
-        # Amplifier gain: Stored in the keyword parameter $PnG for channel n.
-        amplifier_gain = []
-        for i in range(1, num_channels + 1):
-            channel_amp_gain = fcs_file.text.get('$P{}G'.format(i))
-
-            # The FlowJo Collector's Edition version 7.5.110.7 software saves
-            # the amplifier gain in keyword parameters CytekP01G, CytekP02G,
-            # CytekP03G, ... for channels 1, 2, 3, ...
-            if channel_amp_gain is None and 'CREATOR' in fcs_file.text and \
-                    'FlowJoCollectorsEdition' in fcs_file.text.get('CREATOR'):
-                channel_amp_gain = fcs_file.text.get('CytekP{:02d}G'.format(i))
-
-            # Attempt to cast extracted value to float
-            # The FCS3.1 standard restricts $PnG to be a floating-point value
-            # only. Any value that cannot be casted will be replaced with None.
-            if channel_amp_gain is not None:
-                try:
-                    channel_amp_gain = float(channel_amp_gain)
-                except ValueError:
-                    channel_amp_gain = None
-            amplifier_gain.append(channel_amp_gain)
-        amplifier_gain = tuple(amplifier_gain)
-
-        # Get data from fcs_file object, and change writeable flag.
-        data = fcs_file.data
-        data.flags.writeable = True
-        obj = data.view(cls)
-
-        # Add FCS file attributes
-        obj._infile = infile
-        obj._text = fcs_file.text
-        obj._analysis = fcs_file.analysis
-
-        # Add channel-independent attributes
-        obj._data_type = data_type
-        obj._time_step = time_step
-        obj._acquisition_start_time = acquisition_start_time
-        obj._acquisition_end_time = acquisition_end_time
-
-        # Add channel-dependent attributes
-        obj._channels = channels
-        obj._amplification_type = amplification_type
-        obj._detector_voltage = detector_voltage
-        obj._amplifier_gain = amplifier_gain
-        obj._range = data_range
-        obj._resolution = resolution
-
-        return obj
-
-    def __array_finalize__(self, obj):
-        """
-        Method called after all methods of construction of the class.
-
-        """
-        # If called from explicit constructor, do nothing.
-        if obj is None: return
+        detector_voltage = tuple(detector_voltage)
 
-        # Otherwise, copy attributes from "parent"
-        # FCS file attributes
-        self._infile = getattr(obj, '_infile', None)
-        if hasattr(obj, '_text'):
-            self._text = copy.deepcopy(obj._text)
-        if hasattr(obj, '_analysis'):
-            self._analysis = copy.deepcopy(obj._analysis)
+        # Amplifier gain: Stored in the keyword parameter $PnG for channel n.
+        amplifier_gain = []
+        for i in range(1, num_channels + 1):
+            channel_amp_gain = text.get('$P{}G'.format(i))
 
-        # Channel-independent attributes
-        if hasattr(obj, '_data_type'):
-            self._data_type = copy.deepcopy(obj._data_type)
-        if hasattr(obj, '_time_step'):
-            self._time_step = copy.deepcopy(obj._time_step)
-        if hasattr(obj, '_acquisition_start_time'):
-            self._acquisition_start_time = copy.deepcopy(
-                obj._acquisition_start_time)
-        if hasattr(obj, '_acquisition_end_time'):
-            self._acquisition_end_time = copy.deepcopy(
-                obj._acquisition_end_time)
+            # The FlowJo Collector's Edition version 7.5.110.7 software saves
+            # the amplifier gain in keyword parameters CytekP01G, CytekP02G,
+            # CytekP03G, ... for channels 1, 2, 3, ...
+            if channel_amp_gain is None and 'CREATOR' in text and \
+                    'FlowJoCollectorsEdition' in text.get('CREATOR'):
+                channel_amp_gain = text.get('CytekP{:02d}G'.format(i))
 
-        # Channel-dependent attributes
-        if hasattr(obj, '_channels'):
-            self._channels = copy.deepcopy(obj._channels)
-        if hasattr(obj, '_amplification_type'):
-            self._amplification_type = copy.deepcopy(obj._amplification_type)
-        if hasattr(obj, '_detector_voltage'):
-            self._detector_voltage = copy.deepcopy(obj._detector_voltage)
-        if hasattr(obj, '_amplifier_gain'):
-            self._amplifier_gain = copy.deepcopy(obj._amplifier_gain)
-        if hasattr(obj, '_range'):
-            self._range = copy.deepcopy(obj._range)
-        if hasattr(obj, '_resolution'):
-            self._resolution = copy.deepcopy(obj._resolution)
+            # Attempt to cast extracted value to float
+            # The FCS3.1 standard restricts $PnG to be a floating-point value
+            # only. Any value that cannot be casted will be replaced with None.
+            if channel_amp_gain is not None:
+                try:
+                    channel_amp_gain = float(channel_amp_gain)
+                except ValueError:
+                    channel_amp_gain = None
+            amplifier_gain.append(channel_amp_gain)
+        amplifier_gain = tuple(amplifier_gain)
+
+        # Retain information from the specified channels only
+        if params is not None:
+            channels = tuple([channels[p] for p in params])
+            amplification_type = tuple([amplification_type[p]
+                                        for p in params])
+            detector_voltage = tuple([detector_voltage[p] for p in params])
+            amplifier_gain = tuple([amplifier_gain[p] for p in params])
+            data_range = [data_range[p] for p in params]
+            resolution = tuple([resolution[p] for p in params])
+
+        return {
+            'data_type': data_type,
+            'time_step': time_step,
+            'acquisition_start_time': acquisition_start_time,
+            'acquisition_end_time': acquisition_end_time,
+            'channels': channels,
+            'amplification_type': amplification_type,
+            'detector_voltage': detector_voltage,
+            'amplifier_gain': amplifier_gain,
+            'range': data_range,
+            'resolution': resolution,
+            }
 
-    # Helper functions
     @staticmethod
     def _parse_time_string(time_str):
         """
@@ -1761,21 +3379,37 @@ class FCSData(np.ndarray):
             Numerical index(ces) of the specified channels.
 
         """
-        # Check if list, then run recursively
-        if hasattr(channels, '__iter__'):
-            return [self._name_to_index(ch) for ch in channels]
+        index = self._channel_table.index
+        num_channels = len(self._channel_table)
+
+        # Check if list. Lists of channel names and integers are converted
+        # in a single loop. Nested iterables are converted recursively.
+        if hasattr(channels, '__iter__') and not isinstance(channels, str):
+            indices = []
+            for ch in channels:
+                if isinstance(ch, str):
+                    if ch not in index:
+                        raise ValueError("{} is not a valid channel name."
+                            .format(ch))
+                    indices.append(index[ch])
+                elif isinstance(ch, int) \
+                        and ch < num_channels and ch >= -num_channels:
+                    indices.append(ch)
+                else:
+                    indices.append(self._name_to_index(ch))
+            return indices
 
         if isinstance(channels, str):
             # channels is a string containing a channel name
-            if channels in self.channels:
-                return self.channels.index(channels)
+            if channels in index:
+                return index[channels]
             else:
                 raise ValueError("{} is not a valid channel name."
                     .format(channels))
 
         if isinstance(channels, int):
-            if (channels < len(self.channels)
-                    and channels >= -len(self.channels)):
+            if (channels < num_channels
+                    and channels >= -num_channels):
                 return channels
             else:
                 raise ValueError("index out of range")
@@ -1833,43 +3467,13 @@ class FCSData(np.ndarray):
                 return new_arr
 
             # Finally, slice channel-dependent attributes
-            if hasattr(key_channel, '__iter__'):
-                new_arr._channels = tuple(
-                    [new_arr._channels[kc] for kc in key_channel])
-                new_arr._amplification_type = tuple(
-                    [new_arr._amplification_type[kc] for kc in key_channel])
-                new_arr._detector_voltage = tuple(
-                    [new_arr._detector_voltage[kc] for kc in key_channel])
-                new_arr._amplifier_gain = tuple(
-                    [new_arr._amplifier_gain[kc] for kc in key_channel])
-                new_arr._range = \
-                    [new_arr._range[kc] for kc in key_channel]
-                new_arr._resolution = tuple(\
-                    [new_arr._resolution[kc] for kc in key_channel])
-            elif isinstance(key_channel, slice):
-                new_arr._channels = new_arr._channels[key_channel]
-                new_arr._amplification_type = \
-                    new_arr._amplification_type[key_channel]
-                new_arr._detector_voltage = \
-                    new_arr._detector_voltage[key_channel]
-                new_arr._amplifier_gain = \
-                    new_arr._amplifier_gain[key_channel]
-                new_arr._range = \
-                    new_arr._range[key_channel]
-                new_arr._resolution = \
-                    new_arr._resolution[key_channel]
+            if hasattr(key_channel, '__iter__') \
+                    or isinstance(key_channel, slice):
+                new_arr._channel_table = \
+                    new_arr._channel_table.take(key_channel)
             else:
-                new_arr._channels = tuple([new_arr._channels[key_channel]])
-                new_arr._amplification_type = \
-                    tuple([new_arr._amplification_type[key_channel]])
-                new_arr._detector_voltage = \
-                    tuple([new_arr._detector_voltage[key_channel]])
-                new_arr._amplifier_gain = \
-                    tuple([new_arr._amplifier_gain[key_channel]])
-                new_arr._range = \
-                    [new_arr._range[key_channel]]
-                new_arr._resolution = \
-                    tuple([new_arr._resolution[key_channel]])
+                new_arr._channel_table = \
+                    new_arr._channel_table.take([key_channel])
 
         elif isinstance(key, tuple) and len(key) == 2 \
             and (key[0] is None or key[1] is None):
@@ -1926,3 +3530,782 @@ class FCSData(np.ndarray):
 
         """
         return os.path.basename(str(self.infile))
+
+def _fcs_data_from_state(data, state):
+    """
+    Create an `FCSData` object from events and metadata attributes.
+
+    Used to unpickle `FCSData` objects.
+
+    """
+    obj = data.view(FCSData)
+    for attr, value in state.items():
+        setattr(obj, attr, value)
+    return obj
+
+class SharedFCSData(object):
+    """
+    Events of an `FCSData` object in shared memory.
+
+    A `SharedFCSData` object copies the events of an `FCSData` object into
+    a ``multiprocessing.shared_memory`` block once. The object itself is
+    cheap to pickle, since it only contains the name of the shared memory
+    block and the object's metadata, and can be passed to worker processes
+    which obtain an `FCSData` object viewing the shared events with
+    ``attach``, without copying them.
+
+    Parameters
+    ----------
+    data : FCSData
+        Object to share.
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block.
+
+    Notes
+    -----
+    The process that creates a `SharedFCSData` object owns the shared
+    memory block, and should free it with ``unlink`` once no process
+    needs it anymore. A `SharedFCSData` object can also be used as a
+    context manager, which unlinks the block on exit in the owner process.
+
+    Objects returned by ``attach`` should not be used after ``close`` or
+    ``unlink`` are called in the same process. Worker processes should be
+    started by the owner process (e.g. via ``multiprocessing.Pool``), so
+    that they share its resource tracker.
+
+    Requires Python 3.8 or later.
+
+    """
+    def __init__(self, data):
+        from multiprocessing import shared_memory
+
+        events = np.asarray(data)
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=max(events.nbytes, 1))
+        self._owner = True
+        self._name = self._shm.name
+        self._shape = events.shape
+        self._dtype = events.dtype
+        self._state = data._get_metadata_state()
+
+        shared_events = np.ndarray(self._shape,
+                                   dtype=self._dtype,
+                                   buffer=self._shm.buf)
+        shared_events[...] = events
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory block.
+
+        """
+        return self._name
+
+    def __getstate__(self):
+        # Only the owner should unlink the shared memory block, and each
+        # process should open it independently.
+        return {'name': self._name,
+                'shape': self._shape,
+                'dtype': self._dtype,
+                'state': self._state}
+
+    def __setstate__(self, state):
+        self._shm = None
+        self._owner = False
+        self._name = state['name']
+        self._shape = state['shape']
+        self._dtype = state['dtype']
+        self._state = state['state']
+
+    def attach(self):
+        """
+        Get an `FCSData` object viewing the shared events.
+
+        Returns
+        -------
+        FCSData
+            Object with the shared events and the metadata of the original
+            object. Modifications to its events are visible from all
+            processes.
+
+        """
+        if self._shm is None:
+            from multiprocessing import shared_memory
+            self._shm = shared_memory.SharedMemory(name=self._name)
+
+        events = np.ndarray(self._shape,
+                            dtype=self._dtype,
+                            buffer=self._shm.buf)
+        return _fcs_data_from_state(events, dict(self._state))
+
+    def close(self):
+        """
+        Close access to the shared memory block from this process.
+
+        """
+        if self._shm is not None:
+            self._shm.close()
+            if not self._owner:
+                self._shm = None
+
+    def unlink(self):
+        """
+        Free the shared memory block. Only called by the owner.
+
+        """
+        if self._owner:
+            self.close()
+            self._shm.unlink()
+            self._owner = False
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
+
+class FCSDatasets(object):
+    """
+    Index of the data sets contained in an FCS file.
+
+    An FCS file may contain several data sets, each with its own HEADER,
+    TEXT, DATA, and optional ANALYSIS segments. The offset to the next
+    data set, relative to the HEADER segment of the current one, is
+    specified by the $NEXTDATA keyword. An `FCSDatasets` object follows
+    this chain, reading only the HEADER and TEXT segments of each data
+    set, and then loads data sets as `FCSData` objects on access.
+
+    Parameters
+    ----------
+    infile : str or file-like
+        Reference to the associated FCS file.
+    mmap : bool, optional
+        Flag specifying to keep events of loaded data sets backed by the
+        FCS file via a copy-on-write memory map. See `FCSData`.
+    channels : int, str, list of int, list of str, optional
+        Channel(s) to load from each data set, specified by name or index.
+        If None, load all channels.
+
+    Attributes
+    ----------
+    infile : str or file-like
+        Reference to associated FCS file.
+    index : list of namedtuple
+        Location and size of each data set, in file order, with the
+        following fields:
+            - offset : int
+            - header : namedtuple
+            - text : dict
+            - num_events : int
+            - num_channels : int
+        `offset` is the offset (in bytes) of the HEADER segment of the
+        data set within the file, and all offsets in `header` are relative
+        to it. `num_events` and `num_channels` are given by $TOT and $PAR.
+
+    Raises
+    ------
+    ValueError
+        If $NEXTDATA of a data set is negative.
+
+    Notes
+    -----
+    All restrictions on the FCS file format and the Exceptions specified
+    for `FCSFile` apply to each data set.
+
+    Data sets are read from the file every time they are accessed, and
+    are not kept in memory by the `FCSDatasets` object. Data sets can be
+    accessed by indexing (``datasets[i]``), by slicing, which returns a
+    list of `FCSData` objects, or by iterating.
+
+    """
+    def __init__(self, infile, mmap=False, channels=None):
+
+        self._infile = infile
+        self._mmap = mmap
+        self._channels = channels
+
+        FCSDataset = collections.namedtuple(
+            'FCSDataset',
+            ['offset', 'header', 'text', 'num_events', 'num_channels'])
+
+        f = _open_fcs(infile)
+
+        try:
+            self._index = []
+            self._delims = []
+            offset = 0
+            while True:
+                header, text, delim = _read_fcs_text(buf=f, offset=offset)
+                self._index.append(FCSDataset(
+                    offset=offset,
+                    header=header,
+                    text=text,
+                    num_events=int(text['$TOT']),
+                    num_channels=int(text['$PAR'])))
+                self._delims.append(delim)
+
+                nextdata = int(text['$NEXTDATA'])
+                if not nextdata:
+                    break
+                if nextdata < 0:
+                    raise ValueError("invalid $NEXTDATA = {0} in data".format(
+                        text['$NEXTDATA']) + " set at offset {0}".format(
+                        offset))
+                offset += nextdata
+        finally:
+            if f is not infile:
+                f.close()
+
+    @property
+    def infile(self):
+        """
+        Reference to the associated FCS file.
+
+        """
+        return self._infile
+
+    @property
+    def index(self):
+        """
+        Location and size of each data set.
+
+        """
+        return self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, key):
+        """
+        Load data set `key` as an `FCSData` object.
+
+        If `key` is a slice, the selected data sets are loaded as a list of
+        `FCSData` objects.
+
+        """
+        if isinstance(key, slice):
+            return [self[i] for i in range(len(self))[key]]
+
+        dataset = self._index[key]
+
+        f = _open_fcs(self._infile)
+
+        # Mutable attributes should not be shared with the index
+        text = dict(dataset.text)
+
+        try:
+            analysis = _read_fcs_analysis(buf=f,
+                                          header=dataset.header,
+                                          text=text,
+                                          delim=self._delims[key],
+                                          offset=dataset.offset)
+            if self._channels is not None:
+                params = _channels_to_params(text, self._channels)
+            else:
+                params = None
+            data = _read_fcs_data(buf=f,
+                                  header=dataset.header,
+                                  text=text,
+                                  mmap=self._mmap,
+                                  params=params,
+                                  offset=dataset.offset)
+        finally:
+            if f is not self._infile:
+                f.close()
+
+        return FCSData._new_from_data(data=data,
+                                      infile=self._infile,
+                                      text=text,
+                                      analysis=analysis,
+                                      channels=self._channels)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "{0}({1!r}, {2} data sets)".format(
+            self.__class__.__name__, self._infile, len(self))
+
+class FCSCache(object):
+    """
+    On-disk cache of decoded FCS files.
+
+    The first time an FCS file is loaded through an `FCSCache` object, its
+    events are decoded as usual and stored as a ``.npy`` file in the cache
+    directory, together with a JSON file containing its TEXT and ANALYSIS
+    segments. Subsequent loads of the same file memory map the ``.npy``
+    file and parse acquisition and channel information from the stored
+    TEXT segment, without reading the FCS file.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory in which to store cached files. Created if it does not
+        exist.
+    max_size : int, optional
+        Maximum total size (in bytes) of cached files. When exceeded, the
+        least recently used files are evicted.
+    content_hash : bool, optional
+        Whether to include a hash of the contents of the FCS file in the
+        cache key. If False, the cache key is derived from the absolute
+        path, size, and modification time of the FCS file only.
+
+    Notes
+    -----
+    Only FCS files specified by path can be cached. Only the first data
+    set of files with multiple data sets is cached (see `FCSFile`).
+
+    Files in the cache directory are written atomically, so several
+    processes can share a cache directory. Recency of use is tracked via
+    the modification time of the JSON files, which is updated on every
+    cache hit.
+
+    """
+    def __init__(self, cache_dir, max_size=2**30, content_hash=False):
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._content_hash = content_hash
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    @property
+    def cache_dir(self):
+        """
+        Directory in which cached files are stored.
+
+        """
+        return self._cache_dir
+
+    @property
+    def max_size(self):
+        """
+        Maximum total size (in bytes) of cached files.
+
+        """
+        return self._max_size
+
+    @property
+    def size(self):
+        """
+        Current total size (in bytes) of cached files.
+
+        """
+        return sum(entry[1] for entry in self._entries())
+
+    def key(self, infile):
+        """
+        Compute the cache key of an FCS file.
+
+        Parameters
+        ----------
+        infile : str
+            Path to the FCS file.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest of the absolute path, size, modification
+            time, and (if `content_hash` is True) contents of the file.
+
+        """
+        if not isinstance(infile, str):
+            raise ValueError("only FCS files specified by path can be"
+                + " cached")
+        path = os.path.abspath(infile)
+        st = os.stat(path)
+        h = hashlib.sha1()
+        h.update(path.encode('utf-8'))
+        h.update('{0}:{1}'.format(st.st_size, st.st_mtime_ns).encode())
+        if self._content_hash:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(2**20), b''):
+                    h.update(block)
+        return h.hexdigest()
+
+    def load(self, infile):
+        """
+        Load an FCS file, using the cache if possible.
+
+        Parameters
+        ----------
+        infile : str
+            Path to the FCS file.
+
+        Returns
+        -------
+        FCSData
+            Events and metadata of `infile`. Events loaded from the cache
+            are backed by a copy-on-write memory map of the cached file.
+
+        """
+        key = self.key(infile)
+        data_path = os.path.join(self._cache_dir, key + '.npy')
+        meta_path = os.path.join(self._cache_dir, key + '.json')
+
+        # Attempt to load from cache. Entries may have been evicted by
+        # another process at any time.
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            data = np.load(data_path, mmap_mode='c')
+        except (IOError, OSError, ValueError):
+            pass
+        else:
+            os.utime(meta_path, None)
+            return FCSData._new_from_data(data=data,
+                                          infile=infile,
+                                          text=meta['text'],
+                                          analysis=meta['analysis'])
+
+        # Load FCS file and store it in cache
+        fcs_data = FCSData(infile)
+        data_size = fcs_data.nbytes
+        if data_size <= self._max_size:
+            self._evict(self._max_size - data_size)
+            self._write(data_path, lambda f: np.save(f, np.asarray(fcs_data)))
+            self._write(meta_path, lambda f: f.write(json.dumps(
+                {'infile': os.path.abspath(infile),
+                 'text': fcs_data.text,
+                 'analysis': fcs_data.analysis}).encode('utf-8')))
+
+        return fcs_data
+
+    def clear(self):
+        """
+        Remove all cached files.
+
+        """
+        self._evict(0)
+
+    def _write(self, path, write_fxn):
+        """
+        Atomically write a file in the cache directory.
+
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_fxn(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def _entries(self):
+        """
+        List cached entries as (key, size, last use) tuples.
+
+        """
+        entries = {}
+        for filename in os.listdir(self._cache_dir):
+            key, ext = os.path.splitext(filename)
+            if ext not in ('.npy', '.json'):
+                continue
+            try:
+                st = os.stat(os.path.join(self._cache_dir, filename))
+            except OSError:
+                continue
+            size, last_use = entries.get(key, (0, 0))
+            if ext == '.json':
+                last_use = st.st_mtime
+            entries[key] = (size + st.st_size, last_use)
+        return [(key, size, last_use)
+                for key, (size, last_use) in entries.items()]
+
+    def _evict(self, target_size):
+        """
+        Evict least recently used entries until size <= `target_size`.
+
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        for key, entry_size, last_use in entries:
+            if size <= target_size:
+                break
+            for ext in ('.json', '.npy'):
+                try:
+                    os.remove(os.path.join(self._cache_dir, key + ext))
+                except OSError:
+                    pass
+            size -= entry_size
+
+class Catalog(object):
+    """
+    SQLite index of the FCS files in one or more directory trees.
+
+    FCS files are indexed with ``read_fcs_metadata``, which does not read
+    the DATA segment. For every file, the index stores its path, size,
+    modification time, number of events ($TOT), instrument keywords ($CYT
+    and CREATOR), acquisition start and end times, and the name, detector
+    voltage ($PnV), and amplifier gain ($PnG) of every channel. Files can
+    then be selected with ``query`` without opening them.
+
+    Parameters
+    ----------
+    database : str
+        Path to the SQLite database file. Created if it does not exist.
+        Use ``':memory:'`` for an index that is not stored on disk.
+
+    Notes
+    -----
+    ``scan`` is incremental: files whose size and modification time did
+    not change since the last scan are not parsed again, and files that
+    were deleted are removed from the index. Files that cannot be parsed
+    are indexed with an error message, and are excluded from queries.
+
+    Acquisition times are stored as ISO 8601 strings, and only if the
+    acquisition date is specified in the FCS file.
+
+    """
+    _schema = """
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            num_events INTEGER,
+            cytometer TEXT,
+            creator TEXT,
+            acquisition_start_time TEXT,
+            acquisition_end_time TEXT,
+            error TEXT
+        );
+        CREATE TABLE IF NOT EXISTS channels (
+            file_id INTEGER NOT NULL
+                REFERENCES files (id) ON DELETE CASCADE,
+            idx INTEGER NOT NULL,
+            name TEXT,
+            detector_voltage REAL,
+            amplifier_gain REAL,
+            PRIMARY KEY (file_id, idx)
+        );
+        CREATE INDEX IF NOT EXISTS files_cytometer
+            ON files (cytometer);
+        CREATE INDEX IF NOT EXISTS files_acquisition_start_time
+            ON files (acquisition_start_time);
+        CREATE INDEX IF NOT EXISTS channels_name
+            ON channels (name, file_id);
+    """
+
+    def __init__(self, database):
+        self._database = database
+        self._connection = sqlite3.connect(database)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(self._schema)
+
+    @property
+    def database(self):
+        """
+        Path to the SQLite database file.
+
+        """
+        return self._database
+
+    @property
+    def connection(self):
+        """
+        ``sqlite3.Connection`` to the index, for custom queries.
+
+        """
+        return self._connection
+
+    def __len__(self):
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the connection to the database.
+
+        """
+        self._connection.close()
+
+    def scan(self, directory, extensions=('.fcs',)):
+        """
+        Index new and modified FCS files in a directory tree.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to scan recursively.
+        extensions : tuple of str, optional
+            File name extensions (case insensitive) of the files to index.
+
+        Returns
+        -------
+        result : namedtuple
+            Number of files in `directory` in each of the following
+            categories, in order:
+                - added : int
+                - updated : int
+                - removed : int
+                - unchanged : int
+
+        """
+        ScanResult = collections.namedtuple(
+            'ScanResult', ['added', 'updated', 'removed', 'unchanged'])
+
+        directory = os.path.abspath(directory)
+        extensions = tuple(ext.lower() for ext in extensions)
+
+        # Previously indexed files in directory
+        indexed = {}
+        for file_id, path, size, mtime_ns in self._connection.execute(
+                'SELECT id, path, size, mtime_ns FROM files'):
+            if path.startswith(os.path.join(directory, '')):
+                indexed[path] = (file_id, size, mtime_ns)
+
+        added = updated = unchanged = 0
+        with self._connection:
+            for dirpath, dirnames, filenames in os.walk(directory):
+                for filename in filenames:
+                    if not filename.lower().endswith(extensions):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    previous = indexed.pop(path, None)
+                    if previous is None:
+                        added += 1
+                    elif previous[1:] == (st.st_size, st.st_mtime_ns):
+                        unchanged += 1
+                        continue
+                    else:
+                        updated += 1
+                        self._connection.execute(
+                            'DELETE FROM files WHERE id = ?', (previous[0],))
+                    self._index_file(path, st)
+
+            # Files that no longer exist
+            self._connection.executemany(
+                'DELETE FROM files WHERE id = ?',
+                [(file_id,) for file_id, size, mtime_ns in indexed.values()])
+
+        return ScanResult(added=added,
+                          updated=updated,
+                          removed=len(indexed),
+                          unchanged=unchanged)
+
+    def query(self,
+              cytometer=None,
+              creator=None,
+              channels=None,
+              start=None,
+              end=None,
+              min_events=None):
+        """
+        Select indexed FCS files.
+
+        Parameters
+        ----------
+        cytometer : str, optional
+            Required value of the $CYT keyword.
+        creator : str, optional
+            Required value of the CREATOR keyword.
+        channels : str or list of str, optional
+            Channel(s) that files should contain.
+        start, end : datetime, optional
+            Select files with an acquisition start time within
+            [`start`, `end`).
+        min_events : int, optional
+            Minimum number of events.
+
+        Returns
+        -------
+        list of str
+            Sorted absolute paths of the files that satisfy all specified
+            conditions.
+
+        """
+        conditions = ['error IS NULL']
+        args = []
+        if cytometer is not None:
+            conditions.append('cytometer = ?')
+            args.append(cytometer)
+        if creator is not None:
+            conditions.append('creator = ?')
+            args.append(creator)
+        if channels is not None:
+            if isinstance(channels, str):
+                channels = [channels]
+            for channel in channels:
+                conditions.append(
+                    'id IN (SELECT file_id FROM channels WHERE name = ?)')
+                args.append(channel)
+        if start is not None:
+            conditions.append('acquisition_start_time >= ?')
+            args.append(start.isoformat())
+        if end is not None:
+            conditions.append('acquisition_start_time < ?')
+            args.append(end.isoformat())
+        if min_events is not None:
+            conditions.append('num_events >= ?')
+            args.append(int(min_events))
+
+        cursor = self._connection.execute(
+            'SELECT path FROM files WHERE {0} ORDER BY path'.format(
+                ' AND '.join(conditions)),
+            args)
+        return [row[0] for row in cursor]
+
+    def _index_file(self, path, st):
+        """
+        Parse the metadata of an FCS file and insert it in the index.
+
+        Files which cannot be parsed or inserted are indexed with an error
+        message instead.
+
+        """
+        def isoformat(t):
+            if isinstance(t, datetime.datetime):
+                return t.isoformat()
+            return None
+
+        # Insert file and channels atomically, such that a failure only
+        # rolls back the entries of this file, and not the whole scan.
+        if not self._connection.in_transaction:
+            self._connection.execute('BEGIN')
+        self._connection.execute('SAVEPOINT index_file')
+        try:
+            metadata = read_fcs_metadata(path)
+            cursor = self._connection.execute(
+                'INSERT INTO files (path, size, mtime_ns, num_events,'
+                + ' cytometer, creator, acquisition_start_time,'
+                + ' acquisition_end_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (path,
+                 st.st_size,
+                 st.st_mtime_ns,
+                 metadata.num_events,
+                 metadata.text.get('$CYT'),
+                 metadata.text.get('CREATOR'),
+                 isoformat(metadata.acquisition_start_time),
+                 isoformat(metadata.acquisition_end_time)))
+            self._connection.executemany(
+                'INSERT INTO channels (file_id, idx, name, detector_voltage,'
+                + ' amplifier_gain) VALUES (?, ?, ?, ?, ?)',
+                [(cursor.lastrowid, idx, name, voltage, gain)
+                 for idx, (name, voltage, gain) in enumerate(zip(
+                    metadata.channels,
+                    metadata.detector_voltage,
+                    metadata.amplifier_gain))])
+        except Exception as e:
+            self._connection.execute('ROLLBACK TO index_file')
+            self._connection.execute(
+                'INSERT INTO files (path, size, mtime_ns, error)'
+                + ' VALUES (?, ?, ?, ?)',
+                (path, st.st_size, st.st_mtime_ns, repr(e)))
+        finally:
+            self._connection.execute('RELEASE index_file')
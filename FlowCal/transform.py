@@ -50,6 +50,9 @@ def transform(data, channels, transform_fxn, def_channels = None):
     """
     # Copy data array
     data_t = data.copy().astype(np.float64)
+    # Channel information is shared with `data`. Copy it before modifying.
+    if hasattr(data_t, '_channel_table'):
+        data_t._channel_table = data_t._channel_table.copy()
 
     # Default
     if channels is None:
@@ -66,13 +69,12 @@ def transform(data, channels, transform_fxn, def_channels = None):
     data_t[:,channels] = transform_fxn(data_t[:,channels])
 
     # Apply transformation to ``data.range``
-    if hasattr(data_t, '_range'):
+    if hasattr(data_t, '_channel_table'):
+        data_range = data_t._channel_table.range
         for channel in channels:
             # Transform channel name to index if necessary
             channel_idx = data_t._name_to_index(channel)
-            if data_t._range[channel_idx] is not None:
-                data_t._range[channel_idx] = \
-                    transform_fxn(data_t._range[channel_idx])
+            data_range[channel_idx] = transform_fxn(data_range[channel_idx])
 
     return data_t
 
@@ -199,6 +201,9 @@ def to_rfi(data,
 
     # Copy data array
     data_t = data.copy().astype(np.float64)
+    # Channel information is shared with `data`. Copy it before modifying.
+    if hasattr(data_t, '_channel_table'):
+        data_t._channel_table = data_t._channel_table.copy()
 
     # Iterate over channels
     for channel, r, at, ag in \
@@ -237,9 +242,10 @@ def to_rfi(data,
         # Apply transformation to event list
         data_t[:,channel] = tf(data_t[:,channel])
         # Apply transformation to range
-        if hasattr(data_t, '_range') and data_t._range[channel] is not None:
-            data_t._range[channel] = [tf(data_t._range[channel][0]),
-                                      tf(data_t._range[channel][1])]
+        if hasattr(data_t, '_channel_table'):
+            data_range = data_t._channel_table.range
+            data_range[channel] = [tf(data_range[channel][0]),
+                                   tf(data_range[channel][1])]
 
     return data_t
 
@@ -319,6 +325,9 @@ def to_mef(data, channels, sc_list, sc_channels = None):
 
     # Copy data array
     data_t = data.copy().astype(np.float64)
+    # Channel information is shared with `data`. Copy it before modifying.
+    if hasattr(data_t, '_channel_table'):
+        data_t._channel_table = data_t._channel_table.copy()
 
     # Iterate over channels
     for chi, sc in zip(sc_channels, sc_list):
@@ -327,8 +336,9 @@ def to_mef(data, channels, sc_list, sc_channels = None):
         # Apply transformation
         data_t[:,chi] = sc(data_t[:,chi])
         # Apply transformation to range
-        if hasattr(data_t, '_range') and data_t._range[chi] is not None:
-            data_t._range[chi] = [sc(data_t._range[chi][0]),
-                                  sc(data_t._range[chi][1])]
+        if hasattr(data_t, '_channel_table'):
+            data_range = data_t._channel_table.range
+            data_range[chi] = [sc(data_range[chi][0]),
+                               sc(data_range[chi][1])]
 
     return data_t
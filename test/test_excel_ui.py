@@ -5,6 +5,8 @@ Unit tests for the excel_ui module.
 
 import os
 import collections
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -213,5 +215,90 @@ class TestReadTable(unittest.TestCase):
                           sheetname,
                           index_col)
 
+class TestProcessSamplesTableCache(unittest.TestCase):
+    """
+    Class to test excel_ui.process_samples_table() with an FCS cache.
+
+    """
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.base_dir = tempfile.mkdtemp()
+        # Copies of the test files, which can be modified
+        for filename in ['Data001.fcs', 'Data003.fcs']:
+            shutil.copyfile(os.path.join('test', filename),
+                            os.path.join(self.base_dir, filename))
+
+        self.instruments_table = pd.DataFrame(
+            collections.OrderedDict([
+                ('Forward Scatter Channel', ['FSC-H', 'FSC']),
+                ('Side Scatter Channel', ['SSC-H', 'SSC']),
+                ('Fluorescence Channels', ['FL1-H, FL2-H, FL3-H',
+                                           'FL1, FL2, FL3']),
+                ('Time Channel', ['Time', 'TIME'])]),
+            index=pd.Index(['FC001', 'FC002'], name='ID'))
+        self.samples_table = pd.DataFrame(
+            collections.OrderedDict([
+                ('Instrument ID', ['FC001', 'FC002']),
+                ('File Path', ['Data001.fcs', 'Data003.fcs']),
+                ('Gate Fraction', [0.5, 0.5]),
+                ('FL1-H Units', ['Channel', np.nan]),
+                ('FL1 Units', [np.nan, 'Channel'])]),
+            index=pd.Index(['S001', 'S002'], name='ID'))
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.base_dir)
+
+    def clear_data_segment(self, filename):
+        """
+        Zero the DATA segment of an FCS file, keeping its size and mtime.
+
+        """
+        path = os.path.join(self.base_dir, filename)
+        st = os.stat(path)
+        with open(path, 'r+b') as f:
+            header = f.read(58)
+            begin, end = int(header[26:34]), int(header[34:42])
+            f.seek(begin)
+            f.write(b'\x00'*(end + 1 - begin))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    def test_process_samples_table_cache(self):
+        """
+        Test that samples loaded through a cache equal uncached samples.
+
+        """
+        samples = FlowCal.excel_ui.process_samples_table(
+            self.samples_table,
+            self.instruments_table,
+            base_dir=self.base_dir)
+
+        fcs_cache = FlowCal.io.FCSCache(self.cache_dir)
+        samples_miss = FlowCal.excel_ui.process_samples_table(
+            self.samples_table,
+            self.instruments_table,
+            base_dir=self.base_dir,
+            fcs_cache=fcs_cache)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 4)
+
+        # Samples can only be processed correctly on the second run if they
+        # are loaded from the cache.
+        self.clear_data_segment('Data001.fcs')
+        self.clear_data_segment('Data003.fcs')
+        samples_hit = FlowCal.excel_ui.process_samples_table(
+            self.samples_table,
+            self.instruments_table,
+            base_dir=self.base_dir,
+            fcs_cache=fcs_cache)
+
+        for sample, sample_miss, sample_hit in zip(samples,
+                                                   samples_miss,
+                                                   samples_hit):
+            self.assertIsInstance(sample, FlowCal.io.FCSData)
+            for sample_cache in [sample_miss, sample_hit]:
+                self.assertIsInstance(sample_cache, FlowCal.io.FCSData)
+                self.assertEqual(sample_cache.channels, sample.channels)
+                np.testing.assert_array_equal(sample_cache, sample)
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@
 """
 
 import FlowCal.gate
+import functools
 import numpy as np
 import unittest
 
@@ -1337,5 +1338,223 @@ class TestDensity2dGate2(unittest.TestCase):
                 1,0,0,0,0], dtype=bool)
             )
 
+class TestDensityGate(unittest.TestCase):
+
+    def setUp(self):
+        """Fit density gate to Data003.fcs."""
+        self.data = FlowCal.io.FCSData('test/Data003.fcs')
+        self.kwargs = {'channels': ['FSC', 'SSC'],
+                       'xscale': 'linear',
+                       'yscale': 'linear'}
+        self.density_gate = FlowCal.gate.DensityGate(self.data,
+                                                     **self.kwargs)
+
+    def test_gate_fraction_0_3(self):
+        gated_data = self.density_gate.gate(self.data, gate_fraction=0.3)
+        np.testing.assert_array_equal(
+            gated_data,
+            np.load('test/Data003_gate_density2d.npy'))
+
+    def test_gate_fractions_mask(self):
+        for gate_fraction in [0.0, 0.1, 0.5, 0.65, 0.9, 1.0]:
+            np.testing.assert_array_equal(
+                self.density_gate.mask(gate_fraction=gate_fraction),
+                FlowCal.gate.density2d(self.data,
+                                       gate_fraction=gate_fraction,
+                                       full_output=True,
+                                       **self.kwargs).mask)
+
+    def test_gate_fractions_contour(self):
+        self.assertEqual(self.density_gate.contour(gate_fraction=0.0), [])
+        for gate_fraction in [0.5, 0.9]:
+            contour = self.density_gate.contour(gate_fraction=gate_fraction)
+            contour_expected = FlowCal.gate.density2d(
+                self.data,
+                gate_fraction=gate_fraction,
+                full_output=True,
+                **self.kwargs).contour
+            self.assertEqual(len(contour), len(contour_expected))
+
+    def test_full_output(self):
+        output = self.density_gate.gate(self.data,
+                                        gate_fraction=0.5,
+                                        full_output=True)
+        np.testing.assert_array_equal(output.gated_data,
+                                      self.data[output.mask])
+        np.testing.assert_array_equal(
+            output.mask,
+            self.density_gate.mask(gate_fraction=0.5))
+
+    def test_apply_new_sample(self):
+        mask = self.density_gate.mask(gate_fraction=0.5)
+        np.testing.assert_array_equal(
+            self.density_gate.mask(self.data[::3], gate_fraction=0.5),
+            mask[::3])
+        np.testing.assert_array_equal(
+            self.density_gate.gate(self.data[1::2], gate_fraction=0.5),
+            self.data[1::2][mask[1::2]])
+
+    def test_histogram(self):
+        H, xe, ye = np.histogram2d(self.data[:, 'FSC'].ravel(),
+                                   self.data[:, 'SSC'].ravel(),
+                                   bins=[self.density_gate.xedges,
+                                         self.density_gate.yedges])
+        np.testing.assert_array_equal(self.density_gate.histogram, H)
+        self.assertAlmostEqual(np.sum(self.density_gate.density), 1.0)
+
+    def test_gate_fraction_error(self):
+        self.assertRaises(ValueError, self.density_gate.mask,
+                          gate_fraction=1.1)
+        self.assertRaises(ValueError, self.density_gate.mask,
+                          gate_fraction=-0.1)
+
+    def test_channels_error(self):
+        self.assertRaises(ValueError, FlowCal.gate.DensityGate,
+                          self.data, channels=['FSC'])
+
+class TestDensity2dGateFitSubsample(unittest.TestCase):
+
+    def setUp(self):
+        self.data = FlowCal.io.FCSData('test/Data003.fcs')
+        self.kwargs = {'channels': ['FSC', 'SSC'],
+                       'xscale': 'linear',
+                       'yscale': 'linear'}
+
+    def test_fit_subsample_larger_than_data(self):
+        gated_data = FlowCal.gate.density2d(self.data,
+                                            gate_fraction=0.3,
+                                            fit_subsample=10**6,
+                                            **self.kwargs)
+        np.testing.assert_array_equal(
+            gated_data,
+            np.load('test/Data003_gate_density2d.npy'))
+
+    def test_fit_subsample_mask(self):
+        output = FlowCal.gate.density2d(self.data,
+                                        gate_fraction=0.5,
+                                        fit_subsample=5000,
+                                        seed=0,
+                                        full_output=True,
+                                        **self.kwargs)
+        self.assertEqual(output.mask.shape, (self.data.shape[0],))
+        self.assertEqual(output.mask.dtype, bool)
+        np.testing.assert_array_equal(output.gated_data,
+                                      self.data[output.mask])
+        self.assertIsInstance(output.contour, list)
+
+        # Events are gated by looking up the bins accepted on the
+        # subsample
+        random_state = np.random.RandomState(0)
+        fit_indices = np.sort(random_state.choice(self.data.shape[0],
+                                                  size=5000,
+                                                  replace=False))
+        density_gate = FlowCal.gate.DensityGate(self.data[fit_indices],
+                                                **self.kwargs)
+        np.testing.assert_array_equal(
+            output.mask,
+            density_gate.mask(self.data, gate_fraction=0.5))
+        np.testing.assert_array_equal(
+            output.mask[fit_indices],
+            density_gate.mask(gate_fraction=0.5))
+
+    def test_fit_subsample_fraction(self):
+        mask = FlowCal.gate.density2d(self.data,
+                                      gate_fraction=0.5,
+                                      fit_subsample=10000,
+                                      seed=0,
+                                      full_output=True,
+                                      **self.kwargs).mask
+        self.assertAlmostEqual(np.mean(mask), 0.5, delta=0.05)
+
+    def test_fit_subsample_seed(self):
+        masks = [FlowCal.gate.density2d(self.data,
+                                        gate_fraction=0.5,
+                                        fit_subsample=5000,
+                                        seed=1,
+                                        full_output=True,
+                                        **self.kwargs).mask
+                 for i in range(2)]
+        np.testing.assert_array_equal(masks[0], masks[1])
+
+class TestDensity2dGateChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.data = FlowCal.io.FCSData('test/Data003.fcs')
+        self.chunks = [self.data[i:i + 3000]
+                       for i in range(0, self.data.shape[0], 3000)]
+        self.kwargs = {'channels': ['FSC', 'SSC'],
+                       'gate_fraction': 0.3,
+                       'xscale': 'linear',
+                       'yscale': 'linear'}
+
+    def test_chunks_list(self):
+        gated_chunks = FlowCal.gate.density2d(self.chunks, **self.kwargs)
+        np.testing.assert_array_equal(
+            np.vstack(list(gated_chunks)),
+            np.load('test/Data003_gate_density2d.npy'))
+
+    def test_chunks_function(self):
+        gated_chunks = FlowCal.gate.density2d(
+            functools.partial(FlowCal.io.iter_fcs_chunks,
+                              'test/Data003.fcs',
+                              4000),
+            **self.kwargs)
+        np.testing.assert_array_equal(
+            np.vstack(list(gated_chunks)),
+            np.load('test/Data003_gate_density2d.npy'))
+
+    def test_chunks_full_output(self):
+        output = FlowCal.gate.density2d(self.data,
+                                        full_output=True,
+                                        **self.kwargs)
+        outputs = list(FlowCal.gate.density2d(self.chunks,
+                                              full_output=True,
+                                              **self.kwargs))
+        self.assertEqual(len(outputs), len(self.chunks))
+        for chunk, chunk_output in zip(self.chunks, outputs):
+            np.testing.assert_array_equal(chunk_output.gated_data,
+                                          chunk[chunk_output.mask])
+            self.assertEqual(len(chunk_output.contour), len(output.contour))
+        np.testing.assert_array_equal(
+            np.concatenate([o.mask for o in outputs]),
+            output.mask)
+
+    def test_chunks_numpy_bin_edges(self):
+        data = np.asarray(self.data)
+        bins = np.linspace(0, 1024, 257)
+        mask = FlowCal.gate.density2d(data,
+                                      channels=[1, 2],
+                                      bins=bins,
+                                      gate_fraction=0.5,
+                                      full_output=True).mask
+        outputs = FlowCal.gate.density2d([data[:10000], data[10000:]],
+                                         channels=[1, 2],
+                                         bins=bins,
+                                         gate_fraction=0.5,
+                                         full_output=True)
+        np.testing.assert_array_equal(
+            np.concatenate([o.mask for o in outputs]),
+            mask)
+
+    def test_chunks_numpy_no_bin_edges_error(self):
+        self.assertRaises(ValueError,
+                          FlowCal.gate.density2d,
+                          [np.asarray(self.data)],
+                          channels=[1, 2],
+                          bins=256)
+
+    def test_chunk_iterator_error(self):
+        self.assertRaises(ValueError,
+                          FlowCal.gate.density2d,
+                          iter(self.chunks),
+                          **self.kwargs)
+
+    def test_chunks_fit_subsample_error(self):
+        self.assertRaises(ValueError,
+                          FlowCal.gate.density2d,
+                          self.chunks,
+                          fit_subsample=1000,
+                          **self.kwargs)
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,12 +3,23 @@ Unit tests for the `io` module.
 
 """
 
+import asyncio
 import datetime
+import gzip
+import io
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+import warnings
+import zipfile
 
 import numpy as np
 
 import FlowCal.io
+import FlowCal.transform
 
 """
 Files to test:
@@ -24,6 +35,302 @@ filenames = ['test/Data001.fcs',
             'test/Data004.fcs',
             ]
 
+class TestReadFCSTextSegment(unittest.TestCase):
+    def parse(self, segment):
+        """
+        Parse a TEXT segment stored in memory.
+
+        """
+        buf = io.BytesIO(segment)
+        return FlowCal.io.read_fcs_text_segment(buf, 0, len(segment) - 1)
+
+    def test_text_segment(self):
+        """
+        Testing parsing of a simple TEXT segment.
+
+        """
+        text, delim = self.parse(b'/$PAR/2/$P1N/FSC-H/$P2N/SSC-H/')
+        self.assertEqual(delim, '/')
+        self.assertEqual(text, {'$PAR': '2',
+                                '$P1N': 'FSC-H',
+                                '$P2N': 'SSC-H'})
+
+    def test_escaped_delimiters(self):
+        """
+        Testing parsing of keywords and values with escaped delimiters.
+
+        """
+        text, delim = self.parse(b'|A||B|1||2||3|$PAR|2|C|x||||y|')
+        self.assertEqual(text, {'A|B': '1|2|3',
+                                '$PAR': '2',
+                                'C': 'x|||y'})
+
+    def test_odd_number_of_entries(self):
+        """
+        Testing that an unpaired keyword raises a ValueError.
+
+        """
+        self.assertRaises(ValueError, self.parse, b'/$PAR/2/$P1N/')
+
+    def test_large_text_segment(self):
+        """
+        Testing parsing of a synthetic 1 MB TEXT segment.
+
+        """
+        expected = {}
+        for i in range(10000):
+            expected['$P{0}N'.format(i)] = 'Channel/{0}'.format(i)
+        expected['$SPILLOVER'] = '/'.join(
+            '{0:.6f}'.format(v) for v in np.linspace(0, 1, 100000))
+        segment = '/' + ''.join(
+            '{0}/{1}/'.format(k.replace('/', '//'), v.replace('/', '//'))
+            for k, v in expected.items())
+        segment = segment.encode('latin-1')
+        self.assertGreater(len(segment), 2**20)
+        text, delim = self.parse(segment)
+        self.assertEqual(text, expected)
+
+class TestReadFCSDataSegment(unittest.TestCase):
+    def setUp(self):
+        # Random events for three parameters with bit widths 16, 32, and 24
+        random_state = np.random.RandomState(0)
+        self.num_events = 1000
+        self.param_bit_widths = [16, 32, 24]
+        self.data = np.column_stack([
+            random_state.randint(0, 2**16, self.num_events),
+            random_state.randint(0, 2**32, self.num_events),
+            random_state.randint(0, 2**24, self.num_events),
+            ]).astype(np.uint64)
+
+    def write_data_segment(self, big_endian):
+        """
+        Write a mixed bit width DATA segment to a temporary file.
+
+        """
+        byte_cols = []
+        for col, bw in enumerate(self.param_bit_widths):
+            for b in range(bw//8):
+                shift = (bw//8 - b - 1) if big_endian else b
+                byte_cols.append((self.data[:,col] >> np.uint64(8*shift))
+                                 & np.uint64(0xFF))
+        raw = np.column_stack(byte_cols).astype(np.uint8).tobytes()
+        f = tempfile.TemporaryFile()
+        f.write(b' '*10 + raw)
+        f.flush()
+        return f, 10, 10 + len(raw) - 1
+
+    def test_mixed_bit_widths(self):
+        """
+        Testing decoding of mixed bit width integer data.
+
+        """
+        for big_endian in [True, False]:
+            f, begin, end = self.write_data_segment(big_endian)
+            data = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=begin,
+                end=end,
+                datatype='I',
+                num_events=self.num_events,
+                param_bit_widths=self.param_bit_widths,
+                big_endian=big_endian)
+            f.close()
+            self.assertEqual(data.dtype, np.dtype('u4'))
+            np.testing.assert_array_equal(data, self.data)
+
+    def test_mixed_bit_widths_masked(self):
+        """
+        Testing decoding of mixed bit width data with bit masking.
+
+        """
+        f, begin, end = self.write_data_segment(True)
+        data = FlowCal.io.read_fcs_data_segment(
+            buf=f,
+            begin=begin,
+            end=end,
+            datatype='I',
+            num_events=self.num_events,
+            param_bit_widths=self.param_bit_widths,
+            big_endian=True,
+            param_ranges=[1024, 2**32, 2**20])
+        f.close()
+        np.testing.assert_array_equal(data[:,0], self.data[:,0] & 1023)
+        np.testing.assert_array_equal(data[:,1], self.data[:,1])
+        np.testing.assert_array_equal(data[:,2],
+                                      self.data[:,2] & (2**20 - 1))
+
+    def test_mixed_bit_widths_selection(self):
+        """
+        Testing decoding of selected events and parameters.
+
+        """
+        f, begin, end = self.write_data_segment(False)
+        data = FlowCal.io.read_fcs_data_segment(
+            buf=f,
+            begin=begin,
+            end=end,
+            datatype='I',
+            num_events=self.num_events,
+            param_bit_widths=self.param_bit_widths,
+            big_endian=False,
+            params=[2, 0],
+            events=slice(10, 20))
+        f.close()
+        np.testing.assert_array_equal(data, self.data[10:20, [2, 0]])
+
+    def write_packed_data_segment(self, param_bit_widths, data, big_endian):
+        """
+        Write a DATA segment of non byte aligned values to a temporary file.
+
+        """
+        # Build the bit stream as a python integer, one value at a time
+        stream = 0
+        nbits = 0
+        for row in data:
+            for value, bw in zip(row, param_bit_widths):
+                value = int(value)
+                if big_endian:
+                    stream = (stream << bw) | value
+                else:
+                    stream |= value << nbits
+                nbits += bw
+        num_bytes = (nbits + 7)//8
+        if big_endian:
+            stream <<= 8*num_bytes - nbits
+            raw = stream.to_bytes(num_bytes, 'big')
+        else:
+            # Bits are stored least significant bit first within each byte
+            raw = stream.to_bytes(num_bytes, 'little')
+        f = tempfile.TemporaryFile()
+        f.write(b' '*10 + raw)
+        f.flush()
+        return f, 10, 10 + len(raw) - 1
+
+    def test_packed_bit_widths(self):
+        """
+        Testing decoding of non byte aligned integer data.
+
+        """
+        random_state = np.random.RandomState(1)
+        param_bit_widths = [10, 12, 5]
+        data = np.column_stack([random_state.randint(0, 2**bw, 101)
+                                for bw in param_bit_widths])
+        for big_endian in [True, False]:
+            f, begin, end = self.write_packed_data_segment(
+                param_bit_widths, data, big_endian)
+            decoded = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=begin,
+                end=end,
+                datatype='I',
+                num_events=101,
+                param_bit_widths=param_bit_widths,
+                big_endian=big_endian)
+            f.close()
+            self.assertEqual(decoded.dtype, np.dtype('u2'))
+            np.testing.assert_array_equal(decoded, data)
+
+    def test_packed_bit_widths_selection(self):
+        """
+        Testing decoding of selected events and parameters of non byte
+        aligned integer data.
+
+        """
+        random_state = np.random.RandomState(2)
+        param_bit_widths = [3, 40, 9]
+        data = np.column_stack([random_state.randint(0, 2**bw, 50,
+                                                     dtype=np.int64)
+                                for bw in param_bit_widths])
+        for big_endian in [True, False]:
+            f, begin, end = self.write_packed_data_segment(
+                param_bit_widths, data, big_endian)
+            decoded = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=begin,
+                end=end,
+                datatype='I',
+                num_events=50,
+                param_bit_widths=param_bit_widths,
+                big_endian=big_endian,
+                params=[2, 1],
+                events=np.array([3, 17, 18, 49]))
+            f.close()
+            self.assertEqual(decoded.dtype, np.dtype('u8'))
+            np.testing.assert_array_equal(
+                decoded, data[np.ix_([3, 17, 18, 49], [2, 1])])
+
+    def test_packed_bit_widths_slice(self):
+        """
+        Testing decoding of slices of events of non byte aligned data.
+
+        """
+        random_state = np.random.RandomState(4)
+        param_bit_widths = [10, 12, 5]
+        data = np.column_stack([random_state.randint(0, 2**bw, 61)
+                                for bw in param_bit_widths])
+        for big_endian in [True, False]:
+            f, begin, end = self.write_packed_data_segment(
+                param_bit_widths, data, big_endian)
+            for events in [slice(5, 40, 4), slice(None, None, -3)]:
+                decoded = FlowCal.io.read_fcs_data_segment(
+                    buf=f,
+                    begin=begin,
+                    end=end,
+                    datatype='I',
+                    num_events=61,
+                    param_bit_widths=param_bit_widths,
+                    big_endian=big_endian,
+                    events=events)
+                np.testing.assert_array_equal(decoded, data[events])
+            f.close()
+
+    def test_packed_bit_widths_wide(self):
+        """
+        Testing decoding of non byte aligned values wider than 57 bits.
+
+        """
+        random_state = np.random.RandomState(3)
+        param_bit_widths = [61, 7, 64, 58]
+        data = np.column_stack([random_state.randint(0, 2**bw, 33,
+                                                     dtype=np.uint64)
+                                for bw in param_bit_widths])
+        for big_endian in [True, False]:
+            f, begin, end = self.write_packed_data_segment(
+                param_bit_widths, data, big_endian)
+            decoded = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=begin,
+                end=end,
+                datatype='I',
+                num_events=33,
+                param_bit_widths=param_bit_widths,
+                big_endian=big_endian)
+            f.close()
+            self.assertEqual(decoded.dtype, np.dtype('u8'))
+            np.testing.assert_array_equal(decoded, data)
+
+    def test_packed_bit_widths_no_events(self):
+        """
+        Testing decoding of an empty selection of non byte aligned data.
+
+        """
+        param_bit_widths = [10, 12, 5]
+        data = np.zeros((20, 3), dtype=int)
+        f, begin, end = self.write_packed_data_segment(
+            param_bit_widths, data, True)
+        for events in [[], slice(5, 5)]:
+            decoded = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=begin,
+                end=end,
+                datatype='I',
+                num_events=20,
+                param_bit_widths=param_bit_widths,
+                big_endian=True,
+                events=events)
+            self.assertEqual(decoded.shape, (0, 3))
+        f.close()
+
 class TestFCSDataLoading(unittest.TestCase):
     def setUp(self):
         pass
@@ -1122,6 +1429,1304 @@ class TestFCSAttributesFloating(unittest.TestCase):
                       'mCherry-A', 'mCherry-H']]
         self.assertEqual(d.acquisition_time, 4)
 
+class TestFCSDataMmap(unittest.TestCase):
+    def test_mmap_equal(self):
+        """
+        Testing that memory mapped loading produces the same events.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            d_mmap = FlowCal.io.FCSData(filename, mmap=True)
+            self.assertEqual(d_mmap.channels, d.channels)
+            self.assertEqual(d_mmap.range(), d.range())
+            np.testing.assert_array_equal(d_mmap, d)
+
+    def test_mmap_backed_by_file(self):
+        """
+        Testing that memory mapped events are backed by a memmap.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3], mmap=True)
+        self.assertIsInstance(d.base, np.memmap)
+
+    def test_mmap_write(self):
+        """
+        Testing that writing to memory mapped events does not modify file.
+
+        """
+        d = FlowCal.io.FCSData(filenames[0], mmap=True)
+        d[:, 'FL1-H'] = 0
+        self.assertTrue(np.all(d[:, 'FL1-H'] == 0))
+        d_new = FlowCal.io.FCSData(filenames[0])
+        self.assertFalse(np.all(d_new[:, 'FL1-H'] == 0))
+
+    def test_mmap_mask_range(self):
+        """
+        Testing that memory mapped events with bits set above $PnR are masked.
+
+        """
+        tempdir = tempfile.mkdtemp()
+        try:
+            with open(filenames[0], 'rb') as f:
+                raw = bytearray(f.read())
+            # Set all bits of the first event. The offset to the DATA segment
+            # is stored in bytes 26-33 of the HEADER segment.
+            begin = int(raw[26:34])
+            d = FlowCal.io.FCSData(filenames[0])
+            raw[begin:begin + 2*d.shape[1]] = b'\xff'*(2*d.shape[1])
+            path = os.path.join(tempdir, 'high_bits.fcs')
+            with open(path, 'wb') as f:
+                f.write(raw)
+
+            d_mmap = FlowCal.io.FCSData(path, mmap=True)
+            self.assertIsInstance(d_mmap.base, np.memmap)
+            np.testing.assert_array_equal(d_mmap[0],
+                                          np.array(d.range())[:,1])
+            np.testing.assert_array_equal(d_mmap[1:], d[1:])
+            del d_mmap
+        finally:
+            shutil.rmtree(tempdir)
+
+class TestFCSDataInMemory(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_bytes_like(self):
+        """
+        Testing loading from bytes, bytearray, memoryview, and BytesIO.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            with open(filename, 'rb') as f:
+                raw = f.read()
+            for infile in [raw,
+                           bytearray(raw),
+                           memoryview(raw),
+                           io.BytesIO(raw)]:
+                d_mem = FlowCal.io.FCSData(infile)
+                self.assertEqual(d_mem.channels, d.channels)
+                self.assertEqual(d_mem.range(), d.range())
+                np.testing.assert_array_equal(d_mem, d)
+
+    def test_bytes_mmap_zero_copy(self):
+        """
+        Testing that events loaded with mmap=True view the buffer.
+
+        """
+        with open(filenames[3], 'rb') as f:
+            raw = bytearray(f.read())
+        d = FlowCal.io.FCSData(memoryview(raw), mmap=True)
+        self.assertTrue(np.shares_memory(d, np.frombuffer(raw, np.uint8)))
+        np.testing.assert_array_equal(d, FlowCal.io.FCSData(filenames[3]))
+        self.assertFalse(d.flags.writeable)
+
+    def test_gzip(self):
+        """
+        Testing loading a gzip-compressed FCS file.
+
+        """
+        for filename in filenames:
+            gz_filename = os.path.join(self.tempdir, 'data.fcs.gz')
+            with open(filename, 'rb') as f_in:
+                with gzip.open(gz_filename, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+            d = FlowCal.io.FCSData(filename, channels=[0, 1])
+            d_gz = FlowCal.io.FCSData(gz_filename, channels=[0, 1])
+            self.assertEqual(d_gz.infile, gz_filename)
+            self.assertEqual(d_gz.channels, d.channels)
+            np.testing.assert_array_equal(d_gz, d)
+
+    def test_gzip_writable(self):
+        """
+        Testing that events of a gzip-compressed file are writable.
+
+        """
+        gz_filename = os.path.join(self.tempdir, 'data.fcs.gz')
+        with open(filenames[3], 'rb') as f_in:
+            with gzip.open(gz_filename, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        for mmap in [False, True]:
+            d_gz = FlowCal.io.FCSData(gz_filename, mmap=mmap)
+            np.testing.assert_array_equal(d_gz,
+                                          FlowCal.io.FCSData(filenames[3]))
+            d_gz[0, 0] = 1
+            self.assertEqual(d_gz[0, 0], 1)
+
+    def test_gzip_no_copy(self):
+        """
+        Testing that events read from a gzip-compressed file are not copied.
+
+        """
+        gz_filename = os.path.join(self.tempdir, 'data.fcs.gz')
+        with open(filenames[3], 'rb') as f_in:
+            with gzip.open(gz_filename, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        d = FlowCal.io.FCSData(filenames[3])
+        with gzip.open(gz_filename, 'rb') as f:
+            header = FlowCal.io.read_fcs_header_segment(f)
+            data = FlowCal.io.read_fcs_data_segment(
+                buf=f,
+                begin=header.data_begin,
+                end=header.data_end,
+                datatype='F',
+                num_events=d.shape[0],
+                param_bit_widths=[32]*d.shape[1],
+                big_endian=True,
+                events=slice(10, 20))
+        # The returned array views the array filled by the stream
+        self.assertIsNotNone(data.base)
+        self.assertTrue(data.flags.writeable)
+        np.testing.assert_array_equal(data, d[10:20])
+
+    def test_gzip_chunks_read_size(self):
+        """
+        Testing that chunks of a gzip-compressed file read only their rows.
+
+        """
+        gz_filename = os.path.join(self.tempdir, 'data.fcs.gz')
+        with open(filenames[0], 'rb') as f_in:
+            with gzip.open(gz_filename, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+
+        class CountingReader(object):
+            def __init__(self, f):
+                self.f = f
+                self.num_bytes = 0
+            def seek(self, *args):
+                return self.f.seek(*args)
+            def tell(self):
+                return self.f.tell()
+            def read(self, *args):
+                b = self.f.read(*args)
+                self.num_bytes += len(b)
+                return b
+            def readinto(self, b):
+                n = self.f.readinto(b)
+                self.num_bytes += n
+                return n
+
+        d = FlowCal.io.FCSData(filenames[0])
+        row_bytes = d.shape[1]*2
+        with gzip.open(gz_filename, 'rb') as f:
+            reader = CountingReader(f)
+            chunks = FlowCal.io.iter_fcs_chunks(reader, 1000)
+            next(chunks)
+            reader.num_bytes = 0
+            for chunk in chunks:
+                num_bytes = reader.num_bytes
+                reader.num_bytes = 0
+                self.assertEqual(num_bytes, chunk.shape[0]*row_bytes)
+
+            reader.num_bytes = 0
+            d_events = FlowCal.io.FCSData(reader, events=slice(100, 110))
+            np.testing.assert_array_equal(d_events, d[100:110])
+            self.assertLess(reader.num_bytes, 10*row_bytes + 2**16)
+
+    def test_zip_member(self):
+        """
+        Testing loading FCS files inside a zip archive.
+
+        """
+        zip_filename = os.path.join(self.tempdir, 'data.zip')
+        with zipfile.ZipFile(zip_filename, 'w',
+                             compression=zipfile.ZIP_DEFLATED) as zf:
+            for filename in filenames:
+                zf.write(filename, os.path.basename(filename))
+        with zipfile.ZipFile(zip_filename) as zf:
+            for filename in filenames:
+                with zf.open(os.path.basename(filename)) as member:
+                    d_zip = FlowCal.io.FCSData(member)
+                np.testing.assert_array_equal(d_zip,
+                                              FlowCal.io.FCSData(filename))
+
+class TestReadFCSMetadata(unittest.TestCase):
+    def test_metadata_equal(self):
+        """
+        Testing that metadata matches the attributes of FCSData.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            m = FlowCal.io.read_fcs_metadata(filename)
+            self.assertEqual(m.infile, filename)
+            self.assertEqual(m.text, d.text)
+            self.assertEqual(m.analysis, d.analysis)
+            self.assertEqual(m.num_events, d.shape[0])
+            self.assertEqual(m.data_type, d.data_type)
+            self.assertEqual(m.time_step, d.time_step)
+            self.assertEqual(m.acquisition_start_time,
+                             d.acquisition_start_time)
+            self.assertEqual(m.acquisition_end_time, d.acquisition_end_time)
+            self.assertEqual(m.channels, d.channels)
+            self.assertEqual(list(m.amplification_type),
+                             d.amplification_type())
+            self.assertEqual(list(m.detector_voltage), d.detector_voltage())
+            self.assertEqual(list(m.amplifier_gain), d.amplifier_gain())
+            self.assertEqual(m.range, d.range())
+            self.assertEqual(list(m.resolution), d.resolution())
+
+    def test_fcs_file_no_data(self):
+        """
+        Testing that FCSFile does not read the DATA segment if requested.
+
+        """
+        f = FlowCal.io.FCSFile(filenames[0], data=False)
+        self.assertIsNone(f.data)
+        self.assertEqual(f.text, FlowCal.io.FCSFile(filenames[0]).text)
+
+class TestFCSDataChannels(unittest.TestCase):
+    def test_channels_equal(self):
+        """
+        Testing that loading specific channels equals slicing afterwards.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            for channels in [[d.channels[1], d.channels[2]],
+                             [d.channels[2], d.channels[0]],
+                             [d.channels[0], d.channels[2], d.channels[4]],
+                             [d.channels[-1]]]:
+                ds = d[:, channels]
+                dc = FlowCal.io.FCSData(filename, channels=channels)
+                self.assertEqual(dc.channels, ds.channels)
+                self.assertEqual(dc.amplification_type(),
+                                 ds.amplification_type())
+                self.assertEqual(dc.detector_voltage(),
+                                 ds.detector_voltage())
+                self.assertEqual(dc.amplifier_gain(), ds.amplifier_gain())
+                self.assertEqual(dc.range(), ds.range())
+                self.assertEqual(dc.resolution(), ds.resolution())
+                np.testing.assert_array_equal(dc, ds)
+
+    def test_channels_single(self):
+        """
+        Testing loading a single channel by name.
+
+        """
+        d = FlowCal.io.FCSData(filenames[0], channels='FL1-H')
+        self.assertEqual(d.shape, (20949, 1))
+        self.assertEqual(d.channels, ('FL1-H',))
+
+    def test_channels_int(self):
+        """
+        Testing loading channels by index.
+
+        """
+        d = FlowCal.io.FCSData(filenames[0], channels=[0, 1])
+        self.assertEqual(d.channels, ('FSC-H', 'SSC-H'))
+
+    def test_channels_mmap(self):
+        """
+        Testing that evenly spaced channels remain memory mapped.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3],
+                               mmap=True,
+                               channels=[0, 2, 4])
+        self.assertIsInstance(d.base, np.memmap)
+        np.testing.assert_array_equal(
+            d, FlowCal.io.FCSData(filenames[3])[:, [0, 2, 4]])
+
+    def test_channels_error(self):
+        """
+        Testing that an invalid channel name raises a ValueError.
+
+        """
+        self.assertRaises(ValueError,
+                          FlowCal.io.FCSData,
+                          filenames[0],
+                          channels=['FSC-H', 'FL7-H'])
+
+class TestFCSDataEvents(unittest.TestCase):
+    def setUp(self):
+        self.d = [FlowCal.io.FCSData(filename) for filename in filenames]
+
+    def test_events_slice(self):
+        """
+        Testing loading a range of events.
+
+        """
+        for filename, d in zip(filenames, self.d):
+            de = FlowCal.io.FCSData(filename, events=slice(100, 1100))
+            self.assertEqual(de.channels, d.channels)
+            np.testing.assert_array_equal(de, d[100:1100])
+
+    def test_events_slice_mmap(self):
+        """
+        Testing that a memory mapped range of events is not copied.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3], mmap=True, events=slice(10, 50))
+        self.assertIsInstance(d.base, np.memmap)
+        np.testing.assert_array_equal(d, self.d[3][10:50])
+
+    def test_events_indices_channels(self):
+        """
+        Testing loading specific events and channels.
+
+        """
+        for filename, d in zip(filenames, self.d):
+            events = [5, 2, 1000, 17]
+            channels = [d.channels[2], d.channels[0]]
+            de = FlowCal.io.FCSData(filename, events=events, channels=channels)
+            np.testing.assert_array_equal(de, d[events][:, channels])
+
+    def test_events_mask(self):
+        """
+        Testing loading events specified by a boolean mask.
+
+        """
+        for filename, d in zip(filenames, self.d):
+            mask = np.zeros(d.shape[0], dtype=bool)
+            mask[100:200] = True
+            de = FlowCal.io.FCSData(filename, events=mask)
+            np.testing.assert_array_equal(de, d[100:200])
+            ds = FlowCal.io.FCSData(filename, events=mask, subsample=10,
+                                    seed=0)
+            self.assertEqual(ds.shape, (10, d.shape[1]))
+            self.assertTrue(np.all(np.in1d(ds[:, 0], d[100:200, 0])))
+
+    def test_events_mask_length(self):
+        """
+        Testing that a boolean mask of the wrong length raises an error.
+
+        """
+        mask = np.ones(100, dtype=bool)
+        self.assertRaises(ValueError,
+                          FlowCal.io.FCSData,
+                          filenames[0],
+                          events=mask)
+        self.assertRaises(ValueError,
+                          FlowCal.io.FCSData,
+                          filenames[0],
+                          events=mask,
+                          subsample=10)
+
+    def test_events_float(self):
+        """
+        Testing that non-integer event indices raise an error.
+
+        """
+        self.assertRaises(ValueError,
+                          FlowCal.io.FCSData,
+                          filenames[0],
+                          events=[1.5, 2.0])
+
+    def test_subsample(self):
+        """
+        Testing random subsampling of events.
+
+        """
+        for filename, d in zip(filenames, self.d):
+            ds = FlowCal.io.FCSData(filename, subsample=500, seed=0)
+            self.assertEqual(ds.shape, (500, d.shape[1]))
+            # Events should be retained in their original order
+            idx = np.random.RandomState(0).choice(d.shape[0],
+                                                  size=500,
+                                                  replace=False)
+            np.testing.assert_array_equal(ds, d[np.sort(idx)])
+
+    def test_subsample_events(self):
+        """
+        Testing random subsampling from a range of events.
+
+        """
+        ds = FlowCal.io.FCSData(filenames[0],
+                                events=slice(1000, 2000),
+                                subsample=100,
+                                seed=1)
+        ds_2 = FlowCal.io.FCSData(filenames[0],
+                                  events=slice(1000, 2000),
+                                  subsample=100,
+                                  seed=1)
+        self.assertEqual(ds.shape, (100, 6))
+        np.testing.assert_array_equal(ds, ds_2)
+        self.assertTrue(np.all(np.in1d(ds[:, 'Time'],
+                                       self.d[0][1000:2000, 'Time'])))
+
+    def test_subsample_larger(self):
+        """
+        Testing that subsampling more events than available loads all.
+
+        """
+        ds = FlowCal.io.FCSData(filenames[0], subsample=10**6)
+        np.testing.assert_array_equal(ds, self.d[0])
+
+class TestIterFCSChunks(unittest.TestCase):
+    def test_chunks(self):
+        """
+        Testing that concatenated chunks equal the whole file.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            chunks = list(FlowCal.io.iter_fcs_chunks(filename, 3000))
+            self.assertEqual(len(chunks), int(np.ceil(d.shape[0]/3000.)))
+            for chunk in chunks:
+                self.assertIsInstance(chunk, FlowCal.io.FCSData)
+                self.assertEqual(chunk.channels, d.channels)
+                self.assertEqual(chunk.range(), d.range())
+                self.assertEqual(chunk.time_step, d.time_step)
+                self.assertLessEqual(chunk.shape[0], 3000)
+            np.testing.assert_array_equal(np.vstack(chunks), d)
+
+    def test_chunks_channels(self):
+        """
+        Testing reading chunks of specific channels.
+
+        """
+        d = FlowCal.io.FCSData(filenames[0])
+        chunks = list(FlowCal.io.iter_fcs_chunks(filenames[0],
+                                                 5000,
+                                                 channels=['FL1-H', 'FSC-H']))
+        for chunk in chunks:
+            self.assertEqual(chunk.channels, ('FL1-H', 'FSC-H'))
+            self.assertEqual(chunk.resolution(),
+                             d.resolution(['FL1-H', 'FSC-H']))
+        np.testing.assert_array_equal(np.vstack(chunks),
+                                      d[:, ['FL1-H', 'FSC-H']])
+
+    def test_chunk_size_error(self):
+        """
+        Testing that a non-positive chunk size raises a ValueError.
+
+        """
+        self.assertRaises(ValueError,
+                          next,
+                          FlowCal.io.iter_fcs_chunks(filenames[0], 0))
+
+class TestFCSDatasets(unittest.TestCase):
+    def setUp(self):
+        # Build a file with three data sets by chaining Data001.fcs,
+        # Data003.fcs, and Data002.fcs via $NEXTDATA.
+        self.dataset_filenames = [filenames[0], filenames[2], filenames[1]]
+        self.file = tempfile.TemporaryFile()
+        for i, filename in enumerate(self.dataset_filenames):
+            with open(filename, 'rb') as f:
+                raw = f.read()
+            if i < len(self.dataset_filenames) - 1:
+                raw = self.set_nextdata(raw, len(raw))
+            self.file.write(raw)
+        self.file.flush()
+
+    def tearDown(self):
+        self.file.close()
+
+    def set_nextdata(self, raw, nextdata):
+        """
+        Set $NEXTDATA in the TEXT segment of an FCS file.
+
+        """
+        delim = raw[256:257]
+        old_entry = b'$NEXTDATA' + delim + b'0' + delim
+        new_entry = b'$NEXTDATA' + delim + str(nextdata).encode() + delim
+        # The TEXT segment grows into the unused space before the DATA
+        # segment, so that no other segment is displaced.
+        text_end = int(raw[18:26])
+        new_text_end = text_end + len(new_entry) - len(old_entry)
+        self.assertLess(new_text_end, int(raw[26:34]))
+        text = raw[:text_end + 1].replace(old_entry, new_entry, 1)
+        text = (text[:18]
+                + '{0:8d}'.format(new_text_end).encode()
+                + text[26:])
+        return text + raw[new_text_end + 1:]
+
+    def test_index(self):
+        """
+        Testing the index of data sets.
+
+        """
+        datasets = FlowCal.io.FCSDatasets(self.file)
+        self.assertEqual(len(datasets), 3)
+        offset = 0
+        for dataset, filename in zip(datasets.index,
+                                     self.dataset_filenames):
+            d = FlowCal.io.FCSData(filename)
+            self.assertEqual(dataset.offset, offset)
+            self.assertEqual(dataset.num_events, d.shape[0])
+            self.assertEqual(dataset.num_channels, d.shape[1])
+            offset += os.path.getsize(filename)
+
+    def test_datasets(self):
+        """
+        Testing loading of each data set.
+
+        """
+        datasets = FlowCal.io.FCSDatasets(self.file)
+        for d_set, filename in zip(datasets, self.dataset_filenames):
+            d = FlowCal.io.FCSData(filename)
+            self.assertIsInstance(d_set, FlowCal.io.FCSData)
+            self.assertEqual(d_set.channels, d.channels)
+            self.assertEqual(d_set.range(), d.range())
+            np.testing.assert_array_equal(d_set, d)
+        np.testing.assert_array_equal(
+            datasets[-1], FlowCal.io.FCSData(self.dataset_filenames[-1]))
+
+    def test_datasets_slice(self):
+        """
+        Testing loading a slice of data sets.
+
+        """
+        datasets = FlowCal.io.FCSDatasets(self.file)
+        d_sets = datasets[::-2]
+        self.assertIsInstance(d_sets, list)
+        self.assertEqual(len(d_sets), 2)
+        for d_set, filename in zip(d_sets, self.dataset_filenames[::-2]):
+            self.assertIsInstance(d_set, FlowCal.io.FCSData)
+            np.testing.assert_array_equal(d_set, FlowCal.io.FCSData(filename))
+        self.assertEqual(datasets[3:], [])
+        self.assertRaises(TypeError, datasets.__getitem__, 'a')
+
+    def test_datasets_channels(self):
+        """
+        Testing loading specific channels of each data set.
+
+        """
+        datasets = FlowCal.io.FCSDatasets(self.file, channels=[2, 0])
+        for d_set, filename in zip(datasets, self.dataset_filenames):
+            d = FlowCal.io.FCSData(filename)
+            self.assertEqual(d_set.channels, (d.channels[2], d.channels[0]))
+            np.testing.assert_array_equal(d_set, d[:, [2, 0]])
+
+    def test_fcs_data_first_dataset(self):
+        """
+        Testing that FCSData warns and loads the first data set.
+
+        """
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            d = FlowCal.io.FCSData(self.file)
+        self.assertEqual(len(w), 1)
+        np.testing.assert_array_equal(
+            d, FlowCal.io.FCSData(self.dataset_filenames[0]))
+
+class TestFCSCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.fcs_dir = tempfile.mkdtemp()
+        # Copies of the test files, which can be modified
+        self.fcs_filenames = []
+        for filename in filenames:
+            fcs_filename = os.path.join(self.fcs_dir,
+                                        os.path.basename(filename))
+            shutil.copyfile(filename, fcs_filename)
+            self.fcs_filenames.append(fcs_filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.fcs_dir)
+
+    def test_cache_hit(self):
+        """
+        Testing that cached files are loaded from the cache.
+
+        """
+        cache = FlowCal.io.FCSCache(self.cache_dir)
+        for filename in self.fcs_filenames:
+            d = FlowCal.io.FCSData(filename)
+            d_miss = cache.load(filename)
+            d_hit = cache.load(filename)
+            for d_cache in [d_miss, d_hit]:
+                self.assertIsInstance(d_cache, FlowCal.io.FCSData)
+                np.testing.assert_array_equal(d_cache, d)
+                self.assertEqual(d_cache.dtype, d.dtype)
+                self.assertEqual(d_cache.channels, d.channels)
+                self.assertEqual(d_cache.range(), d.range())
+                self.assertEqual(d_cache.time_step, d.time_step)
+                self.assertEqual(d_cache.acquisition_start_time,
+                                 d.acquisition_start_time)
+                self.assertEqual(d_cache.text, d.text)
+                self.assertEqual(d_cache.analysis, d.analysis)
+        self.assertEqual(len(os.listdir(self.cache_dir)),
+                         2*len(self.fcs_filenames))
+
+    def test_cache_modified_file(self):
+        """
+        Testing that modified files are not loaded from the cache.
+
+        """
+        cache = FlowCal.io.FCSCache(self.cache_dir)
+        key = cache.key(self.fcs_filenames[0])
+        cache.load(self.fcs_filenames[0])
+        st = os.stat(self.fcs_filenames[0])
+        os.utime(self.fcs_filenames[0], (st.st_atime, st.st_mtime + 10))
+        self.assertNotEqual(cache.key(self.fcs_filenames[0]), key)
+
+    def test_cache_content_hash(self):
+        """
+        Testing that the content hash distinguishes identical fingerprints.
+
+        """
+        cache = FlowCal.io.FCSCache(self.cache_dir, content_hash=True)
+        key = cache.key(self.fcs_filenames[0])
+        st = os.stat(self.fcs_filenames[0])
+        with open(self.fcs_filenames[0], 'r+b') as f:
+            f.seek(st.st_size - 1)
+            f.write(b'\x00' if f.read(1) != b'\x00' else b'\x01')
+        os.utime(self.fcs_filenames[0], ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertNotEqual(cache.key(self.fcs_filenames[0]), key)
+
+    def test_cache_eviction(self):
+        """
+        Testing that least recently used files are evicted.
+
+        """
+        sizes = [FlowCal.io.FCSData(f).nbytes for f in self.fcs_filenames]
+        cache = FlowCal.io.FCSCache(self.cache_dir,
+                                    max_size=sizes[1] + sizes[2] + 4096)
+        key_0 = cache.key(self.fcs_filenames[0])
+        key_1 = cache.key(self.fcs_filenames[1])
+        cache.load(self.fcs_filenames[0])
+        cache.load(self.fcs_filenames[1])
+        # Make file 1 the least recently used
+        os.utime(os.path.join(self.cache_dir, key_1 + '.json'), (0, 0))
+        cache.load(self.fcs_filenames[2])
+        self.assertLessEqual(cache.size, cache.max_size)
+        cached = os.listdir(self.cache_dir)
+        self.assertNotIn(key_1 + '.npy', cached)
+        self.assertNotIn(key_1 + '.json', cached)
+        self.assertIn(key_0 + '.npy', cached)
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.tempdir, 'data')
+        os.makedirs(os.path.join(self.data_dir, 'sub'))
+        self.paths = []
+        for i, filename in enumerate(filenames):
+            path = os.path.join(self.data_dir,
+                                'sub' if i % 2 else '',
+                                os.path.basename(filename))
+            shutil.copy(filename, path)
+            self.paths.append(path)
+        self.catalog = FlowCal.io.Catalog(
+            os.path.join(self.tempdir, 'catalog.db'))
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.tempdir)
+
+    def test_scan(self):
+        """
+        Testing that scanning indexes all FCS files.
+
+        """
+        with open(os.path.join(self.data_dir, 'notes.txt'), 'w') as f:
+            f.write('not an FCS file')
+        result = self.catalog.scan(self.data_dir)
+        self.assertEqual(result, (4, 0, 0, 0))
+        self.assertEqual(len(self.catalog), 4)
+        self.assertEqual(self.catalog.query(), sorted(self.paths))
+
+    def test_rescan_incremental(self):
+        """
+        Testing that rescanning only parses changed files.
+
+        """
+        self.catalog.scan(self.data_dir)
+        self.assertEqual(self.catalog.scan(self.data_dir), (0, 0, 0, 4))
+
+        shutil.copy(filenames[3], self.paths[0])
+        os.remove(self.paths[1])
+        self.assertEqual(self.catalog.scan(self.data_dir), (0, 1, 1, 2))
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(self.catalog.query(cytometer='FACSAriaII'),
+                         sorted([self.paths[0], self.paths[3]]))
+        n_channels = self.catalog.connection.execute(
+            'SELECT COUNT(*) FROM channels').fetchone()[0]
+        self.assertEqual(n_channels, 14 + 8 + 14)
+
+    def test_query(self):
+        """
+        Testing queries by instrument, channel, time, and events.
+
+        """
+        self.catalog.scan(self.data_dir)
+        self.assertEqual(self.catalog.query(cytometer='FACScan'),
+                         [self.paths[0]])
+        self.assertEqual(self.catalog.query(channels='FL3'),
+                         [self.paths[2]])
+        self.assertEqual(self.catalog.query(channels=['FSC-A', 'Time']),
+                         sorted([self.paths[1], self.paths[3]]))
+        self.assertEqual(self.catalog.query(
+                            start=datetime.datetime(2015, 5, 19),
+                            end=datetime.datetime(2015, 6, 1)),
+                         sorted([self.paths[0], self.paths[3]]))
+        self.assertEqual(self.catalog.query(cytometer='FACScan',
+                                            channels='FL3'),
+                         [])
+
+    def test_channels(self):
+        """
+        Testing that per-channel voltages and gains are indexed.
+
+        """
+        self.catalog.scan(self.data_dir)
+        rows = self.catalog.connection.execute(
+            'SELECT idx, name, detector_voltage, amplifier_gain'
+            + ' FROM channels JOIN files ON channels.file_id = files.id'
+            + ' WHERE path = ? ORDER BY idx', (self.paths[0],)).fetchall()
+        self.assertEqual(rows, [(0, 'FSC-H', 1.0, None),
+                                (1, 'SSC-H', 460.0, None),
+                                (2, 'FL1-H', 400.0, None),
+                                (3, 'FL2-H', 900.0, None),
+                                (4, 'FL3-H', 999.0, None),
+                                (5, 'Time', 100.0, None)])
+
+    def test_no_channel_names(self):
+        """
+        Testing indexing a file without $PnN keywords.
+
+        """
+        with open(filenames[0], 'rb') as f:
+            raw = f.read()
+        # Replace keywords with others of the same length, such that
+        # segment offsets are unchanged.
+        for i in range(1, 7):
+            raw = raw.replace('$P{0}N'.format(i).encode(),
+                              '$X{0}N'.format(i).encode())
+        path = os.path.join(self.data_dir, 'no_names.fcs')
+        with open(path, 'wb') as f:
+            f.write(raw)
+        self.assertEqual(self.catalog.scan(self.data_dir), (5, 0, 0, 0))
+        self.assertEqual(self.catalog.query(), sorted(self.paths + [path]))
+        rows = self.catalog.connection.execute(
+            'SELECT name, detector_voltage'
+            + ' FROM channels JOIN files ON channels.file_id = files.id'
+            + ' WHERE path = ? ORDER BY idx', (path,)).fetchall()
+        self.assertEqual(rows, [(None, 1.0),
+                                (None, 460.0),
+                                (None, 400.0),
+                                (None, 900.0),
+                                (None, 999.0),
+                                (None, 100.0)])
+
+    def test_invalid_file(self):
+        """
+        Testing that files which cannot be parsed are not queried.
+
+        """
+        with open(os.path.join(self.data_dir, 'broken.fcs'), 'wb') as f:
+            f.write(b'FCS3.0  garbage')
+        self.assertEqual(self.catalog.scan(self.data_dir), (5, 0, 0, 0))
+        self.assertEqual(self.catalog.query(), sorted(self.paths))
+
+class TestColumns(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_save_load(self):
+        """
+        Testing that saving and loading preserves events and metadata.
+
+        """
+        for filename in filenames:
+            d = FlowCal.io.FCSData(filename)
+            directory = os.path.join(self.tempdir, os.path.basename(filename))
+            FlowCal.io.save_columns(d, directory)
+            d_cols = FlowCal.io.load_columns(directory)
+            np.testing.assert_array_equal(d_cols, d)
+            self.assertEqual(d_cols.dtype, d.dtype)
+            self.assertTrue(d_cols.flags.f_contiguous)
+            self.assertEqual(d_cols.infile, filename)
+            self.assertEqual(d_cols.channels, d.channels)
+            self.assertEqual(d_cols.range(), d.range())
+            self.assertEqual(d_cols.detector_voltage(),
+                             d.detector_voltage())
+            self.assertEqual(d_cols.text, d.text)
+            self.assertEqual(d_cols.acquisition_start_time,
+                             d.acquisition_start_time)
+
+    def test_save_load_no_channel_names(self):
+        """
+        Testing saving and loading channels without $PnN keywords.
+
+        """
+        with open(filenames[0], 'rb') as f:
+            raw = f.read()
+        # Replace keywords with others of the same length, such that
+        # segment offsets are unchanged.
+        for i in range(1, 7):
+            raw = raw.replace('$P{0}N'.format(i).encode(),
+                              '$X{0}N'.format(i).encode())
+        d = FlowCal.io.FCSData(raw, channels=[4, 1])
+        self.assertEqual(d.channels, (None, None))
+        directory = os.path.join(self.tempdir, 'no_names')
+        FlowCal.io.save_columns(d, directory)
+        d_cols = FlowCal.io.load_columns(directory)
+        np.testing.assert_array_equal(d_cols, d)
+        self.assertEqual(d_cols.channels, (None, None))
+        self.assertEqual(d_cols.detector_voltage([0, 1]), [999.0, 460.0])
+        d_cols = FlowCal.io.load_columns(directory, channels=1)
+        np.testing.assert_array_equal(d_cols, d[:, [1]])
+        self.assertEqual(d_cols.detector_voltage(0), 460.0)
+
+    def test_save_load_transformed(self):
+        """
+        Testing that transformed ranges and channel subsets are saved.
+
+        """
+        d = FlowCal.io.FCSData(filenames[0])
+        d = FlowCal.transform.to_rfi(d)[:, ['FL2-H', 'FL1-H']]
+        FlowCal.io.save_columns(d, self.tempdir)
+        d_cols = FlowCal.io.load_columns(self.tempdir)
+        np.testing.assert_array_equal(d_cols, d)
+        self.assertEqual(d_cols.channels, ('FL2-H', 'FL1-H'))
+        self.assertEqual(d_cols.range(), d.range())
+
+    def test_load_channels(self):
+        """
+        Testing loading a subset of channels.
+
+        """
+        d = FlowCal.io.FCSData(filenames[2])
+        FlowCal.io.save_columns(d, self.tempdir)
+        d_cols = FlowCal.io.load_columns(self.tempdir, channels=['FL3', 1])
+        np.testing.assert_array_equal(d_cols, d[:, ['FL3', 'FSC']])
+        self.assertEqual(d_cols.channels, ('FL3', 'FSC'))
+        self.assertRaises(ValueError,
+                          FlowCal.io.load_columns,
+                          self.tempdir,
+                          channels='FL4')
+
+    def test_load_mmap(self):
+        """
+        Testing that a single channel is memory mapped without copying.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3])
+        FlowCal.io.save_columns(d, self.tempdir)
+        d_cols = FlowCal.io.load_columns(self.tempdir,
+                                         channels='GFP-A',
+                                         mmap=True)
+        self.assertIsInstance(d_cols.base, np.memmap)
+        np.testing.assert_array_equal(d_cols, d[:, ['GFP-A']])
+
+class TestConcatenate(unittest.TestCase):
+    def setUp(self):
+        self.d = FlowCal.io.FCSData(filenames[0])
+
+    def test_concatenate(self):
+        """
+        Testing concatenation of events, metadata, and offsets.
+
+        """
+        d_list = [self.d, self.d[:100], self.d[200:250]]
+        d_cat, offsets = FlowCal.io.concatenate(d_list)
+        self.assertIsInstance(d_cat, FlowCal.io.FCSData)
+        np.testing.assert_array_equal(d_cat, np.vstack(d_list))
+        np.testing.assert_array_equal(offsets,
+                                      [0, 20949, 21049, 21099])
+        for i, d in enumerate(d_list):
+            np.testing.assert_array_equal(
+                d_cat[offsets[i]:offsets[i + 1]], d)
+        self.assertEqual(d_cat.channels, self.d.channels)
+        self.assertEqual(d_cat.range(), self.d.range())
+        self.assertEqual(d_cat.acquisition_start_time,
+                         self.d.acquisition_start_time)
+
+    def test_concatenate_reorder_channels(self):
+        """
+        Testing that channels are arranged in the order of the first.
+
+        """
+        d_rev = self.d[:, list(reversed(self.d.channels))]
+        d_cat, offsets = FlowCal.io.concatenate([self.d, d_rev])
+        self.assertEqual(d_cat.channels, self.d.channels)
+        np.testing.assert_array_equal(d_cat[offsets[1]:], self.d)
+
+    def test_concatenate_range(self):
+        """
+        Testing that the range spans the ranges of all elements.
+
+        """
+        d_rfi = FlowCal.transform.to_rfi(self.d, channels=['FL1-H'])
+        d_cat, offsets = FlowCal.io.concatenate([self.d, d_rfi])
+        self.assertEqual(d_cat.dtype, np.float64)
+        self.assertEqual(d_cat.range('FL1-H'),
+                         [0, d_rfi.range('FL1-H')[1]])
+        self.assertEqual(d_cat.range('FL2-H'), self.d.range('FL2-H'))
+        self.assertEqual(self.d.range('FL1-H'), [0, 1023])
+
+    def test_concatenate_channel_mismatch(self):
+        """
+        Testing that mismatched channels raise a ValueError.
+
+        """
+        self.assertRaises(ValueError,
+                          FlowCal.io.concatenate,
+                          [self.d, self.d[:, ['FL1-H', 'FL2-H']]])
+        self.assertRaises(ValueError,
+                          FlowCal.io.concatenate,
+                          [self.d, FlowCal.io.FCSData(filenames[1])])
+        self.assertRaises(ValueError, FlowCal.io.concatenate, [])
+
+class TestFCSDataMetadataSharing(unittest.TestCase):
+    def setUp(self):
+        self.d = FlowCal.io.FCSData(filenames[0])
+
+    def test_views_share_metadata(self):
+        """
+        Testing that slices and ufunc outputs share metadata objects.
+
+        """
+        for d_new in [self.d[:100], self.d[self.d[:,0] > 100], self.d + 1]:
+            self.assertIs(d_new._text, self.d._text)
+            self.assertIs(d_new._analysis, self.d._analysis)
+            self.assertIs(d_new._channel_table, self.d._channel_table)
+
+    def test_modify_text(self):
+        """
+        Testing that modifying the TEXT dictionary only affects one object.
+
+        """
+        d_view_1 = self.d[:100]
+        self.d.text['$TEST'] = '1'
+        d_view_2 = self.d[:100]
+        d_view_2.text['$TEST'] = '2'
+        self.assertNotIn('$TEST', d_view_1.text)
+        self.assertEqual(self.d.text['$TEST'], '1')
+        self.assertEqual(d_view_2.text['$TEST'], '2')
+        self.assertEqual(self.d[:100].text['$TEST'], '1')
+
+    def test_modify_analysis(self):
+        """
+        Testing that modifying the ANALYSIS dictionary only affects one
+        object.
+
+        """
+        d_view = self.d[:100]
+        d_view.analysis['$TEST'] = '1'
+        self.assertNotIn('$TEST', self.d.analysis)
+
+    def test_channel_table_slicing(self):
+        """
+        Testing that slicing channels selects rows of the channel table.
+
+        """
+        for key in [[4, 0], slice(1, 4), 2, 'FL1-H', ['FL1-H', 'FSC-H']]:
+            d_new = self.d[:, key]
+            idx = self.d._name_to_index(key) if not isinstance(key, slice) \
+                else list(range(6))[key]
+            if not isinstance(idx, list):
+                idx = [idx]
+            self.assertEqual(d_new.channels,
+                             tuple([self.d.channels[i] for i in idx]))
+            self.assertEqual(d_new.range(),
+                             [self.d.range(i) for i in idx])
+            self.assertEqual(d_new.amplification_type(),
+                             [self.d.amplification_type(i) for i in idx])
+            self.assertEqual(d_new.detector_voltage(),
+                             [self.d.detector_voltage(i) for i in idx])
+            self.assertEqual(d_new.amplifier_gain(),
+                             [self.d.amplifier_gain(i) for i in idx])
+            self.assertEqual(d_new.resolution(),
+                             [self.d.resolution(i) for i in idx])
+
+    def test_modify_range(self):
+        """
+        Testing that modifying a returned range does not affect the object.
+
+        """
+        r = self.d.range('FL1-H')
+        r[1] = -1
+        self.assertEqual(self.d.range('FL1-H'), [0, 1023])
+
+class TestFCSDataNameToIndex(unittest.TestCase):
+    def setUp(self):
+        self.d = FlowCal.io.FCSData(filenames[0])
+
+    def test_name(self):
+        """
+        Testing conversion of channel names and integers.
+
+        """
+        self.assertEqual(self.d._name_to_index('FSC-H'), 0)
+        self.assertEqual(self.d._name_to_index('Time'), 5)
+        self.assertEqual(self.d._name_to_index(3), 3)
+        self.assertEqual(self.d._name_to_index(-1), -1)
+
+    def test_list(self):
+        """
+        Testing conversion of lists of channel names and integers.
+
+        """
+        self.assertEqual(self.d._name_to_index(['FL1-H', 0, 'Time', -2]),
+                         [2, 0, 5, -2])
+        self.assertEqual(self.d._name_to_index(('SSC-H', 'FSC-H')), [1, 0])
+        self.assertEqual(self.d._name_to_index([['FL1-H', 1], 'FL2-H']),
+                         [[2, 1], 3])
+
+    def test_duplicated_names(self):
+        """
+        Testing that repeated channel names map to the first occurrence.
+
+        """
+        d = self.d[:, ['FL1-H', 'FSC-H', 'FL1-H']]
+        self.assertEqual(d._name_to_index('FL1-H'), 0)
+        self.assertEqual(d._name_to_index(['FSC-H', 'FL1-H']), [1, 0])
+
+    def test_errors(self):
+        """
+        Testing errors raised by invalid channels.
+
+        """
+        self.assertRaises(ValueError, self.d._name_to_index, 'FL4-H')
+        self.assertRaises(ValueError, self.d._name_to_index, ['FL4-H'])
+        self.assertRaises(ValueError, self.d._name_to_index, 6)
+        self.assertRaises(ValueError, self.d._name_to_index, [0, -7])
+        self.assertRaises(TypeError, self.d._name_to_index, 1.5)
+        self.assertRaises(TypeError, self.d._name_to_index, [0, 1.5])
+
+def shared_fcs_data_sum(shared):
+    """
+    Sum the events of a SharedFCSData object, in a worker process.
+
+    """
+    d = shared.attach()
+    result = (d.channels, d.range(), np.sum(d[:, 'FL1-H']))
+    del d
+    shared.close()
+    return result
+
+class TestFCSDataPickle(unittest.TestCase):
+    def setUp(self):
+        self.d = FlowCal.io.FCSData(filenames[0])
+
+    def assert_fcs_data_equal(self, d_new, d):
+        self.assertIsInstance(d_new, FlowCal.io.FCSData)
+        np.testing.assert_array_equal(d_new, d)
+        self.assertEqual(d_new.dtype.kind, d.dtype.kind)
+        self.assertEqual(d_new.dtype.itemsize, d.dtype.itemsize)
+        self.assertEqual(d_new.infile, d.infile)
+        self.assertEqual(d_new.channels, d.channels)
+        self.assertEqual(d_new.range(), d.range())
+        self.assertEqual(d_new.amplification_type(), d.amplification_type())
+        self.assertEqual(d_new.detector_voltage(), d.detector_voltage())
+        self.assertEqual(d_new.time_step, d.time_step)
+        self.assertEqual(d_new.acquisition_start_time,
+                         d.acquisition_start_time)
+        self.assertEqual(d_new.text, d.text)
+        self.assertEqual(d_new.analysis, d.analysis)
+
+    def test_pickle(self):
+        """
+        Testing pickling with all protocols.
+
+        """
+        for d in [self.d, self.d[::3, ['FL1-H', 'FSC-H']]]:
+            for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+                d_new = pickle.loads(pickle.dumps(d, protocol=protocol))
+                self.assert_fcs_data_equal(d_new, d)
+                self.assertEqual(d_new._name_to_index('FSC-H'),
+                                 d._name_to_index('FSC-H'))
+
+    def test_pickle_out_of_band(self):
+        """
+        Testing pickling with out-of-band buffers.
+
+        """
+        if pickle.HIGHEST_PROTOCOL < 5:
+            raise unittest.SkipTest("pickle protocol 5 not available")
+        buffers = []
+        s = pickle.dumps(self.d, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 1)
+        self.assertLess(len(s), self.d.nbytes)
+        d_new = pickle.loads(s, buffers=buffers)
+        self.assert_fcs_data_equal(d_new, self.d)
+
+    def test_shared_memory(self):
+        """
+        Testing sharing events via shared memory.
+
+        """
+        with FlowCal.io.SharedFCSData(self.d) as shared:
+            shared_copy = pickle.loads(pickle.dumps(shared))
+            d_new = shared_copy.attach()
+            self.assert_fcs_data_equal(d_new, self.d)
+            del d_new
+            shared_copy.close()
+
+    def test_shared_memory_pool(self):
+        """
+        Testing sharing events with a pool of worker processes.
+
+        """
+        pool = multiprocessing.Pool(2)
+        try:
+            with FlowCal.io.SharedFCSData(self.d) as shared:
+                results = pool.map(shared_fcs_data_sum, [shared]*4)
+        finally:
+            pool.close()
+            pool.join()
+        for result in results:
+            self.assertEqual(result, (self.d.channels,
+                                      self.d.range(),
+                                      np.sum(self.d[:, 'FL1-H'])))
+
+class TestReadMany(unittest.TestCase):
+    def setUp(self):
+        self.paths = [filenames[0],
+                      'test/Data999.fcs',
+                      filenames[2],
+                      filenames[3],
+                      filenames[0]]
+
+    def assert_results(self, results, channels=None):
+        self.assertEqual(len(results), len(self.paths))
+        for result, path in zip(results, self.paths):
+            if path == 'test/Data999.fcs':
+                self.assertIsInstance(result, IOError)
+            else:
+                d = FlowCal.io.FCSData(path, channels=channels)
+                self.assertIsInstance(result, FlowCal.io.FCSData)
+                self.assertEqual(result.channels, d.channels)
+                np.testing.assert_array_equal(result, d)
+
+    def test_sequential(self):
+        """
+        Testing loading files sequentially.
+
+        """
+        results = FlowCal.io.read_many(self.paths, n_jobs=1)
+        self.assert_results(results)
+
+    def test_threads(self):
+        """
+        Testing loading files with a thread pool.
+
+        """
+        results = FlowCal.io.read_many(self.paths,
+                                       n_jobs=3,
+                                       backend='thread',
+                                       channels=[0, 1],
+                                       mmap=True)
+        self.assert_results(results, channels=[0, 1])
+
+    def test_processes(self):
+        """
+        Testing loading files with a process pool.
+
+        """
+        results = FlowCal.io.read_many(self.paths, n_jobs=2)
+        self.assert_results(results)
+
+    def test_invalid_backend(self):
+        """
+        Testing that an invalid backend raises a ValueError.
+
+        """
+        self.assertRaises(ValueError,
+                          FlowCal.io.read_many,
+                          self.paths,
+                          backend='cluster')
+
+class TestAsyncRead(unittest.TestCase):
+    def test_aread_fcs(self):
+        """
+        Testing loading an FCS file asynchronously.
+
+        """
+        d_async = asyncio.run(FlowCal.io.aread_fcs(filenames[0],
+                                                   channels=['FL1-H']))
+        d = FlowCal.io.FCSData(filenames[0], channels=['FL1-H'])
+        self.assertIsInstance(d_async, FlowCal.io.FCSData)
+        self.assertEqual(d_async.channels, d.channels)
+        np.testing.assert_array_equal(d_async, d)
+
+    def test_aread_many(self):
+        """
+        Testing loading several FCS files asynchronously.
+
+        """
+        paths = filenames + ['test/Data999.fcs']
+        results = asyncio.run(FlowCal.io.aread_many(paths, n_jobs=2))
+        self.assertEqual(len(results), len(paths))
+        for result, path in zip(results[:-1], filenames):
+            np.testing.assert_array_equal(result, FlowCal.io.FCSData(path))
+        self.assertIsInstance(results[-1], IOError)
+
+class TestFCSDataTimeSlice(unittest.TestCase):
+    def setUp(self):
+        self.d = FlowCal.io.FCSData(filenames[0])
+        self.t = self.d[:, 'Time'].view(np.ndarray).ravel()*self.d.time_step
+
+    def test_time_slice(self):
+        """
+        Testing that time windows select the same events as a mask.
+
+        """
+        for t0, t1 in [(10, 20), (10.05, 10.3), (0, 1000), (-5, 0.1),
+                       (30, 30), (50, 40), (1000, 2000)]:
+            d_slice = self.d.time_slice(t0, t1)
+            mask = (self.t >= t0) & (self.t < t1)
+            np.testing.assert_array_equal(d_slice, self.d[mask])
+            self.assertEqual(d_slice.channels, self.d.channels)
+
+    def test_time_slice_view(self):
+        """
+        Testing that time windows are views of the original events.
+
+        """
+        d_slice = self.d.time_slice(10, 20)
+        self.assertTrue(np.shares_memory(d_slice, self.d))
+
+    def test_time_index(self):
+        """
+        Testing the indices of a sequence of time windows.
+
+        """
+        edges = np.linspace(0, 80, 17)
+        idx = self.d.time_index(edges)
+        np.testing.assert_array_equal(idx,
+                                      np.searchsorted(self.t, edges))
+        self.assertEqual(self.d.time_index(10.05),
+                         np.searchsorted(self.t, 10.05))
+
+    def test_time_index_float(self):
+        """
+        Testing time windows on floating point events.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3])
+        t = d[:, 'Time'].view(np.ndarray).ravel()*d.time_step
+        edges = np.linspace(t[0], t[-1], 7)
+        np.testing.assert_array_equal(d.time_index(edges),
+                                      np.searchsorted(t, edges))
+
+    def test_time_index_inf_nan(self):
+        """
+        Testing infinite times, and that NaN times raise a ValueError.
+
+        """
+        d = FlowCal.io.FCSData(filenames[3])
+        for data in [self.d, d]:
+            self.assertEqual(data.time_index(-np.inf), 0)
+            self.assertEqual(data.time_index(np.inf), data.shape[0])
+            np.testing.assert_array_equal(
+                data.time_slice(-np.inf, np.inf), data)
+            self.assertRaises(ValueError, data.time_index, np.nan)
+            self.assertRaises(ValueError, data.time_index, [0, np.nan])
+            self.assertRaises(ValueError, data.time_slice, np.nan, 10)
+
+    def test_no_time_channel(self):
+        """
+        Testing that data without a time channel raise a KeyError.
+
+        """
+        d = self.d[:, ['FL1-H', 'FL2-H']]
+        self.assertRaises(KeyError, d.time_slice, 0, 10)
+
 class TestFCSDataSlicing(unittest.TestCase):
     def setUp(self):
         self.d = FlowCal.io.FCSData(filenames[0])